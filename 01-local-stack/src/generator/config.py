@@ -1,3 +1,5 @@
+import os
+
 import pandas as pd
 
 # =========================================================
@@ -8,9 +10,12 @@ START_MONTH = pd.Timestamp("2024-01-01")
 END_MONTH = pd.Timestamp("2024-12-01")
 MONTH_RANGE = pd.date_range(start=START_MONTH, end=END_MONTH, freq="MS")
 
-INITIAL_USERS = 500
-MIN_NEW_USERS = 50
-MAX_NEW_USERS = 100
+# Multiplies user volumes; set by the bench harness (make bench SCALE=...)
+SCALE_FACTOR = float(os.getenv("SIM_SCALE_FACTOR", "1"))
+
+INITIAL_USERS = int(500 * SCALE_FACTOR)
+MIN_NEW_USERS = int(50 * SCALE_FACTOR)
+MAX_NEW_USERS = int(100 * SCALE_FACTOR)
 
 COUNTRY_FAKER_LOCALE = {
     "US": "en_US",
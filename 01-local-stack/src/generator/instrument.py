@@ -0,0 +1,260 @@
+"""
+instrument.py
+─────────────
+Per-phase timing and memory instrumentation for the generator runners.
+
+Each month is split into phases (new users, lifecycle, one chaos call and
+one write per dataset); every phase emits one JSON line:
+
+    {"type": "phase", "year": "y2", "month": "2025-10", "phase": "chaos.product_events",
+     "wall_s": 0.41, "events": 72311, "events_per_s": 176368.3, "rss_mb": 612.0, ...}
+
+followed by a "month" roll-up and a final "run" record. Timing + RSS cost a
+couple of perf_counter/getrusage calls per phase, so it stays on by default.
+--trace-memory (tracemalloc) and --profile are opt-in: both slow the run.
+
+    python -m src.generator.runner_y2 --metrics data/metrics/y2.jsonl
+    python -m src.generator.runner_y2 --profile cprofile   # one .prof per month/phase
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:   # Windows — RSS is reported as null
+    resource = None
+
+METRICS_DIR = "data/metrics"
+
+# Month/run event totals come from this phase only; chaos and write phases
+# see the same events again, and new_users counts users.
+GENERATED_PHASE = "lifecycle"
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)   # KiB on Linux
+
+
+def _rss_mb():
+    """Current RSS from /proc (Linux); falls back to the peak elsewhere."""
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError, AttributeError):
+        return _peak_rss_mb()
+
+
+class _NullPhase:
+    """Shared no-op phase handed out when instrumentation is off."""
+    events = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ("instr", "name", "events", "_started", "_profiler")
+
+    def __init__(self, instr, name, events):
+        self.instr  = instr
+        self.name   = name
+        self.events = events
+
+    def __enter__(self):
+        if self.instr.trace_memory:
+            tracemalloc.reset_peak()
+        self._profiler = self.instr._start_profiler()
+        self._started  = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self._started
+        self.instr._stop_profiler(self._profiler, self.name)
+        self.instr._record_phase(self.name, wall, self.events)
+        return False
+
+
+class Instrumentation:
+    """
+    Writes phase/month/run records as JSON lines. Construct with
+    log_path=None (or use Instrumentation.disabled()) to turn it off.
+    """
+
+    def __init__(self, year, log_path=None, trace_memory=False, profile=None, profile_dir=None):
+        self.year         = year
+        self.log_path     = log_path
+        self.enabled      = log_path is not None
+        self.trace_memory = self.enabled and trace_memory
+        self.profile      = profile if self.enabled else None
+        self.profile_dir  = profile_dir or os.path.join(METRICS_DIR, "profile", year or "run")
+
+        self._file        = None
+        self._month       = None
+        self._month_acc   = None
+        self._run_started = time.perf_counter()
+        self._run_events  = 0
+
+        if self.trace_memory:
+            tracemalloc.start()
+        if self.profile:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            if self.profile == "pyinstrument":
+                import pyinstrument  # noqa: F401 — fail at startup, not mid-run
+
+    @classmethod
+    def disabled(cls):
+        return cls(year=None)
+
+    # ─────────────────────────────────────────────────────
+    #  PUBLIC API
+    # ─────────────────────────────────────────────────────
+
+    def phase(self, name, events=0):
+        """Context manager timing one phase; set `.events` inside if unknown up front."""
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name, events)
+
+    def start_month(self, label):
+        if not self.enabled:
+            return
+        self._month     = label
+        self._month_acc = {"wall_s": 0.0, "events": 0, "started": time.perf_counter()}
+
+    def end_month(self, **counts):
+        """Roll the month up; `counts` (e.g. users=…, active=…) are copied into the record."""
+        if not self.enabled:
+            return
+        acc  = self._month_acc
+        wall = time.perf_counter() - acc["started"]
+        self._emit({
+            "type":         "month",
+            "month":        self._month,
+            "wall_s":       round(wall, 4),
+            "phase_wall_s": round(acc["wall_s"], 4),
+            "events":       acc["events"],
+            "events_per_s": round(acc["events"] / wall, 1) if wall else None,
+            "rss_mb":       _rss_mb(),
+            "peak_rss_mb":  _peak_rss_mb(),
+            **counts,
+        })
+        self._month = None
+
+    def close(self):
+        if not self.enabled:
+            return
+        wall = time.perf_counter() - self._run_started
+        self._emit({
+            "type":         "run",
+            "wall_s":       round(wall, 3),
+            "events":       self._run_events,
+            "events_per_s": round(self._run_events / wall, 1) if wall else None,
+            "peak_rss_mb":  _peak_rss_mb(),
+        })
+        if self.trace_memory:
+            tracemalloc.stop()
+        if self._file:
+            self._file.close()
+            self._file = None
+        print(f"[instrument] Metrics written to {self.log_path}")
+
+    # ─────────────────────────────────────────────────────
+    #  INTERNALS
+    # ─────────────────────────────────────────────────────
+
+    def _record_phase(self, name, wall, events):
+        record = {
+            "type":         "phase",
+            "month":        self._month,
+            "phase":        name,
+            "wall_s":       round(wall, 4),
+            "events":       events,
+            "events_per_s": round(events / wall, 1) if events and wall else None,
+            "rss_mb":       _rss_mb(),
+            "peak_rss_mb":  _peak_rss_mb(),
+        }
+        if self.trace_memory:
+            record["traced_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+        if self._month_acc is not None:
+            self._month_acc["wall_s"] += wall
+            if name == GENERATED_PHASE:
+                self._month_acc["events"] += events
+        if name == GENERATED_PHASE:
+            self._run_events += events
+        self._emit(record)
+
+    def _emit(self, record):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            self._file = open(self.log_path, "a", encoding="utf-8", buffering=1)
+        self._file.write(json.dumps({"year": self.year, **record}, default=str) + "\n")
+
+    def _start_profiler(self):
+        if self.profile == "cprofile":
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return profiler
+        if self.profile == "pyinstrument":
+            from pyinstrument import Profiler
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+        return None
+
+    def _stop_profiler(self, profiler, phase_name):
+        if profiler is None:
+            return
+        stem = os.path.join(self.profile_dir, f"{self._month or 'run'}_{phase_name}")
+        if self.profile == "cprofile":
+            profiler.disable()
+            profiler.dump_stats(f"{stem}.prof")
+        else:
+            profiler.stop()
+            with open(f"{stem}.html", "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+
+
+# ─────────────────────────────────────────────────────────
+#  CLI WIRING (shared by runner.py / runner_y2.py)
+# ─────────────────────────────────────────────────────────
+
+def add_cli_args(parser):
+    parser.add_argument(
+        "--metrics",
+        default=None,
+        help=f"JSON-lines metrics path (default {METRICS_DIR}/<year>_<timestamp>.jsonl).",
+    )
+    parser.add_argument("--no-metrics", action="store_true", help="Disable instrumentation.")
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Record tracemalloc peak per phase (noticeably slower).",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["cprofile", "pyinstrument"],
+        default=None,
+        help=f"Dump a profile per month/phase to {METRICS_DIR}/profile/<year>/.",
+    )
+
+
+def from_args(args, year):
+    if args.no_metrics:
+        return Instrumentation.disabled()
+    path = args.metrics or os.path.join(
+        METRICS_DIR, f"{year}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    )
+    return Instrumentation(year, path, trace_memory=args.trace_memory, profile=args.profile)
@@ -1,5 +1,8 @@
+import argparse
+
 import numpy as np
 from .chaos import apply_chaos
+from . import instrument
 from .config import (
     INITIAL_USERS,
     MAX_NEW_USERS,
@@ -10,55 +13,67 @@ from .config import (
 from .lifecycle import generate_user_lifecycle, generate_users_snapshot
 from .writer import write_parquet
 
-def run_pipeline():
+def run_pipeline(instr=None):
+    instr = instr or instrument.Instrumentation.disabled()
     np.random.seed(RANDOM_SEED)
 
     print(f"Generating initial users: {INITIAL_USERS}")
-    users = generate_user_lifecycle(INITIAL_USERS, start_month=MONTH_RANGE[0])
+    with instr.phase("new_users", events=INITIAL_USERS):
+        users = generate_user_lifecycle(INITIAL_USERS, start_month=MONTH_RANGE[0])
 
     for idx, current_month in enumerate(MONTH_RANGE):
+        instr.start_month(current_month.strftime('%Y-%m'))
 
         # 1. Add New Users Monthly
         if idx > 0:
             new_users_count = int(np.random.randint(MIN_NEW_USERS, MAX_NEW_USERS + 1))
-            new_users = generate_user_lifecycle(new_users_count, start_month=current_month)
+            with instr.phase("new_users", events=new_users_count):
+                new_users = generate_user_lifecycle(new_users_count, start_month=current_month)
             users.extend(new_users)
             print(f"[{current_month.strftime('%Y-%m')}] Added new users: {new_users_count}")
 
         month_subs, month_pays, month_prods = [], [], []
 
         # 2. Process Monthly Lifecycle for Each User
-        for user in users:
-            user.process_month(current_month)
-            subs, pays, prods = user.collect_and_reset_monthly_events()
-            month_subs.extend(subs)
-            month_pays.extend(pays)
-            month_prods.extend(prods)
+        with instr.phase("lifecycle") as phase:
+            for user in users:
+                user.process_month(current_month)
+                subs, pays, prods = user.collect_and_reset_monthly_events()
+                month_subs.extend(subs)
+                month_pays.extend(pays)
+                month_prods.extend(prods)
+            phase.events = len(month_subs) + len(month_pays) + len(month_prods)
 
         # 3. Apply Chaos
-        month_subs = apply_chaos(
-            month_subs,
-            current_month=current_month,
-            dataset_name="subscription_events",
-            ts_field="event_timestamp_utc",
-        )
-        month_prods = apply_chaos(
-            month_prods,
-            current_month=current_month,
-            dataset_name="product_events",
-            ts_field="event_timestamp_utc",
-        )
-        month_pays = apply_chaos(
-            month_pays,
-            current_month=current_month,
-            dataset_name="payments",
-            ts_field="payment_timestamp_utc",
-        )
+        with instr.phase("chaos.subscription_events", events=len(month_subs)):
+            month_subs = apply_chaos(
+                month_subs,
+                current_month=current_month,
+                dataset_name="subscription_events",
+                ts_field="event_timestamp_utc",
+            )
+        with instr.phase("chaos.product_events", events=len(month_prods)):
+            month_prods = apply_chaos(
+                month_prods,
+                current_month=current_month,
+                dataset_name="product_events",
+                ts_field="event_timestamp_utc",
+            )
+        with instr.phase("chaos.payments", events=len(month_pays)):
+            month_pays = apply_chaos(
+                month_pays,
+                current_month=current_month,
+                dataset_name="payments",
+                ts_field="payment_timestamp_utc",
+            )
 
         # 4. ✅ Tulis langsung per bulan, tidak numpuk di memory
-        write_parquet(month_subs, "subscription_events", ts_field="event_timestamp_utc")
-        write_parquet(month_prods, "product_events", ts_field="event_timestamp_utc")
-        write_parquet(month_pays, "payments", ts_field="payment_timestamp_utc")
+        with instr.phase("write.subscription_events", events=len(month_subs)):
+            write_parquet(month_subs, "subscription_events", ts_field="event_timestamp_utc")
+        with instr.phase("write.product_events", events=len(month_prods)):
+            write_parquet(month_prods, "product_events", ts_field="event_timestamp_utc")
+        with instr.phase("write.payments", events=len(month_pays)):
+            write_parquet(month_pays, "payments", ts_field="payment_timestamp_utc")
 
         print(
             f"[{current_month.strftime('%Y-%m')}] month events -> "
@@ -73,11 +88,17 @@ def run_pipeline():
             f"Active: {active_users} | "
             f"Churned: {churned_users}"
         )
+        instr.end_month(users=len(users), active=active_users, churned=churned_users)
 
     # 5. Snapshot Users (tetap di akhir — ini memang hanya sekali)
-    write_parquet(generate_users_snapshot(users), "users", ts_field="created_at_utc")
+    with instr.phase("write.users", events=len(users)):
+        write_parquet(generate_users_snapshot(users), "users", ts_field="created_at_utc")
 
+    instr.close()
     print("Pipeline Done.")
 
 if __name__ == "__main__":
-    run_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    instrument.add_cli_args(parser)
+    args = parser.parse_args()
+    run_pipeline(instr=instrument.from_args(args, "y1"))
\ No newline at end of file
@@ -0,0 +1,290 @@
+"""
+End-to-end benchmark of the local pipeline: generate → init → ingest → test → dbt.
+
+Every stage runs as its own process inside a scratch working directory
+(so data/raw starts empty) against a throwaway Postgres database that is
+created on the configured server and dropped afterwards. Per stage we record
+wall time, rows and rows/s, and peak RSS; dbt stages also report per-model
+timings from target/run_results.json. The ingest stage counts the rows that
+landed in the raw schema and fails when they differ from the Parquet files.
+
+    python -m src.utils.bench --scale 1
+    python -m src.utils.bench --scale 4 --stages generate,ingest --keep-db
+
+One JSON report per run lands in data/bench/pipeline_<timestamp>.json.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+
+PROJECT_DIR = Path(__file__).resolve().parents[2]
+DBT_DIR = PROJECT_DIR / "dbt"
+REPORT_DIR = PROJECT_DIR / "data" / "bench"
+
+STAGES = {
+    "generate": [sys.executable, "-m", "src.generator.runner"],
+    "init": [sys.executable, "-m", "src.utils.init_db"],
+    "ingest": [sys.executable, "-m", "src.ingestion.ingest"],
+    "test": [sys.executable, "-m", "src.generator.test"],
+    "dbt_run": ["dbt", "run"],
+    "dbt_test": ["dbt", "test"],
+}
+DBT_STAGES = {"dbt_run", "dbt_test"}
+DB_STAGES = {"init", "ingest"} | DBT_STAGES
+
+PROFILE_TEMPLATE = """saas_sim:
+  target: bench
+  outputs:
+    bench:
+      type: postgres
+      host: "{host}"
+      port: {port}
+      user: "{user}"
+      password: "{password}"
+      dbname: "{dbname}"
+      schema: public
+      threads: 4
+"""
+
+
+# =========================================================
+# DISPOSABLE DATABASE
+# =========================================================
+def create_bench_db(name):
+    """Create an empty database next to DB_NAME on the configured server."""
+    from sqlalchemy import text
+    from src.utils.db import get_engine
+
+    engine = get_engine().execution_options(isolation_level="AUTOCOMMIT")
+    with engine.connect() as conn:
+        conn.execute(text(f'CREATE DATABASE "{name}"'))
+    engine.dispose()
+
+
+def drop_bench_db(name):
+    from sqlalchemy import text
+    from src.utils.db import get_engine
+
+    engine = get_engine().execution_options(isolation_level="AUTOCOMMIT")
+    with engine.connect() as conn:
+        conn.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+    engine.dispose()
+
+
+def count_raw_rows(db_name, tables):
+    """Rows per table in the bench database's raw schema (0 if it was never created)."""
+    from sqlalchemy import create_engine, inspect, text
+    from sqlalchemy.engine import make_url
+    from src.utils.db import get_db_url
+
+    engine = create_engine(make_url(get_db_url()).set(database=db_name))
+    rows = {}
+    with engine.connect() as conn:
+        existing = set(inspect(conn).get_table_names(schema="raw"))
+        for table in tables:
+            rows[table] = (
+                conn.execute(text(f'SELECT count(*) FROM raw."{table}"')).scalar() if table in existing else 0
+            )
+    engine.dispose()
+    return rows
+
+
+def write_dbt_profile(profiles_dir, dbname):
+    profiles_dir.mkdir(parents=True, exist_ok=True)
+    (profiles_dir / "profiles.yml").write_text(PROFILE_TEMPLATE.format(
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        dbname=dbname,
+    ))
+
+
+# =========================================================
+# STAGE RUNNER
+# =========================================================
+def run_stage(name, cmd, workdir, env, stdin=None):
+    """
+    Run one stage as a child process and wait4() it, which gives that
+    child's own peak RSS (RUSAGE_CHILDREN would only give the running max).
+    """
+    log_path = workdir / "logs" / f"{name}.log"
+    log_path.parent.mkdir(exist_ok=True)
+
+    with open(log_path, "w") as log:
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            cmd, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT,
+            stdin=subprocess.PIPE if stdin else subprocess.DEVNULL, text=True,
+        )
+        if stdin:
+            proc.stdin.write(stdin)
+            proc.stdin.close()
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - started
+    proc.returncode = os.waitstatus_to_exitcode(status)
+
+    return {
+        "stage": name,
+        "exit_code": proc.returncode,
+        "wall_s": round(wall, 3),
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),   # ru_maxrss is KiB on Linux
+        "log": str(log_path),
+    }
+
+
+def count_parquet_rows(root):
+    """Rows per dataset under data/raw, read from Parquet footers only."""
+    rows = {}
+    for path in Path(root).rglob("*.parquet"):
+        dataset = path.relative_to(root).parts[0]
+        rows[dataset] = rows.get(dataset, 0) + pq.ParquetFile(path).metadata.num_rows
+    return rows
+
+
+def read_run_results(target_dir):
+    """Per-model timings from dbt's run_results.json."""
+    path = target_dir / "run_results.json"
+    if not path.exists():
+        return []
+    with open(path) as f:
+        results = json.load(f)["results"]
+    return [
+        {
+            "unique_id": r["unique_id"],
+            "status": r["status"],
+            "execution_time_s": round(r["execution_time"], 3),
+            "rows_affected": (r.get("adapter_response") or {}).get("rows_affected"),
+        }
+        for r in sorted(results, key=lambda r: -r["execution_time"])
+    ]
+
+
+# =========================================================
+# BENCH
+# =========================================================
+def stage_ok(result):
+    return result["exit_code"] == 0 and not result.get("error")
+
+
+def run_bench(scale, stages, keep_db=False):
+    # DB_* come from .env; the dbt profile and the stage env are built from them below
+    load_dotenv()
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    db_name = f"saas_sim_bench_{stamp}"
+    needs_db = any(s in DB_STAGES for s in stages)
+    workdir = Path(tempfile.mkdtemp(prefix="saas_bench_"))
+
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(PROJECT_DIR),
+        "SIM_SCALE_FACTOR": str(scale),
+        "DB_NAME": db_name,
+    }
+    if any(s in DBT_STAGES for s in stages):
+        write_dbt_profile(workdir / "profiles", db_name)
+
+    print(f" Bench run {stamp} | scale {scale} | workdir {workdir}")
+    if needs_db:
+        print(f" Creating disposable database: {db_name}")
+        create_bench_db(db_name)
+
+    report = {
+        "run_id": stamp,
+        "scale_factor": scale,
+        "database": db_name if needs_db else None,
+        "workdir": str(workdir),
+        "stages": [],
+        "dbt_models": {},
+    }
+    rows = {}
+
+    try:
+        for name in stages:
+            cmd = list(STAGES[name])
+            if name in DBT_STAGES:
+                cmd += [
+                    "--project-dir", str(DBT_DIR),
+                    "--profiles-dir", str(workdir / "profiles"),
+                    "--target-path", str(workdir / "dbt_target"),
+                ]
+            # init_db asks for confirmation before dropping schemas
+            result = run_stage(name, cmd, workdir, env, stdin="yes\n" if name == "init" else None)
+
+            if name == "generate":
+                rows = count_parquet_rows(workdir / "data" / "raw")
+                result["rows"] = sum(rows.values())
+                result["rows_by_dataset"] = rows
+            elif name == "ingest":
+                # ingest.py logs and skips files it cannot load, so count what actually landed
+                expected = rows or count_parquet_rows(workdir / "data" / "raw")
+                loaded = count_raw_rows(db_name, expected)
+                result["rows"] = sum(loaded.values())
+                result["rows_by_dataset"] = loaded
+                missing = {t: n - loaded[t] for t, n in expected.items() if loaded[t] != n}
+                if missing:
+                    result["error"] = f"raw row counts differ from Parquet (missing rows per table: {missing})"
+            elif name in DBT_STAGES:
+                models = read_run_results(workdir / "dbt_target")
+                report["dbt_models"][name] = models
+                result["rows"] = sum(m["rows_affected"] or 0 for m in models)
+
+            if result.get("rows"):
+                result["rows_per_s"] = round(result["rows"] / result["wall_s"], 1)
+
+            report["stages"].append(result)
+            print(
+                f"  {name:<10} {result['wall_s']:>9.2f}s  "
+                f"{result.get('rows', 0):>10} rows  "
+                f"{result.get('rows_per_s', 0):>11.1f} rows/s  "
+                f"{result['peak_rss_mb']:>8.1f} MB peak"
+                + ("" if result["exit_code"] == 0 else f"  FAILED (exit {result['exit_code']}, see {result['log']})")
+                + (f"  FAILED ({result['error']})" if result.get("error") else "")
+            )
+            if not stage_ok(result):
+                break
+
+            if name in DBT_STAGES:
+                for m in report["dbt_models"][name][:5]:
+                    print(f"      {m['execution_time_s']:>7.2f}s  {m['unique_id']}")
+    finally:
+        if needs_db and not keep_db:
+            print(f" Dropping disposable database: {db_name}")
+            drop_bench_db(db_name)
+
+    REPORT_DIR.mkdir(parents=True, exist_ok=True)
+    report_path = REPORT_DIR / f"pipeline_{stamp}.json"
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f" Report written to {report_path}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the local pipeline end to end.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier on user volumes (default 1).")
+    parser.add_argument(
+        "--stages",
+        default=",".join(STAGES),
+        help=f"Comma-separated subset of: {', '.join(STAGES)}",
+    )
+    parser.add_argument("--keep-db", action="store_true", help="Keep the bench database for inspection.")
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"Unknown stages: {unknown}")
+
+    report = run_bench(args.scale, stages, keep_db=args.keep_db)
+    sys.exit(0 if all(stage_ok(s) for s in report["stages"]) else 1)
@@ -3,6 +3,8 @@ saas_platform_pipeline.py
 ─────────────────────────
 Orchestrates the full Y2 SaaS data pipeline:
 
+  generate_month  (one month of Y2 data → R2, from the previous checkpoint)
+        ↓
   ingest_r2_to_snowflake
         ↓
   dbt_run_staging
@@ -122,6 +124,22 @@ with DAG(
     on_success_callback=send_telegram_success,     # per DAG run
 ) as dag:
 
+    # ── TASK 0: Generate this run's month → R2 ────────────
+    # data_interval_start is the month being closed (run on 08-01 → 2025-07).
+    # Population state lives in data/checkpoints/y2 on the project mount;
+    # a retry replaces the month's files instead of duplicating them.
+    # With catchup=False most intervals fall outside the simulated 2025
+    # calendar: --skip-out-of-range exits 0 so ingest and dbt still run on
+    # what is already in R2. An in-range month whose previous month has no
+    # checkpoint fails the task.
+    generate_month = BashOperator(
+        task_id="generate_month",
+        bash_command=(
+            f"cd {PROJECT_DIR} && python -m src.generator.runner_y2 "
+            "--month {{ data_interval_start.strftime('%Y-%m') }} --sink r2 --skip-out-of-range"
+        ),
+    )
+
     # ── TASK 1: Ingest R2 → Snowflake RAW ─────────────────
     ingest = BashOperator(
         task_id="ingest_r2_to_snowflake",
@@ -164,7 +182,8 @@ with DAG(
 
     # ── Dependencies ───────────────────────────────────────
     (
-        ingest
+        generate_month
+        >> ingest
         >> dbt_run_staging
         >> dbt_test_staging
         >> dbt_run_foundation
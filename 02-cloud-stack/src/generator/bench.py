@@ -0,0 +1,389 @@
+"""
+bench.py
+────────
+Micro-benchmarks for the generator hot paths, with fixed seeds and named
+scale points, so a change to lifecycle / events / chaos / writer can be
+checked for slowdowns.
+
+Usage
+-----
+    python -m src.generator.bench run --scale 1k                 # → data/bench/generator_1k.json
+    python -m src.generator.bench run --scale y2_viral --only 'chaos*'
+    python -m src.generator.bench compare data/bench/baseline_1k.json data/bench/generator_1k.json
+
+Save a baseline by copying a results file; `compare` exits 1 when any
+benchmark's ns/op regresses by more than --threshold (default 10%).
+
+Scale points
+────────────
+    1k        1,000 users    /    10,000 events      (~20 s per repeat)
+    100k      100,000 users  /  1,000,000 events     (~30 min per repeat)
+    1m        1,000,000 users / 10,000,000 events    (~5 h per repeat)
+    y2_viral  Y2 M12 volume: ~5,400 users / 125,000 product events
+
+process_month costs ~6 ms per user, so at 1m each of the two process_month
+benchmarks alone takes ~1.5 h. --repeat defaults to 3, and to 1 from
+100k users up.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from . import chaos, chaos_y2, events, runner_y2, writer
+from .config import COUNTRY_TIMEZONE_MAP, RANDOM_SEED, START_MONTH
+from .config_y2 import START_MONTH_Y2
+from .lifecycle import UserLifecycle, generate_user_lifecycle
+from .lifecycle_y2 import UserLifecycleY2
+
+SCALES = {
+    "1k":       {"users": 1_000,     "events": 10_000},
+    "100k":     {"users": 100_000,   "events": 1_000_000},
+    "1m":       {"users": 1_000_000, "events": 10_000_000},
+    "y2_viral": {"users": 5_400,     "events": 125_000},
+}
+
+# Building users through __init__ costs three Faker instances each; that path
+# is benchmarked on its own, capped so large scales finish in reasonable time.
+CREATE_USERS_CAP = 2_000
+
+DEFAULT_REPEAT     = 3
+LARGE_SCALE_USERS  = 100_000   # from here on one repeat is the default
+
+BENCH_OUTPUT_DIR = "data/bench"
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """
+    Register fn(scale) → (timed_fn, n_ops). n_ops may be a callable, read
+    after the timed run, when ops are only counted as they happen.
+    """
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+def _seed():
+    np.random.seed(RANDOM_SEED)
+    random.seed(RANDOM_SEED)
+
+
+# ─────────────────────────────────────────────────────────
+#  FIXTURES (untimed)
+# ─────────────────────────────────────────────────────────
+
+_STATE_MIX = {
+    # plan slot → (Y1 plan, Y2 plan, status, weight)
+    "trial":    ("Trial",    "Trial",      "Active",  0.20),
+    "free":     ("Free",     "Starter",    "Active",  0.25),
+    "mid":      ("Pro",      "Growth",     "Active",  0.25),
+    "top":      ("Business", "Enterprise", "Active",  0.10),
+    "canceled": ("Canceled", "Canceled",   "Churned", 0.15),
+    "expired":  ("Expired",  "Expired",    "Churned", 0.05),
+}
+
+
+def make_users(cls, n, month):
+    """
+    Population with a realistic plan/status mix, built with restore() (no
+    Faker, no RNG draws) so process_month can be timed at 1M users.
+    """
+    rng       = np.random.default_rng(RANDOM_SEED)
+    slots     = list(_STATE_MIX.values())
+    picks     = rng.choice(len(slots), size=n, p=[s[3] for s in slots])
+    countries = list(COUNTRY_TIMEZONE_MAP)
+    cidx      = rng.integers(0, len(countries), size=n)
+    y2        = cls is UserLifecycleY2
+
+    users = []
+    for i in range(n):
+        plan_y1, plan_y2, status, _ = slots[picks[i]]
+        country = countries[cidx[i]]
+        users.append(cls.restore(
+            str(uuid.UUID(int=i)), country, COUNTRY_TIMEZONE_MAP[country], month,
+            plan_y2 if y2 else plan_y1, status, "", "", "organic",
+        ))
+    return users
+
+
+def make_events(n, month, kind="product"):
+    """n event dicts shaped like the generator's output for `kind`."""
+    rng     = np.random.default_rng(RANDOM_SEED)
+    start   = int(month.timestamp())
+    end     = int((month + pd.DateOffset(months=1)).timestamp()) - 1
+    local   = pd.to_datetime(rng.integers(start, end, size=n), unit="s")
+    utc     = local + pd.to_timedelta(rng.integers(-9, 6, size=n), unit="h")
+    bm      = month.strftime("%Y-%m")
+    plans   = np.array(["Trial", "Free", "Pro", "Business"])[rng.integers(0, 4, size=n)]
+    out     = []
+    if kind == "payment":
+        for i in range(n):
+            out.append({
+                "payment_id":              f"p{i:031x}",
+                "user_id":                 f"{i % 50_000:032x}",
+                "amount_usd":              15,
+                "status":                  "success",
+                "attempt_number":          1,
+                "payment_timestamp_local": local[i],
+                "payment_timestamp_utc":   utc[i],
+                "batch_month":             bm,
+            })
+        return out
+    for i in range(n):
+        out.append({
+            "event_id":              f"e{i:031x}",
+            "user_id":               f"{i % 50_000:032x}",
+            "event_type":            "product_usage",
+            "plan":                  str(plans[i]),
+            "event_timestamp_local": local[i],
+            "event_timestamp_utc":   utc[i],
+            "batch_month":           bm,
+        })
+    return out
+
+
+# ─────────────────────────────────────────────────────────
+#  BENCHMARKS
+# ─────────────────────────────────────────────────────────
+
+@benchmark("lifecycle.create_users")
+def bench_create_users(scale):
+    n = min(scale["users"], CREATE_USERS_CAP)
+    return lambda: generate_user_lifecycle(n, start_month=START_MONTH), n
+
+
+def _process_month(cls, month, scale):
+    users = make_users(cls, scale["users"], month)
+
+    def run():
+        for u in users:
+            u.process_month(month)
+            u.collect_and_reset_monthly_events()
+    return run, len(users)
+
+
+@benchmark("lifecycle.process_month")
+def bench_process_month(scale):
+    return _process_month(UserLifecycle, START_MONTH + pd.DateOffset(months=3), scale)
+
+
+@benchmark("lifecycle_y2.process_month")
+def bench_process_month_y2(scale):
+    return _process_month(UserLifecycleY2, START_MONTH_Y2 + pd.DateOffset(months=9), scale)
+
+
+@benchmark("events.generate_product_events")
+def bench_generate_product_events(scale):
+    """ns per generated event: each call draws uniform(1, limit) events."""
+    limit    = 100
+    n_calls  = max(1, scale["events"] // (limit // 2))   # ~limit/2 events per call
+    produced = [0]
+
+    def run():
+        produced[0] = sum(
+            len(events.generate_product_events(f"{i:032x}", "Pro", START_MONTH, limit, "Asia/Tokyo"))
+            for i in range(n_calls)
+        )
+    return run, lambda: produced[0]
+
+
+@benchmark("events.local_to_utc")
+def bench_local_to_utc(scale):
+    n      = scale["events"]
+    stamps = make_events(n, START_MONTH)
+    zones  = list(COUNTRY_TIMEZONE_MAP.values())
+
+    def run():
+        for i, e in enumerate(stamps):
+            events.local_to_utc(e["event_timestamp_local"], zones[i % len(zones)])
+    return run, n
+
+
+def _chaos_bench(fn, kind="product", **kwargs):
+    def build(scale):
+        data = make_events(scale["events"], START_MONTH, kind)
+        return lambda: fn(data, **kwargs), len(data)
+    return build
+
+
+_CHAOS_BENCHES = {
+    "chaos.inject_late_events":            _chaos_bench(chaos.inject_late_events),
+    "chaos.inject_duplicates":             _chaos_bench(chaos.inject_duplicates, kind="payment"),
+    "chaos.apply_chaos[rename_plan]":      _chaos_bench(
+        chaos.apply_chaos, current_month=START_MONTH + pd.DateOffset(months=5),
+        dataset_name="product_events"),
+    "chaos.apply_chaos[datatype_change]":  _chaos_bench(
+        chaos.apply_chaos, kind="payment", current_month=START_MONTH + pd.DateOffset(months=11),
+        dataset_name="payments", ts_field="payment_timestamp_utc"),
+    "chaos_y2.inject_plan_migration":      _chaos_bench(chaos_y2.inject_plan_migration),
+    "chaos_y2.inject_referral_noise":      _chaos_bench(chaos_y2.inject_referral_noise),
+    "chaos_y2.inject_timestamp_collision": _chaos_bench(chaos_y2.inject_timestamp_collision),
+    "chaos_y2.inject_null_spike":          _chaos_bench(chaos_y2.inject_null_spike),
+    "chaos_y2.apply_chaos_y2[viral_spike]": _chaos_bench(
+        chaos_y2.apply_chaos_y2, current_month=START_MONTH_Y2 + pd.DateOffset(months=9),
+        dataset_name="product_events"),
+}
+for _name, _build in _CHAOS_BENCHES.items():
+    benchmark(_name)(_build)
+
+
+def _write_bench(write, module, path_attr, month):
+    def build(scale):
+        data = make_events(scale["events"], month)
+        tmp  = tempfile.mkdtemp(prefix="bench_writer_")
+
+        def run():
+            original = getattr(module, path_attr)
+            setattr(module, path_attr, tmp)
+            try:
+                write(data, "product_events", ts_field="event_timestamp_utc")
+            finally:
+                setattr(module, path_attr, original)
+                shutil.rmtree(tmp, ignore_errors=True)
+        return run, len(data)
+    return build
+
+
+benchmark("writer.write_parquet")(
+    _write_bench(writer.write_parquet, writer, "BASE_OUTPUT_PATH", START_MONTH))
+benchmark("runner_y2.write_parquet_y2")(
+    _write_bench(runner_y2.write_parquet_y2, runner_y2, "BASE_OUTPUT_PATH_Y2", START_MONTH_Y2))
+
+
+# ─────────────────────────────────────────────────────────
+#  RUN / COMPARE
+# ─────────────────────────────────────────────────────────
+
+def _git_rev():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def default_repeat(scale_name):
+    return 1 if SCALES[scale_name]["users"] >= LARGE_SCALE_USERS else DEFAULT_REPEAT
+
+
+def run_benchmarks(scale_name, only=None, repeat=None):
+    """Best-of-`repeat` timing per benchmark; fixtures are rebuilt (and reseeded) per repeat."""
+    scale   = SCALES[scale_name]
+    repeat  = repeat or default_repeat(scale_name)
+    results = []
+    for name, build in BENCHMARKS.items():
+        if only and not fnmatch.fnmatch(name, only):
+            continue
+        best, n = None, 0
+        for _ in range(repeat):
+            _seed()
+            fn, n = build(scale)
+            _seed()
+            with open(os.devnull, "w") as devnull:
+                stdout, sys.stdout = sys.stdout, devnull   # writers print per call
+                try:
+                    started = time.perf_counter()
+                    fn()
+                    elapsed = time.perf_counter() - started
+                finally:
+                    sys.stdout = stdout
+            if callable(n):
+                n = n()
+            best = elapsed if best is None else min(best, elapsed)
+        results.append({
+            "name":      name,
+            "n":         n,
+            "seconds":   round(best, 6),
+            "ns_per_op": round(best / n * 1e9, 1),
+        })
+        print(f"  {name:<40} n={n:<10} {best:>9.3f}s  {best / n * 1e9:>12.1f} ns/op")
+
+    return {
+        "meta": {
+            "scale":     scale_name,
+            **scale,
+            "seed":      RANDOM_SEED,
+            "repeat":    repeat,
+            "git_rev":   _git_rev(),
+            "python":    platform.python_version(),
+            "numpy":     np.__version__,
+            "pandas":    pd.__version__,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline_path, current_path, threshold=0.10):
+    """Print ns/op ratios; return the names that regressed by more than threshold."""
+    with open(baseline_path) as f:
+        base = {r["name"]: r for r in json.load(f)["results"]}
+    with open(current_path) as f:
+        curr = {r["name"]: r for r in json.load(f)["results"]}
+
+    regressed = []
+    print(f"{'benchmark':<40} {'base ns/op':>12} {'curr ns/op':>12} {'ratio':>7}")
+    for name in sorted(set(base) | set(curr)):
+        if name not in base or name not in curr:
+            print(f"{name:<40} {'(only in ' + ('baseline' if name in base else 'current') + ')':>33}")
+            continue
+        b, c  = base[name]["ns_per_op"], curr[name]["ns_per_op"]
+        ratio = c / b if b else float("inf")
+        flag  = ""
+        if ratio > 1 + threshold:
+            flag = "  ← slower"
+            regressed.append(name)
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{name:<40} {b:>12.1f} {c:>12.1f} {ratio:>6.2f}x{flag}")
+    return regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    sub    = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="Run the benchmark suite at one scale point.")
+    run_p.add_argument("--scale", choices=list(SCALES), default="1k")
+    run_p.add_argument("--only", default=None, help="Glob on benchmark names, e.g. 'chaos*'.")
+    run_p.add_argument("--repeat", type=int, default=None,
+                       help=f"Best-of-N timing (default {DEFAULT_REPEAT}; 1 from {LARGE_SCALE_USERS:,} users up).")
+    run_p.add_argument("--out", default=None, help="Results JSON (default data/bench/generator_<scale>.json).")
+
+    cmp_p = sub.add_parser("compare", help="Compare a results file against a saved baseline.")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("current")
+    cmp_p.add_argument("--threshold", type=float, default=0.10)
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        print(f"Running generator benchmarks at scale '{args.scale}'...")
+        report = run_benchmarks(args.scale, only=args.only, repeat=args.repeat)
+        out    = args.out or os.path.join(BENCH_OUTPUT_DIR, f"generator_{args.scale}.json")
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        with open(out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {out}")
+    else:
+        regressed = compare(args.baseline, args.current, args.threshold)
+        if regressed:
+            print(f"\n{len(regressed)} benchmark(s) regressed more than {args.threshold:.0%}.")
+            sys.exit(1)
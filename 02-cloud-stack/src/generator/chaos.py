@@ -52,10 +52,13 @@ def inject_duplicates(events: list, duplicate_rate: float = DUPLICATE_RATE) -> l
     return duplicated
 
 
-def apply_chaos(events, current_month, dataset_name, ts_field="event_timestamp_utc"):
+def apply_chaos(events, current_month, dataset_name, ts_field="event_timestamp_utc", month_idx=None,
+                schedule=None):
     """
     The main orchestrator that decides which 'Chaos Scenario' to trigger
     based on the current month in the simulation timeline.
+    `month_idx` (1-based, within the year) defaults to the Y1 calendar.
+    `schedule` ({month_idx: chaos name}) defaults to CHAOS_EVENTS.
     
     Returns a NEW list with chaos applied.
     """
@@ -69,7 +72,8 @@ def apply_chaos(events, current_month, dataset_name, ts_field="event_timestamp_u
     events = inject_late_events(events, ts_field=ts_field)
 
     # Identify if there is a specific scheduled chaos event for this month
-    chaos_name = CHAOS_EVENTS.get(get_month_index(current_month))
+    schedule   = CHAOS_EVENTS if schedule is None else schedule
+    chaos_name = schedule.get(month_idx or get_month_index(current_month))
 
     # 2. DATA EVOLUTION: Renaming a categorical value (Simulates product change)
     if chaos_name == "rename_plan":
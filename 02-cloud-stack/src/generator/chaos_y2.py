@@ -1,11 +1,8 @@
 import copy
 import random
-import pandas as pd
 
-from .config_y2 import CHAOS_EVENTS_Y2, LATE_ARRIVING_PROB, DIRTY_PLAN_VARIANTS, get_month_index_y2
-
-DUPLICATE_RATE  = 0.02
-LATE_EVENT_RATE = LATE_ARRIVING_PROB
+from .chaos import inject_duplicates, inject_late_events   # always-on injectors are shared with Y1
+from .config_y2 import CHAOS_EVENTS_Y2, DIRTY_PLAN_VARIANTS, get_month_index_y2
 
 # Old plan → new plan mapping (used in migration chaos)
 Y1_TO_Y2_PLAN_MAP = {
@@ -16,36 +13,6 @@ Y1_TO_Y2_PLAN_MAP = {
 }
 
 
-# ──────────────────────────────────────────────────────────
-#  ALWAYS-ON INJECTORS
-# ──────────────────────────────────────────────────────────
-
-def inject_late_events(events, ts_field="event_timestamp_utc"):
-    """Always-on: randomly delay a small % of events by 1 month."""
-    if not events:
-        return []
-    events_copy = copy.deepcopy(events)
-    n = int(len(events_copy) * LATE_EVENT_RATE)
-    if n == 0:
-        return events_copy
-    idxs = random.sample(range(len(events_copy)), n)
-    for i in idxs:
-        events_copy[i][ts_field] = events_copy[i][ts_field] + pd.DateOffset(months=1)
-    return events_copy
-
-
-def inject_duplicates(events: list, duplicate_rate: float = DUPLICATE_RATE) -> list:
-    """Simulate retry logic / upstream glitch duplicates."""
-    if not events:
-        return []
-    duplicated = []
-    for event in events:
-        duplicated.append(copy.deepcopy(event))
-        if random.random() < duplicate_rate:
-            duplicated.append(copy.deepcopy(event))
-    return duplicated
-
-
 # ──────────────────────────────────────────────────────────
 #  CHAOS 1 — PLAN MIGRATION (M3, always-on after that)
 #  Plan names AND prices changed. Migration script was messy:
@@ -143,9 +110,10 @@ def inject_null_spike(events, field="plan", null_rate=0.12):
 #  MAIN ORCHESTRATOR
 # ──────────────────────────────────────────────────────────
 
-def apply_chaos_y2(events, current_month, dataset_name, ts_field="event_timestamp_utc"):
+def chaos_plan_y2(month_idx, dataset_name, ts_field="event_timestamp_utc", schedule=None):
     """
-    Year 2 chaos orchestrator.
+    Year 2 chaos for one month of one dataset, as a list of (injector, kwargs)
+    applied in order.
 
     Always-on
     ─────────
@@ -158,42 +126,59 @@ def apply_chaos_y2(events, current_month, dataset_name, ts_field="event_timestam
     M8  referral_noise : referral campaign launches, noisy referral_code field
     M10 viral_spike    : timestamp collision + null spike on plan
     M12 compounding    : referral noise peaks + null spike intensifies
-    """
-    if not events:
-        return []
-
-    events = copy.deepcopy(events)
-    month_idx = get_month_index_y2(current_month)
 
+    `schedule` ({month_idx: chaos name}) defaults to CHAOS_EVENTS_Y2. Kept as
+    data so a run cache can tell which months a schedule change touches.
+    """
     # ── Always-on ───────────────────────────────────────────
-    events = inject_late_events(events, ts_field=ts_field)
+    plan = [(inject_late_events, {"ts_field": ts_field})]
 
     # Plan migration noise kicks in from M3 and persists
     if month_idx >= 3:
-        events = inject_plan_migration(events)
+        plan.append((inject_plan_migration, {}))
 
     # ── Scheduled ───────────────────────────────────────────
-    chaos_name = CHAOS_EVENTS_Y2.get(month_idx)
+    chaos_name = (CHAOS_EVENTS_Y2 if schedule is None else schedule).get(month_idx)
 
     if chaos_name == "plan_migration":
         # M3: migration is extra dirty on the day it runs
-        events = inject_plan_migration(events, dirty_rate=0.30, stale_rate=0.25)
+        plan.append((inject_plan_migration, {"dirty_rate": 0.30, "stale_rate": 0.25}))
 
     elif chaos_name == "referral_noise":
         # M8: referral campaign goes live
-        events = inject_referral_noise(events, noise_rate=0.40)
+        plan.append((inject_referral_noise, {"noise_rate": 0.40}))
 
     elif chaos_name == "viral_spike":
         # M10: viral hit — batch flush artifacts + onboarding overwhelmed
-        events = inject_timestamp_collision(events, ts_field=ts_field, collision_rate=0.12)
-        events = inject_null_spike(events, field="plan", null_rate=0.15)
-        events = inject_referral_noise(events, noise_rate=0.50)  # referral explodes
+        plan += [
+            (inject_timestamp_collision, {"ts_field": ts_field, "collision_rate": 0.12}),
+            (inject_null_spike,          {"field": "plan", "null_rate": 0.15}),
+            (inject_referral_noise,      {"noise_rate": 0.50}),   # referral explodes
+        ]
 
     elif chaos_name == "compounding":
         # M12: all problems compound
-        events = inject_null_spike(events, field="plan", null_rate=0.10)
-        events = inject_referral_noise(events, noise_rate=0.55)
+        plan += [
+            (inject_null_spike,     {"field": "plan", "null_rate": 0.10}),
+            (inject_referral_noise, {"noise_rate": 0.55}),
+        ]
         if dataset_name == "payments":
-            events = inject_duplicates(events, duplicate_rate=0.04)
+            plan.append((inject_duplicates, {"duplicate_rate": 0.04}))
+
+    return plan
+
 
-    return events
\ No newline at end of file
+def apply_chaos_y2(events, current_month, dataset_name, ts_field="event_timestamp_utc", month_idx=None,
+                   schedule=None):
+    """
+    Year 2 chaos orchestrator: runs chaos_plan_y2 for the month.
+    `month_idx` (1-based, within the year) defaults to the Y2 calendar.
+    """
+    if not events:
+        return []
+
+    events = copy.deepcopy(events)
+    month_idx = month_idx or get_month_index_y2(current_month)
+    for injector, kwargs in chaos_plan_y2(month_idx, dataset_name, ts_field, schedule):
+        events = injector(events, **kwargs)
+    return events
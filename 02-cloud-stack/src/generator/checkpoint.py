@@ -0,0 +1,220 @@
+"""
+checkpoint.py
+─────────────
+Month-boundary checkpoints for run_pipeline_y2, so a run that dies in M11
+resumes from M10 instead of M1.
+
+    data/checkpoints/y2/
+        month_10/
+            users.parquet    population state (plan, status, failed_payments, identity)
+            state.json       month index, RNG states, files written that month
+        inflight.jsonl       keys written since the last complete month
+        finished             present once the users snapshot is written (its files, cache key)
+
+Every partition key is journaled *before* it is written, so on --resume the
+partial output of the interrupted month can be removed before that month is
+regenerated. With the RNG states restored, the resumed run writes the same
+rows as an uninterrupted one (file names still carry the write timestamp).
+"""
+
+import json
+import os
+import random
+import shutil
+
+import faker.generator
+import numpy as np
+import pandas as pd
+
+from .lifecycle_y2 import UserLifecycleY2
+
+CHECKPOINT_ROOT    = "data/checkpoints/y2"
+CHECKPOINT_VERSION = 1
+KEEP_CHECKPOINTS   = 2    # latest complete month + the one before it
+
+# UserLifecycleY2 attribute → column; event buffers are always empty at a month boundary
+USER_FIELDS = [
+    "user_id", "name", "email", "country", "timezone_str", "acquisition_channel",
+    "created_at", "current_plan", "status", "failed_payments",
+]
+
+
+# ─────────────────────────────────────────────────────────
+#  RNG STATE
+# ─────────────────────────────────────────────────────────
+
+def capture_rng_state() -> dict:
+    """numpy global RNG, stdlib random (chaos) and Faker's shared Random (uuids, names)."""
+    kind, keys, pos, has_gauss, cached = np.random.get_state()
+    py_version, py_internal, py_gauss  = random.getstate()
+    fk_version, fk_internal, fk_gauss  = faker.generator.random.getstate()
+    return {
+        "numpy":  [kind, keys.tolist(), pos, has_gauss, cached],
+        "python": [py_version, list(py_internal), py_gauss],
+        "faker":  [fk_version, list(fk_internal), fk_gauss],
+    }
+
+
+def restore_rng_state(state: dict):
+    kind, keys, pos, has_gauss, cached = state["numpy"]
+    np.random.set_state((kind, np.array(keys, dtype=np.uint32), pos, has_gauss, cached))
+    version, internal, gauss = state["python"]
+    random.setstate((version, tuple(internal), gauss))
+    version, internal, gauss = state["faker"]
+    faker.generator.random.setstate((version, tuple(internal), gauss))
+
+
+# ─────────────────────────────────────────────────────────
+#  POPULATION STATE
+# ─────────────────────────────────────────────────────────
+
+def users_to_frame(users) -> pd.DataFrame:
+    df = pd.DataFrame({field: [getattr(u, field) for u in users] for field in USER_FIELDS})
+    df["acquisition_channel"] = df["acquisition_channel"].astype(str)
+    df["failed_payments"]     = df["failed_payments"].astype("int16")
+    return df
+
+
+def users_from_frame(df: pd.DataFrame) -> list:
+    """Rebuild users without __init__ (no Faker, no RNG draws)."""
+    return [
+        UserLifecycleY2.restore(
+            row.user_id, row.country, row.timezone_str, pd.Timestamp(row.created_at),
+            row.current_plan, row.status, row.name, row.email, row.acquisition_channel,
+            failed_payments=int(row.failed_payments),
+        )
+        for row in df.itertuples(index=False)
+    ]
+
+
+# ─────────────────────────────────────────────────────────
+#  STORE
+# ─────────────────────────────────────────────────────────
+
+class CheckpointStore:
+    """Reads/writes month checkpoints and the in-flight write journal."""
+
+    def __init__(self, root: str = CHECKPOINT_ROOT, keep: int = KEEP_CHECKPOINTS):
+        self.root         = root
+        self.keep         = keep   # None keeps every month (the --cache run)
+        self.journal_path = os.path.join(root, "inflight.jsonl")
+
+    def _month_dir(self, month_num: int) -> str:
+        return os.path.join(self.root, f"month_{month_num:02d}")
+
+    def reset(self):
+        """Start a fresh run: drop checkpoints from any previous run."""
+        shutil.rmtree(self.root, ignore_errors=True)
+        os.makedirs(self.root, exist_ok=True)
+
+    # ── write journal ────────────────────────────────────
+    def journal(self, key: str):
+        """Record a partition key before it is written (append + flush)."""
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(key) + "\n")
+
+    def clear_journal(self):
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+    def inflight_keys(self) -> list:
+        if not os.path.exists(self.journal_path):
+            return []
+        with open(self.journal_path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    # ── month checkpoints ────────────────────────────────
+    def save(self, month_num: int, month: pd.Timestamp, users, extra: dict = None):
+        """Write users + state for a completed month, then clear the journal."""
+        final = self._month_dir(month_num)
+        tmp   = f"{final}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+
+        users_to_frame(users).to_parquet(os.path.join(tmp, "users.parquet"), index=False, engine="pyarrow")
+        state = {
+            "version":   CHECKPOINT_VERSION,
+            "month_num": month_num,
+            "month":     month.strftime("%Y-%m"),
+            "n_users":   len(users),
+            "files":     self.inflight_keys(),
+            "rng":       capture_rng_state(),
+            **(extra or {}),
+        }
+        with open(os.path.join(tmp, "state.json"), "w", encoding="utf-8") as f:
+            json.dump(state, f)
+
+        shutil.rmtree(final, ignore_errors=True)
+        os.replace(tmp, final)   # a month dir with state.json is always complete
+        self.clear_journal()
+        if self.keep is not None:
+            self._prune(keep_from=month_num - self.keep + 1)
+
+    def _prune(self, keep_from: int):
+        for name in os.listdir(self.root):
+            if name.startswith("month_") and not name.endswith(".tmp") and int(name[6:]) < keep_from:
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+    def attach_journal(self, month_num: int):
+        """Add keys journaled since save() to that month's files (the --month users snapshot)."""
+        path  = os.path.join(self._month_dir(month_num), "state.json")
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        state["files"] = state["files"] + [k for k in self.inflight_keys() if k not in state["files"]]
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(f"{path}.tmp", path)
+        self.clear_journal()
+
+    def finish(self, extra: dict = None):
+        """Mark the run complete (snapshot written) so --resume is a no-op."""
+        with open(os.path.join(self.root, "finished"), "w", encoding="utf-8") as f:
+            json.dump({"files": self.inflight_keys(), **(extra or {})}, f)
+        self.clear_journal()
+
+    def is_finished(self) -> bool:
+        return os.path.exists(os.path.join(self.root, "finished"))
+
+    def load_finished(self):
+        """Contents of the `finished` marker ({} if written by an older run), or None."""
+        if not self.is_finished():
+            return None
+        with open(os.path.join(self.root, "finished"), encoding="utf-8") as f:
+            text = f.read()
+        return json.loads(text) if text.strip() else {}
+
+    def latest(self):
+        """(month_num, state) of the last complete month, or None."""
+        if not os.path.isdir(self.root):
+            return None
+        months = sorted(
+            int(name[6:]) for name in os.listdir(self.root)
+            if name.startswith("month_") and not name.endswith(".tmp")
+            and os.path.exists(os.path.join(self.root, name, "state.json"))
+        )
+        if not months:
+            return None
+        state = self.load_state(months[-1])
+        return (months[-1], state) if state is not None else None
+
+    def load_state(self, month_num: int):
+        """state.json of one month's checkpoint, or None if absent / stale."""
+        path = os.path.join(self._month_dir(month_num), "state.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        return state if state.get("version") == CHECKPOINT_VERSION else None
+
+    def drop_after(self, month_num: int):
+        """Forget checkpoints later than month_num (their state is being regenerated)."""
+        if not os.path.isdir(self.root):
+            return
+        for name in os.listdir(self.root):
+            if name.startswith("month_") and not name.endswith(".tmp") and int(name[6:]) > month_num:
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+        if os.path.exists(os.path.join(self.root, "finished")):
+            os.remove(os.path.join(self.root, "finished"))
+
+    def load_users(self, month_num: int) -> list:
+        return users_from_frame(pd.read_parquet(os.path.join(self._month_dir(month_num), "users.parquet")))
@@ -60,6 +60,17 @@ DIRTY_PLAN_VARIANTS = [
     "Enterprise_v2",
 ]
 
+# Y1 plan → nearest Y2 plan (user carry-over at the year boundary)
+CARRY_PLAN_MAP_Y2 = {
+    "Free":     "Starter",
+    "Pro":      "Growth",
+    "Pro Plus": "Growth",
+    "Business": "Enterprise",
+    "Trial":    "Trial",
+    "Expired":  "Expired",
+    "Canceled": "Canceled",
+}
+
 # =========================================================
 # ACQUISITION CHANNELS (referral weight goes up in Y2)
 # =========================================================
@@ -0,0 +1,699 @@
+"""
+engine.py
+─────────
+One simulation engine for any number of consecutive years.
+
+The user state machine and the monthly step (intake → lifecycle → chaos →
+write) are parameterized by a YearConfig (years.py) instead of being copied
+per year. runner.py and runner_y2.py drive single years through it; run_years
+keeps the population in memory across year boundaries, so a 5–10 year
+history needs no snapshot write/read between years:
+
+    python -m src.generator.engine --years 5
+
+Each year writes to its own output path (data/raw, data/raw_y2, data/raw_y3, ...)
+plus a users snapshot at its end, the same layout the single-year runners produce.
+"""
+
+import argparse
+import functools
+import random
+
+import numpy as np
+import pandas as pd
+from faker import Faker
+
+from . import instrument
+from . import kpis as kpi_counters
+from .config import COUNTRY_FAKER_LOCALE
+from .events import (
+    assign_country_timezone,
+    generate_payment_timestamp,
+    generate_product_events,
+    local_to_utc,
+    random_timestamp_in_month,
+    random_uuid,
+)
+from . import rng as keyed_rng
+from .rng import RandomKeys
+from .writer import verify_manifest, write_parquet
+from .years import Y1, YearConfig, year_sequence
+
+
+DATASETS = [
+    ("subscription_events", "event_timestamp_utc"),
+    ("product_events",      "event_timestamp_utc"),
+    ("payments",            "payment_timestamp_utc"),
+]
+
+MAX_FAILED_PAYMENTS = 3   # failed payments in a row before a user is auto canceled
+
+
+class Codebook:
+    """Interned names <-> small-int codes. Users store the code; names are decoded on read."""
+
+    def __init__(self, names=()):
+        self.names = []
+        self.codes = {}
+        for name in names:
+            self.code(name)
+
+    def code(self, name) -> int:
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(str(name))
+        return code
+
+
+# Shared by every year; each year's plan ladder / channels are interned on first use
+PLAN_CODES     = Codebook(["Trial", "Expired", "Canceled"])
+STATUS_CODES   = Codebook(["Active", "Churned"])
+COUNTRY_CODES  = Codebook(COUNTRY_FAKER_LOCALE)
+TIMEZONE_CODES = Codebook()
+CHANNEL_CODES  = Codebook()
+
+_NO_EVENTS = ()   # shared empty buffer; a real list is allocated on the first event
+
+_KEYED_FAKERS = {}   # one Faker per locale, reseeded per user in keyed runs
+
+
+def _keyed_faker(locale: str, rng) -> Faker:
+    fk = _KEYED_FAKERS.get(locale)
+    if fk is None:
+        fk = _KEYED_FAKERS[locale] = Faker(locale)
+    fk.seed_instance(int(rng.randint(0, 2**31 - 1)))
+    return fk
+
+
+def encode_user_id(user_id):
+    """Canonical (lowercase, dashed) uuid strings become 16 raw bytes; anything else is kept as-is."""
+    if (
+        isinstance(user_id, str) and len(user_id) == 36 and user_id == user_id.lower()
+        and user_id[8] == user_id[13] == user_id[18] == user_id[23] == "-"
+    ):
+        try:
+            raw = bytes.fromhex(user_id.replace("-", ""))
+        except ValueError:
+            return user_id
+        if len(raw) == 16:
+            return raw
+    return user_id
+
+
+def decode_user_id(raw) -> str:
+    if not isinstance(raw, bytes):
+        return raw
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+class SimUser:
+    """
+    State machine for a single user. Plans, prices, limits and probabilities
+    come from `self.year`; subclasses pin the default (UserLifecycle → Y1,
+    UserLifecycleY2 → Y2) and enter_year() moves a user to the next year.
+
+    Compact layout: no __dict__, plan / status / country / timezone / channel
+    held as Codebook codes, the uuid as 16 bytes and event buffers only
+    allocated in months that produce events. The attribute names are the same
+    as before (properties decode), so callers see plain strings.
+
+    Randomness: with `keys` (rng.RandomKeys) every draw comes from streams
+    keyed by this user and month; without, from the global np.random / Faker.
+    """
+
+    __slots__ = (
+        "_year", "_uid", "_plan", "_status", "_country", "_tz", "_channel",
+        "name", "email", "created_at", "failed_payments",
+        "subscription_events", "payments", "product_events",
+    )
+
+    YEAR: YearConfig = Y1
+
+    def __init__(self, user_id, country, timezone_str, start_month,
+                 carry_plan=None, carry_status=None, year=None, keys: RandomKeys = None):
+        self._year        = year or self.YEAR
+        self.user_id      = user_id
+        self.country      = country
+        self.timezone_str = timezone_str
+        self.created_at   = start_month
+
+        # Carry-over state from the previous year if provided
+        self.current_plan    = carry_plan   or "Trial"
+        self.status          = carry_status or "Active"
+        self.failed_payments = 0
+
+        # store monthly outputs (cleared after write)
+        self.subscription_events = _NO_EVENTS
+        self.payments            = _NO_EVENTS
+        self.product_events      = _NO_EVENTS
+
+        rng = None if keys is None else keys.user_month(user_id, start_month, "profile")
+
+        # Only fire trial_start for brand-new users (no carry-over plan)
+        if carry_plan is None:
+            self._add_subscription_event("trial_start", "Trial", start_month, rng)
+
+        # Personalize name/email based on country for more realism
+        locale = COUNTRY_FAKER_LOCALE.get(country, "en_US")
+        if rng is None:
+            fake_local, fake_en, fake_domain = Faker(locale), Faker("en_US"), Faker("en_US")
+        else:
+            fake_local = _keyed_faker(locale, rng)
+            fake_en = fake_domain = _keyed_faker("en_US", rng)
+        self.name  = fake_local.name()
+        self.email = (
+            f"{fake_en.user_name()}_{user_id[:8]}"
+            f"@{fake_domain.free_email_domain()}"
+        )
+
+        self.acquisition_channel = (np.random if rng is None else rng).choice(
+            self._year.acquisition_channels,
+            p=self._year.acquisition_channel_weights,
+        )
+
+    @classmethod
+    def restore(cls, user_id, country, timezone_str, created_at, current_plan, status,
+                name, email, acquisition_channel, failed_payments=0, year=None):
+        """Build a user from known state — skips __init__'s Faker calls and RNG draws."""
+        user = cls.__new__(cls)
+        user._year               = year or cls.YEAR
+        user.user_id             = user_id
+        user.country             = country
+        user.timezone_str        = timezone_str
+        user.created_at          = created_at
+        user.current_plan        = current_plan
+        user.status              = status
+        user.failed_payments     = failed_payments
+        user.subscription_events = _NO_EVENTS
+        user.payments            = _NO_EVENTS
+        user.product_events      = _NO_EVENTS
+        user.name                = name
+        user.email               = email
+        user.acquisition_channel = acquisition_channel
+        return user
+
+    def enter_year(self, year: YearConfig):
+        """Move to the next year's rules; the plan is renamed via its carry map."""
+        self.current_plan = year.carry_plan(self.current_plan)
+        self._year        = year
+
+    # ─────────────────────────────────────────────────────
+    #  CODED ATTRIBUTES
+    # ─────────────────────────────────────────────────────
+
+    @property
+    def year(self) -> YearConfig:
+        return self._year
+
+    @property
+    def user_id(self) -> str:
+        return decode_user_id(self._uid)
+
+    @user_id.setter
+    def user_id(self, value):
+        self._uid = encode_user_id(value)
+
+    @property
+    def current_plan(self) -> str:
+        return PLAN_CODES.names[self._plan]
+
+    @current_plan.setter
+    def current_plan(self, value):
+        self._plan = PLAN_CODES.code(value)
+
+    @property
+    def status(self) -> str:
+        return STATUS_CODES.names[self._status]
+
+    @status.setter
+    def status(self, value):
+        self._status = STATUS_CODES.code(value)
+
+    @property
+    def country(self) -> str:
+        return COUNTRY_CODES.names[self._country]
+
+    @country.setter
+    def country(self, value):
+        self._country = COUNTRY_CODES.code(value)
+
+    @property
+    def timezone_str(self) -> str:
+        return TIMEZONE_CODES.names[self._tz]
+
+    @timezone_str.setter
+    def timezone_str(self, value):
+        self._tz = TIMEZONE_CODES.code(value)
+
+    @property
+    def acquisition_channel(self) -> str:
+        return CHANNEL_CODES.names[self._channel]
+
+    @acquisition_channel.setter
+    def acquisition_channel(self, value):
+        self._channel = CHANNEL_CODES.code(value)
+
+    # ─────────────────────────────────────────────────────
+    #  INTERNAL HELPERS
+    # ─────────────────────────────────────────────────────
+
+    def _add_subscription_event(self, event_type, plan, current_month, rng=None):
+        local_ts = random_timestamp_in_month(current_month, rng)
+        utc_ts   = local_to_utc(local_ts, self.timezone_str)
+        event    = {
+            "event_id":               random_uuid(rng),
+            "user_id":                self.user_id,
+            "event_type":             event_type,
+            "plan":                   plan,
+            "event_timestamp_local":  local_ts,
+            "event_timestamp_utc":    utc_ts,
+            "country":                self.country,
+            "batch_month":            current_month.strftime("%Y-%m"),
+        }
+        if self.subscription_events:
+            self.subscription_events.append(event)
+        else:
+            self.subscription_events = [event]
+
+    def _add_payment(self, current_month, amount, rng=None):
+        local_ts, utc_ts = generate_payment_timestamp(current_month, self.timezone_str, rng)
+        is_success       = (np.random if rng is None else rng).rand() > self.year.payment_fail_prob
+
+        if not is_success:
+            self.failed_payments += 1
+            status = "failed"
+        else:
+            self.failed_payments = 0
+            status = "success"
+
+        payment = {
+            "payment_id":              random_uuid(rng),
+            "user_id":                 self.user_id,
+            "amount_usd":              amount,
+            "status":                  status,
+            "attempt_number":          self.failed_payments if not is_success else 1,
+            "payment_timestamp_local": local_ts,
+            "payment_timestamp_utc":   utc_ts,
+            "batch_month":             current_month.strftime("%Y-%m"),
+        }
+        if self.payments:
+            self.payments.append(payment)
+        else:
+            self.payments = [payment]
+
+        # Auto cancel after MAX_FAILED_PAYMENTS failures
+        if self.failed_payments >= MAX_FAILED_PAYMENTS:
+            self.status       = "Churned"
+            self.current_plan = "Canceled"
+            self._add_subscription_event("cancel", "Canceled", current_month, rng)
+
+        return is_success
+
+    # ─────────────────────────────────────────────────────
+    #  PLAN TRANSITIONS  (one step along year.plans)
+    # ─────────────────────────────────────────────────────
+
+    def _maybe_upgrade_or_downgrade(self, current_month, rng=None):
+        plans = self.year.plans
+        if self.current_plan not in plans:
+            return
+        rank = plans.index(self.current_plan)
+        draw = np.random if rng is None else rng
+
+        if draw.rand() < self.year.upgrade_prob:
+            if rank + 1 >= len(plans):
+                return
+            new_plan = plans[rank + 1]
+            self.current_plan = new_plan
+            self._add_subscription_event("upgrade", new_plan, current_month, rng)
+
+        elif draw.rand() < self.year.downgrade_prob:
+            if rank == 0:
+                return
+            new_plan = plans[rank - 1]
+            self.current_plan = new_plan
+            self._add_subscription_event("downgrade", new_plan, current_month, rng)
+
+    # ─────────────────────────────────────────────────────
+    #  MONTHLY PROCESS
+    # ─────────────────────────────────────────────────────
+
+    def process_month(self, current_month, keys: RandomKeys = None):
+        year = self.year
+        rng  = None if keys is None else keys.user_month(self.user_id, current_month, "state")
+        draw = np.random if rng is None else rng
+
+        # chance to reactivate if churned
+        if self.status != "Active":
+            self._maybe_reactivate(current_month, rng)
+            return
+
+        # TRIAL LOGIC
+        if self.current_plan == "Trial":
+            if draw.rand() < year.trial_convert_prob:
+                self.current_plan = year.convert_plan
+                self._add_subscription_event("trial_convert", year.convert_plan, current_month, rng)
+            else:
+                self.status       = "Churned"
+                self.current_plan = "Expired"
+                self._add_subscription_event("trial_expire", "Expired", current_month, rng)
+                return
+
+        # PAYMENT LOGIC — failures only cancel after 3 in a row
+        if self.current_plan in year.plans and self.current_plan != year.free_plan:
+            amount = year.plan_prices.get(self.current_plan, 0)
+            if amount > 0:
+                self._add_payment(current_month, amount, rng)
+
+        # If user was canceled by payment logic above, stop.
+        if self.status != "Active":
+            return
+
+        # RANDOM CHURN
+        if draw.rand() < year.churn_prob:
+            self.status       = "Churned"
+            self.current_plan = "Canceled"
+            self._add_subscription_event("cancel", "Canceled", current_month, rng)
+            return
+
+        # PLAN CHANGE
+        self._maybe_upgrade_or_downgrade(current_month, rng)
+
+        # PRODUCT USAGE
+        if self.current_plan in year.plans or self.current_plan == "Trial":
+            limit        = year.event_limits.get(self.current_plan, 0)
+            usage_events = generate_product_events(
+                self.user_id,
+                self.current_plan,
+                current_month,
+                limit,
+                self.timezone_str,
+                None if keys is None else keys.user_month(self.user_id, current_month, "usage"),
+            )
+            if self.product_events:
+                self.product_events.extend(usage_events)
+            else:
+                self.product_events = usage_events
+
+    # ─────────────────────────────────────────────────────
+    #  EXPORT & CLEAR (Memory Safe)
+    # ─────────────────────────────────────────────────────
+
+    def collect_and_reset_monthly_events(self):
+        subs  = self.subscription_events
+        pays  = self.payments
+        prods = self.product_events
+        self.subscription_events = _NO_EVENTS
+        self.payments            = _NO_EVENTS
+        self.product_events      = _NO_EVENTS
+        return subs, pays, prods
+
+    @property
+    def is_terminal(self) -> bool:
+        """Churned without a cancel (expired trial): process_month is a no-op from here on."""
+        return self.status != "Active" and self.current_plan != "Canceled"
+
+    def _maybe_reactivate(self, current_month, rng=None):
+        """
+        Only users who explicitly canceled (not expired trials) can reactivate.
+        They restart on the year's free tier.
+        """
+        if self.status != "Churned" or self.current_plan != "Canceled":
+            return
+        if (np.random if rng is None else rng).rand() < self.year.reactivation_prob:
+            self.status          = "Active"
+            self.current_plan    = self.year.free_plan
+            self.failed_payments = 0
+            self._add_subscription_event("reactivate", self.year.free_plan, current_month, rng)
+
+
+# ─────────────────────────────────────────────────────────
+#  POPULATION
+# ─────────────────────────────────────────────────────────
+
+class Population:
+    """
+    Every user ever created (creation order — snapshots and checkpoints) plus
+    the live subset the monthly loop visits: active and canceled-churned
+    users, who may still reactivate. Terminal users are archived out of the
+    loop; since they draw no randoms, skipping them leaves the output unchanged.
+    Status counts are kept up to date by simulate_month, not recounted.
+    """
+
+    def __init__(self, users=()):
+        self.users    = []
+        self.live     = []
+        self.active   = 0
+        self.archived = 0
+        self.extend(users)
+
+    def extend(self, users):
+        for user in users:
+            self.users.append(user)
+            if user.is_terminal:
+                self.archived += 1
+                continue
+            self.live.append(user)
+            self.active += user.status == "Active"
+
+    @property
+    def churned(self) -> int:
+        return len(self.users) - self.active
+
+    @property
+    def reactivatable(self) -> int:
+        return len(self.live) - self.active
+
+    def __len__(self):
+        return len(self.users)
+
+    def __iter__(self):
+        return iter(self.users)
+
+
+def generate_users(year: YearConfig, n_users: int, start_month: pd.Timestamp, cls=SimUser,
+                   keys: RandomKeys = None) -> list:
+    """
+    Brand-new users (initial pool or monthly intake) for `year`. In a sampled
+    keyed run, users outside the sample are skipped before any other draw.
+    """
+    users = []
+    for i in range(n_users):
+        rng               = None if keys is None else keys.month(start_month, "intake", i)
+        user_id           = random_uuid(rng)
+        if keys is not None and not keys.keeps(user_id):
+            continue
+        country, timezone = assign_country_timezone(rng)
+        users.append(cls(user_id, country, timezone, start_month, year=year, keys=keys))
+    return users
+
+
+def generate_users_snapshot(users, keys: RandomKeys = None) -> list:
+    """Snapshot of users for the dimension table."""
+    snapshot = []
+    for user in users:
+        # Create a rough UTC created_at based on their start month
+        rng = None if keys is None else keys.user_month(user.user_id, user.created_at, "created")
+        created_at_utc = local_to_utc(
+            random_timestamp_in_month(user.created_at, rng),
+            user.timezone_str,
+        )
+        snapshot.append({
+            "user_id":              user.user_id,
+            "name":                 user.name,
+            "email":                user.email,
+            "acquisition_channel":  user.acquisition_channel,
+            "country":              user.country,
+            "timezone":             user.timezone_str,
+            "current_status":       user.status,
+            "current_plan":         user.current_plan,
+            "created_at_utc":       created_at_utc,
+        })
+    return snapshot
+
+
+# ─────────────────────────────────────────────────────────
+#  MONTHLY STEP
+# ─────────────────────────────────────────────────────────
+
+def simulate_month(year: YearConfig, users: Population, idx: int, current_month: pd.Timestamp,
+                   write=None, instr=None, cls=SimUser, keys: RandomKeys = None, kpis=None):
+    """
+    One month of `year`: intake, lifecycle, chaos, write. Mutates `users` in
+    place (new users appended, live users advanced, newly terminal ones
+    archived). `write(events, dataset, ts_field)` defaults to parquet
+    partitions under year.output_path. With `keys`, the month's output does
+    not depend on the order users are processed in or on earlier months' draws.
+    `kpis` (kpis.KpiCounters, after begin()) is updated as users are processed.
+    """
+    instr     = instr or instrument.Instrumentation.disabled()
+    write     = write or functools.partial(write_parquet, base_path=year.output_path)
+    kpis      = kpis if kpis is not None and kpis.enabled else None
+    label     = current_month.strftime('%Y-%m')
+    instr.start_month(label)
+    if kpis is not None:
+        kpis.start_month(label, users)
+
+    # 1. Add new users (the first month starts from the initial pool)
+    if idx > 0:
+        users.extend(month_intake(year, idx, current_month, instr, cls, keys))
+
+    month_subs, month_pays, month_prods = [], [], []
+
+    # 2. Process lifecycle for every live user; re-index by the new status
+    with instr.phase("lifecycle") as phase:
+        live, active = [], 0
+        record       = kpis.record_user if kpis is not None else None
+        for user in users.live:
+            plan_before = user.current_plan if record is not None else None
+            user.process_month(current_month, keys)
+            subs, pays, prods = user.collect_and_reset_monthly_events()
+            if record is not None:
+                record(plan_before, user.current_plan, subs, pays, prods)
+            month_subs.extend(subs)
+            month_pays.extend(pays)
+            month_prods.extend(prods)
+            if user.status == "Active":
+                active += 1
+            elif user.current_plan != "Canceled":
+                continue   # expired trial: archived
+            live.append(user)
+        users.archived += len(users.live) - len(live)
+        users.live, users.active = live, active
+        phase.events = len(month_subs) + len(month_pays) + len(month_prods)
+
+    # 3. Chaos, then 4. write each dataset straight away (nothing kept across months)
+    batches = {"subscription_events": month_subs, "product_events": month_prods, "payments": month_pays}
+    chaos_and_write(year, batches, idx, current_month, write, instr, keys, kpis)
+
+    print(f"[{label}] Total users: {len(users)} | Active: {users.active} | Churned: {users.churned}")
+    instr.end_month(users=len(users), active=users.active, churned=users.churned,
+                    archived=users.archived)
+    if kpis is not None:
+        kpis.end_month(users)
+
+
+def month_intake(year: YearConfig, idx: int, current_month: pd.Timestamp, instr,
+                 cls=SimUser, keys: RandomKeys = None) -> list:
+    """The month's new users (idx > 0; month 1 starts from the initial pool)."""
+    lo, hi         = year.new_users_range(idx + 1)
+    draw           = np.random if keys is None else keys.month(current_month, "intake")
+    new_user_count = int(draw.randint(lo, hi + 1))
+    with instr.phase("new_users") as phase:
+        new_users  = generate_users(year, new_user_count, current_month, cls=cls, keys=keys)
+        phase.events = len(new_users)
+    print(f"[{current_month.strftime('%Y-%m')}] Added new users: {len(new_users)}")
+    return new_users
+
+
+def chaos_and_write(year: YearConfig, batches: dict, idx: int, current_month: pd.Timestamp,
+                    write, instr, keys: RandomKeys = None, kpis=None):
+    """Chaos (seeded per month and dataset), then write each of the month's batches."""
+    seed = year.seed if keys is None else keys.seed
+    for dataset_name, ts_field in DATASETS:
+        with instr.phase(f"chaos.{dataset_name}", events=len(batches[dataset_name])):
+            random.seed(keyed_rng.chaos_seed(seed, current_month, dataset_name))
+            batches[dataset_name] = year.chaos(
+                batches[dataset_name],
+                current_month=current_month,
+                dataset_name=dataset_name,
+                ts_field=ts_field,
+                month_idx=idx + 1,
+            )
+    for dataset_name, ts_field in DATASETS:
+        with instr.phase(f"write.{dataset_name}", events=len(batches[dataset_name])):
+            write(batches[dataset_name], dataset_name, ts_field=ts_field)
+        if kpis is not None:
+            kpis.record_written(dataset_name, len(batches[dataset_name]))
+
+    print(
+        f"[{current_month.strftime('%Y-%m')}] month events -> "
+        f"subs: {len(batches['subscription_events'])}, "
+        f"pays: {len(batches['payments'])}, "
+        f"prods: {len(batches['product_events'])}"
+    )
+
+
+# ─────────────────────────────────────────────────────────
+#  MULTI-YEAR RUN
+# ─────────────────────────────────────────────────────────
+
+def replay_user(user: SimUser, months, keys: RandomKeys) -> list:
+    """
+    Re-run one user alone through `months`, starting from its state before
+    the first of them (e.g. a checkpoint row via SimUser.restore). In a keyed
+    run this reproduces the user's rows from the full run, before chaos.
+    Returns [(month, subs, pays, prods), ...]; `user` is advanced in place.
+    """
+    history = []
+    for current_month in months:
+        user.process_month(current_month, keys)
+        history.append((current_month, *user.collect_and_reset_monthly_events()))
+    return history
+
+
+def run_years(years: list, output_root: str = None, instr=None, keys: RandomKeys = None,
+              kpis=None) -> Population:
+    """
+    Simulate consecutive `years` in one in-memory run. The population carries
+    straight into the next year (plans renamed via its plan_carry_map), and a
+    users snapshot is written at the end of every year. Sampled runs check
+    that every row written is on disk. Returns the final population.
+    """
+    instr = instr or instrument.Instrumentation.disabled()
+    kpis  = kpis or kpi_counters.KpiCounters.disabled()
+    keyed_rng.seed_globals(years[0].seed)
+
+    users = Population()
+    for year in years:
+        base_path = f"{output_root}/{year.name}" if output_root else year.output_path
+        manifest  = {} if keys is not None and keys.sample < 1 else None
+        write     = functools.partial(write_parquet, base_path=base_path, manifest=manifest)
+
+        if users:
+            with instr.phase("carry_over", events=len(users)):
+                for user in users:
+                    user.enter_year(year)
+            print(f"[engine] {year.name}: carried over {len(users)} users.")
+        else:
+            with instr.phase("new_users", events=year.initial_users):
+                users.extend(generate_users(year, year.initial_users, year.start_month, keys=keys))
+            print(f"[engine] {year.name}: generated {len(users)} initial users.")
+        kpis.begin(year, users)
+
+        for idx, current_month in enumerate(year.month_range):
+            simulate_month(year, users, idx, current_month, write=write, instr=instr, keys=keys, kpis=kpis)
+
+        with instr.phase("write.users", events=len(users)):
+            write(generate_users_snapshot(users, keys), "users", ts_field="created_at_utc")
+        if manifest is not None:
+            on_disk = verify_manifest(base_path, manifest)
+            print(f"[engine] {year.name}: sample check passed, {sum(on_disk.values())} rows on disk.")
+        print(f"[engine] {year.name} done -> {base_path}")
+
+    instr.close()
+    kpis.close()
+    return users
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=2, help="Number of consecutive years (Y1, Y2, y3, ...).")
+    parser.add_argument(
+        "--output-root",
+        default=None,
+        help="Write each year under <root>/<year name> instead of its own default path.",
+    )
+    instrument.add_cli_args(parser)
+    kpi_counters.add_cli_args(parser)
+    keyed_rng.add_cli_args(parser)
+    args  = parser.parse_args()
+    if args.years < 1:
+        parser.error("--years must be at least 1.")
+    years = year_sequence(args.years)
+    run_years(years, output_root=args.output_root,
+              instr=instrument.from_args(args, f"years_{args.years}"),
+              keys=keyed_rng.from_args(args, years[0].seed),
+              kpis=kpi_counters.from_args(args, f"years_{args.years}"))
@@ -1,3 +1,4 @@
+import uuid
 import numpy as np
 import pandas as pd
 import warnings
@@ -6,7 +7,16 @@ from .config import COUNTRIES, COUNTRY_TIMEZONE_MAP
 
 fake = Faker()
 
-def random_timestamp_in_month(month_start: pd.Timestamp) -> pd.Timestamp:
+# `rng` arguments below: None draws from the global np.random / Faker streams,
+# otherwise a keyed RandomState from rng.RandomKeys.
+
+def random_uuid(rng=None) -> str:
+    """uuid4 string, from Faker's shared stream or from `rng`."""
+    if rng is None:
+        return fake.uuid4()
+    return str(uuid.UUID(bytes=rng.bytes(16), version=4))
+
+def random_timestamp_in_month(month_start: pd.Timestamp, rng=None) -> pd.Timestamp:
     """
     Calculates a random point in time within a specific month.
     Converts timestamps to Unix integers to allow random integer sampling.
@@ -16,7 +26,7 @@ def random_timestamp_in_month(month_start: pd.Timestamp) -> pd.Timestamp:
     end_ts = (month_start + pd.DateOffset(months=1)).timestamp() - 1
     
     # Generate a random uniform integer between start and end
-    random_ts = np.random.randint(start_ts, end_ts)
+    random_ts = (np.random if rng is None else rng).randint(start_ts, end_ts)
     return pd.to_datetime(random_ts, unit='s')
 
 def local_to_utc(local_ts: pd.Timestamp, timezone_str: str) -> pd.Timestamp:
@@ -37,11 +47,11 @@ def local_to_utc(local_ts: pd.Timestamp, timezone_str: str) -> pd.Timestamp:
         )
         return local_ts.tz_localize("UTC").tz_localize(None)
         
-def assign_country_timezone():
+def assign_country_timezone(rng=None):
     """
     Randomly assign a country and its corresponding timezone.
     """
-    country = np.random.choice(COUNTRIES)
+    country = (np.random if rng is None else rng).choice(COUNTRIES)
     timezone = COUNTRY_TIMEZONE_MAP[country]
     return country, timezone
 
@@ -50,7 +60,8 @@ def generate_product_events(
     plan: str,
     current_month: pd.Timestamp,
     event_limit: int,
-    timezone_str: str
+    timezone_str: str,
+    rng=None,
 ):
     """
     Generate product usage events for a user in a given month.
@@ -59,15 +70,15 @@ def generate_product_events(
         return []
 
     # Randomize usage volume to make the data look realistic (not everyone uses it the same)
-    usage_count = np.random.randint(1, event_limit + 1)
+    usage_count = (np.random if rng is None else rng).randint(1, event_limit + 1)
     events = []
 
     for _ in range(usage_count):
-        local_ts = random_timestamp_in_month(current_month)
+        local_ts = random_timestamp_in_month(current_month, rng)
         utc_ts = local_to_utc(local_ts, timezone_str)
 
         events.append({
-            "event_id": fake.uuid4(),
+            "event_id": random_uuid(rng),
             "user_id": user_id,
             "event_type": "product_usage",
             "plan": plan,
@@ -78,10 +89,10 @@ def generate_product_events(
 
     return events
 
-def generate_payment_timestamp(current_month: pd.Timestamp, timezone_str: str):
+def generate_payment_timestamp(current_month: pd.Timestamp, timezone_str: str, rng=None):
     """
     Generate payment timestamp (local + utc).
     """
-    local_ts = random_timestamp_in_month(current_month)
+    local_ts = random_timestamp_in_month(current_month, rng)
     utc_ts = local_to_utc(local_ts, timezone_str)
     return local_ts, utc_ts
\ No newline at end of file
@@ -0,0 +1,317 @@
+"""
+forecast.py
+───────────
+Analytic Markov-chain forecast of a simulated year: expected per-month
+state counts, KPIs, event volumes per dataset and parquet bytes, from the
+YearConfig probabilities alone. A 12-month forecast takes a few
+milliseconds, so it can size a run before launching it and serve as a
+statistical oracle for the sampled output.
+
+engine.SimUser.process_month is a Markov chain once the failed-payment
+counter is part of the state:
+
+    Trial  →  Expired (trial_expire)  |  convert_plan, then a paid month
+    plan/f →  plan±1 (upgrade / downgrade), same plan, or Canceled
+              (churn, or the 3rd failed payment in a row); f = failed payments 0..2
+    Canceled → free plan (reactivate)  |  Canceled
+    Expired  (terminal)
+
+Each month the expected intake joins Trial, the expected events are
+x · E (per-state event rates), and the next month's counts are x · P.
+Volumes are before chaos (duplicates add a few percent in chaos months).
+
+Usage
+-----
+    python -m src.generator.forecast                          # Y1
+    python -m src.generator.forecast --year y2 --carry-over   # Y2 from the Y1 users snapshot
+    python -m src.generator.forecast --year y2 --check data/raw_y2
+
+--check compares each month's row counts in a raw output path against the
+forecast and exits 1 if any falls outside the tolerance.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from .engine import MAX_FAILED_PAYMENTS
+from .years import BASE_YEARS, YearConfig
+
+# Event kind → dataset it is written to
+EVENT_DATASETS = {
+    "trial_start":     "subscription_events",
+    "trial_convert":   "subscription_events",
+    "trial_expire":    "subscription_events",
+    "cancel":          "subscription_events",
+    "upgrade":         "subscription_events",
+    "downgrade":       "subscription_events",
+    "reactivate":      "subscription_events",
+    "payment_success": "payments",
+    "payment_failed":  "payments",
+    "product_usage":   "product_events",
+}
+DATASETS = ["subscription_events", "payments", "product_events"]
+
+# Parquet size model fitted on a Y2 run (one file per event date and write):
+# bytes ≈ files × per-file overhead + rows × per-row bytes
+#                         (bytes/file, bytes/row, files/month)
+PARQUET_SIZE = {
+    "subscription_events": (5_400, 94, 43),
+    "payments":            (5_500, 97, 43),
+    "product_events":      (6_100, 64, 61),
+    "users":               (5_800, 98, 29),
+}
+
+
+# ─────────────────────────────────────────────────────────
+#  CHAIN
+# ─────────────────────────────────────────────────────────
+
+class MarkovChain:
+    """Transition matrix P and per-state expected event counts E for one YearConfig."""
+
+    def __init__(self, year: YearConfig):
+        self.year   = year
+        self.states = (
+            ["Trial"]
+            + [self.plan_state(plan, f) for plan in year.plans for f in range(MAX_FAILED_PAYMENTS)]
+            + ["Canceled", "Expired"]
+        )
+        self.index  = {state: i for i, state in enumerate(self.states)}
+        n           = len(self.states)
+        self.P      = np.zeros((n, n))
+        self.E      = {kind: np.zeros(n) for kind in EVENT_DATASETS}
+
+        for state in self.states:
+            i = self.index[state]
+            for prob, next_state, events in self._branches(state):
+                self.P[i, self.index[next_state]] += prob
+                for kind, count in events.items():
+                    self.E[kind][i] += prob * count
+
+    @staticmethod
+    def plan_state(plan: str, failed: int) -> str:
+        return plan if failed == 0 else f"{plan}/f{failed}"
+
+    # ── one month of process_month, as weighted branches ──
+    def _branches(self, state):
+        year = self.year
+        if state == "Expired":
+            return [(1.0, "Expired", {})]
+        if state == "Canceled":
+            r = year.reactivation_prob
+            return [(r, year.free_plan, {"reactivate": 1}), (1 - r, "Canceled", {})]
+        if state == "Trial":
+            tc        = year.trial_convert_prob
+            converted = [
+                (tc * prob, nxt, {"trial_convert": 1, **events})
+                for prob, nxt, events in self._paid_month(year.convert_plan, 0)
+            ]
+            return [(1 - tc, "Expired", {"trial_expire": 1})] + converted
+        plan, _, failed = state.partition("/f")
+        return self._paid_month(plan, int(failed or 0))
+
+    def _paid_month(self, plan: str, failed: int):
+        """Payment → churn → plan change → usage for an active user on `plan`."""
+        year     = self.year
+        branches = []
+        price    = year.plan_prices.get(plan, 0)
+        if plan != year.free_plan and price > 0:
+            pf = year.payment_fail_prob
+            if failed + 1 >= MAX_FAILED_PAYMENTS:
+                branches.append((pf, "Canceled", {"payment_failed": 1, "cancel": 1}))
+            else:
+                branches += self._after_payment(plan, failed + 1, pf, {"payment_failed": 1})
+            branches += self._after_payment(plan, 0, 1 - pf, {"payment_success": 1})
+        else:
+            branches += self._after_payment(plan, failed, 1.0, {})
+        return branches
+
+    def _after_payment(self, plan, failed, prob, events):
+        year, plans = self.year, self.year.plans
+        c           = year.churn_prob
+        rank        = plans.index(plan)
+        up, down    = year.upgrade_prob, (1 - year.upgrade_prob) * year.downgrade_prob
+        moves       = [
+            (up,            plans[rank + 1] if rank + 1 < len(plans) else plan, "upgrade"),
+            (down,          plans[rank - 1] if rank > 0 else plan,              "downgrade"),
+            (1 - up - down, plan,                                               None),
+        ]
+        branches = [(prob * c, "Canceled", {**events, "cancel": 1})]
+        for move_prob, new_plan, kind in moves:
+            moved = {**events}
+            if new_plan != plan:
+                moved[kind] = 1
+            limit = year.event_limits.get(new_plan, 0)
+            if limit > 0:
+                moved["product_usage"] = (limit + 1) / 2   # randint(1, limit + 1)
+            branches.append((prob * (1 - c) * move_prob, self.plan_state(new_plan, failed), moved))
+        return branches
+
+
+# ─────────────────────────────────────────────────────────
+#  FORECAST
+# ─────────────────────────────────────────────────────────
+
+def initial_counts(year: YearConfig, snapshot=None) -> dict:
+    """
+    Starting state counts: year.initial_users new trials, or a previous
+    year's users snapshot (DataFrame / Arrow table) carried over the way
+    lifecycle_y2.carry_over_users_from_y1 does it.
+    """
+    if snapshot is None:
+        return {"Trial": float(year.initial_users)}
+    df       = snapshot.to_pandas() if hasattr(snapshot, "to_pandas") else pd.DataFrame(snapshot)
+    plans    = df["current_plan"].map(year.carry_plan)
+    statuses = df["current_status"].fillna("Active")
+    states   = np.where(
+        statuses == "Active",
+        np.where(plans == "Trial", "Trial", plans),
+        np.where(plans == "Canceled", "Canceled", "Expired"),
+    )
+    return {state: float(n) for state, n in pd.Series(states).value_counts().items()}
+
+
+def forecast_year(year: YearConfig, snapshot=None) -> pd.DataFrame:
+    """
+    Expected per-month KPIs, event volumes and bytes for `year`, starting
+    from initial trials or a carried-over `snapshot` (see initial_counts).
+    KPI definitions match sweep.py, so sweep bands can be checked against it.
+    """
+    chain   = MarkovChain(year)
+    x       = np.zeros(len(chain.states))
+    fresh   = snapshot is None   # brand-new trials fire trial_start in month 1
+    for state, count in initial_counts(year, snapshot).items():
+        x[chain.index[state]] += count
+    users   = x.sum()
+    price   = np.array([year.plan_prices.get(s.split("/")[0], 0) if s not in ("Trial", "Canceled", "Expired")
+                        else 0 for s in chain.states], dtype=float)
+    live    = np.array([s not in ("Canceled", "Expired") for s in chain.states])
+    trial   = chain.index["Trial"]
+
+    rows = []
+    for idx, current_month in enumerate(year.month_range):
+        active_before = x[live].sum()
+        intake        = float(np.mean(year.new_users_range(idx + 1))) if idx > 0 else 0.0
+        x[trial]     += intake
+        users        += intake
+
+        events = {kind: float(x @ rate) for kind, rate in chain.E.items()}
+        events["trial_start"] = intake if idx > 0 else (x[trial] if fresh else 0.0)
+        x = x @ chain.P
+
+        row = {
+            "month":      current_month.strftime("%Y-%m"),
+            "new_users":  intake,
+            "users":      users,
+            "active":     x[live].sum(),
+            "trial":      x[trial],
+            "paying":     x[price > 0].sum(),
+            "mrr":        float(x @ price),
+            "canceled":   x[chain.index["Canceled"]],
+            "expired":    x[chain.index["Expired"]],
+            "cancels":    events["cancel"],
+            "churn_rate": events["cancel"] / active_before if active_before else 0.0,
+        }
+        for dataset in DATASETS:
+            row[dataset] = sum(n for kind, n in events.items() if EVENT_DATASETS[kind] == dataset)
+            row[f"{dataset}_bytes"] = _parquet_bytes(dataset, row[dataset])
+        rows.append(row)
+
+    frame = pd.DataFrame(rows)
+    frame["events"] = frame[DATASETS].sum(axis=1)
+    frame["bytes"]  = frame[[f"{d}_bytes" for d in DATASETS]].sum(axis=1)
+    return frame
+
+
+def _parquet_bytes(dataset: str, rows: float) -> float:
+    per_file, per_row, files = PARQUET_SIZE[dataset]
+    return min(files, rows) * per_file + rows * per_row
+
+
+def users_snapshot_bytes(year: YearConfig, users: float) -> float:
+    per_file, per_row, files = PARQUET_SIZE["users"]
+    return min(files * year.n_months, users) * per_file + users * per_row
+
+
+# ─────────────────────────────────────────────────────────
+#  ORACLE
+# ─────────────────────────────────────────────────────────
+
+def observed_counts(raw_path: str) -> pd.DataFrame:
+    """Rows per batch_month for each dataset under a raw output path."""
+    counts = {}
+    for dataset in DATASETS:
+        files = sorted(glob.glob(os.path.join(raw_path, dataset, "**", "*.parquet"), recursive=True))
+        if not files:
+            continue
+        months = ds.dataset(files, format="parquet").to_table(columns=["batch_month"]).column("batch_month")
+        counts[dataset] = months.to_pandas().value_counts()
+    return pd.DataFrame(counts).fillna(0).rename_axis("month")
+
+
+def check_output(forecast: pd.DataFrame, observed: pd.DataFrame, rel_tol: float = 0.25) -> pd.DataFrame:
+    """
+    Expected vs observed rows for each month present in `observed`. A count
+    is flagged when it is off by more than rel_tol and by more than
+    3 √expected (small counts); intake alone varies ±20% month to month.
+    """
+    rows = []
+    for _, f in forecast[forecast["month"].isin(observed.index)].iterrows():
+        for dataset in DATASETS:
+            expected = f[dataset]
+            actual   = float(observed[dataset].get(f["month"], 0)) if dataset in observed else 0.0
+            rows.append({
+                "month":    f["month"],
+                "dataset":  dataset,
+                "expected": round(expected, 1),
+                "observed": actual,
+                "ratio":    round(actual / expected, 3) if expected else np.nan,
+                "ok":       abs(actual - expected) <= max(rel_tol * expected, 3 * np.sqrt(expected)),
+            })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--year", choices=sorted(BASE_YEARS), default="y1", help="Year config to forecast.")
+    parser.add_argument(
+        "--carry-over",
+        action="store_true",
+        help="Start from the Y1 users snapshot (data/raw/users) instead of initial trials.",
+    )
+    parser.add_argument("--check", default=None, help="Raw output path to compare row counts against.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Relative tolerance for --check.")
+    args = parser.parse_args()
+
+    year     = BASE_YEARS[args.year]
+    snapshot = None
+    if args.carry_over:
+        from .runner_y2 import load_y1_snapshot
+        snapshot = load_y1_snapshot()
+
+    started  = time.perf_counter()
+    forecast = forecast_year(year, snapshot)
+    elapsed  = time.perf_counter() - started
+
+    table = forecast[["month", "new_users", "users", "active", "paying", "mrr", "churn_rate", *DATASETS, "bytes"]]
+    print(table.round({column: 4 if column == "churn_rate" else 1 for column in table.columns[1:]})
+               .to_string(index=False))
+    snapshot_bytes = users_snapshot_bytes(year, forecast["users"].iloc[-1])
+    print(f"\n[forecast] {year.name}: {forecast['events'].sum():,.0f} events, "
+          f"{(forecast['bytes'].sum() + snapshot_bytes) / 1e6:,.1f} MB on disk "
+          f"({elapsed * 1000:.1f} ms)")
+
+    if args.check:
+        report  = check_output(forecast, observed_counts(args.check), rel_tol=args.tolerance)
+        flagged = report[~report["ok"]]
+        print(f"[forecast] Checked {len(report)} month/dataset counts in {args.check}: {len(flagged)} implausible.")
+        if not flagged.empty:
+            print(flagged.to_string(index=False))
+            sys.exit(1)
@@ -0,0 +1,186 @@
+"""
+kpis.py
+───────
+Business KPIs counted while the engine simulates, so MRR, conversion and
+churn are known at generation time without writing, loading and modelling
+the parquet. One JSON line per month:
+
+    {"type": "kpis", "year": "y2", "month": "2025-10", "users": 3584, "active": 1190,
+     "mrr": 41850, "mrr_movements": {"new": {"Growth": 13825}, "expansion": {...}, ...},
+     "transitions": {"Trial": {"Growth": 553, "Expired": 830}, ...},
+     "payments": {"success": {"count": 1002, "amount_usd": 31230}, ...}, ...}
+
+Counters are updated per user and per event as simulate_month's lifecycle
+loop sees them (O(1) each; nothing is recounted at month end):
+
+    transitions     plan at the start of the month → plan at the end, per user
+                    (Canceled / Expired stand for the churned states)
+    mrr_movements   new (trial_convert, reactivate), expansion (upgrade),
+                    contraction (downgrade), churn (cancel), by plan — the
+                    event types mart_mrr groups by; amounts are the price
+                    change against the plan the user was on just before the event
+    mrr             running MRR, start + new + expansion − contraction − churn
+    payments        count and amount by status
+    events          rows per dataset as generated and as written (after chaos)
+
+    python -m src.generator.runner_y2 --kpis data/metrics/y2_kpis.jsonl
+"""
+
+import collections
+import json
+import os
+from datetime import datetime
+
+from .instrument import METRICS_DIR
+
+MOVEMENTS = {
+    "trial_convert": "new",
+    "reactivate":    "new",
+    "upgrade":       "expansion",
+    "downgrade":     "contraction",
+    "cancel":        "churn",
+}
+
+
+class KpiCounters:
+    """
+    Running KPI counters for one year. Construct with log_path=None (or use
+    KpiCounters.disabled()) to turn it off; simulate_month then skips it entirely.
+    """
+
+    def __init__(self, year, log_path=None):
+        self.year     = year
+        self.log_path = log_path
+        self.enabled  = log_path is not None
+        self.prices   = {}
+        self.mrr      = 0.0
+        self._file    = None
+
+    @classmethod
+    def disabled(cls):
+        return cls(year=None)
+
+    # ─────────────────────────────────────────────────────
+    #  RUN / MONTH BOUNDARIES
+    # ─────────────────────────────────────────────────────
+
+    def begin(self, year_config, users):
+        """Starting MRR of a (carried-over / restored) population — the only full pass."""
+        self.year   = year_config.name
+        self.prices = year_config.plan_prices
+        self.mrr    = float(sum(
+            self.prices.get(user.current_plan, 0) for user in users if user.status == "Active"
+        ))
+
+    def start_month(self, label, users):
+        self._month         = label
+        self._users_before  = len(users)
+        self._active_before = users.active
+        self._mrr_before    = self.mrr
+        self._transitions   = collections.Counter()
+        self._event_types   = collections.Counter()
+        self._movements     = collections.defaultdict(collections.Counter)
+        self._movers        = collections.Counter()
+        self._payments      = collections.defaultdict(lambda: {"count": 0, "amount_usd": 0.0})
+        self._generated     = collections.Counter()
+        self._written       = collections.Counter()
+
+    def end_month(self, users):
+        conversions = self._event_types["trial_convert"]
+        trial_ends  = conversions + self._event_types["trial_expire"]
+        movements   = {kind: dict(self._movements[kind]) for kind in ("new", "expansion", "contraction", "churn")}
+        totals      = {kind: sum(by_plan.values()) for kind, by_plan in movements.items()}
+        transitions = collections.defaultdict(dict)
+        for (before, after), n in sorted(self._transitions.items()):
+            transitions[before][after] = n
+
+        self._emit({
+            "type":                  "kpis",
+            "month":                 self._month,
+            "users":                 len(users),
+            "new_users":             len(users) - self._users_before,
+            "active":                users.active,
+            "churned":               users.churned,
+            "mrr_start":             self._mrr_before,
+            "mrr":                   self.mrr,
+            "net_new_mrr":           totals["new"] + totals["expansion"] - totals["contraction"] - totals["churn"],
+            "mrr_movements":         movements,
+            "mrr_movement_users":    dict(self._movers),
+            "trial_conversion_rate": round(conversions / trial_ends, 4) if trial_ends else None,
+            "churn_rate":            round(self._event_types["cancel"] / self._active_before, 4)
+                                     if self._active_before else None,
+            "transitions":           transitions,
+            "subscription_events":   dict(self._event_types),
+            "payments":              dict(self._payments),
+            "events":                {"generated": dict(self._generated), "written": dict(self._written)},
+        })
+
+    def close(self):
+        if not self.enabled:
+            return
+        if self._file:
+            self._file.close()
+            self._file = None
+        print(f"[kpis] KPIs written to {self.log_path}")
+
+    # ─────────────────────────────────────────────────────
+    #  PER-USER / PER-EVENT HOOKS (lifecycle loop)
+    # ─────────────────────────────────────────────────────
+
+    def record_user(self, plan_before, plan_after, subs, pays, prods):
+        """One user's month: transition, its subscription events and payments."""
+        self._transitions[plan_before, plan_after] += 1
+        prices = self.prices
+        plan   = plan_before
+        for event in subs:
+            event_type = event["event_type"]
+            self._event_types[event_type] += 1
+            kind = MOVEMENTS.get(event_type)
+            if kind is not None:
+                delta = prices.get(event["plan"], 0) - prices.get(plan, 0)
+                self._movements[kind][event["plan"] if kind != "churn" else plan] += abs(delta)
+                self._movers[kind] += 1
+                self.mrr          += delta
+            plan = event["plan"]
+        for payment in pays:
+            bucket = self._payments[payment["status"]]
+            bucket["count"]      += 1
+            bucket["amount_usd"] += payment["amount_usd"]
+        self._generated["subscription_events"] += len(subs)
+        self._generated["payments"]            += len(pays)
+        self._generated["product_events"]      += len(prods)
+
+    def record_written(self, dataset_name, n_rows):
+        self._written[dataset_name] += n_rows
+
+    # ─────────────────────────────────────────────────────
+    #  INTERNALS
+    # ─────────────────────────────────────────────────────
+
+    def _emit(self, record):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            self._file = open(self.log_path, "a", encoding="utf-8", buffering=1)
+        self._file.write(json.dumps({"year": self.year, **record}, default=str) + "\n")
+
+
+# ─────────────────────────────────────────────────────────
+#  CLI WIRING (shared by the runners and engine.py)
+# ─────────────────────────────────────────────────────────
+
+def add_cli_args(parser):
+    parser.add_argument(
+        "--kpis",
+        default=None,
+        help=f"JSON-lines KPI path (default {METRICS_DIR}/<year>_kpis_<timestamp>.jsonl).",
+    )
+    parser.add_argument("--no-kpis", action="store_true", help="Do not count KPIs during generation.")
+
+
+def from_args(args, year):
+    if args.no_kpis:
+        return KpiCounters.disabled()
+    path = args.kpis or os.path.join(
+        METRICS_DIR, f"{year}_kpis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    )
+    return KpiCounters(year, path)
@@ -0,0 +1,102 @@
+"""
+month_cache.py
+──────────────
+Content-addressed month keys for the cached Y2 run: a month is only
+regenerated when something it depends on has changed. The cache exists
+only for `runner_y2 --cache`; the Y1 runner and engine.run_years always
+regenerate every month.
+
+Every month gets two keys, hashes of everything its output depends on:
+
+    lifecycle   previous month's lifecycle key, month, year config, seed,
+                rng mode, starting population, lifecycle code
+    output      lifecycle key, the month's chaos plan (+ injector code), writer code
+
+Lifecycle keys chain from a seed that covers the whole YearConfig (every
+month's intake, churn, ...), so any change to it, e.g. M5 intake,
+invalidates all of M1..M12. Output keys don't chain: chaos is seeded per (seed, month, dataset) (rng.chaos_seed) and
+never touches the lifecycle RNGs, so a tweak to M12 chaos only changes
+M12's output key. The users snapshot key hangs off the last lifecycle key.
+
+The keys are stored in the month checkpoints (checkpoint.py), which a
+cached run keeps for every month: a month whose stored output key matches
+is skipped, otherwise its old files are deleted and it is regenerated from
+the previous month's checkpoint.
+"""
+
+import hashlib
+import inspect
+
+from . import chaos, chaos_y2, checkpoint, engine, events, lifecycle_y2, rng, writer
+from .chaos_y2 import apply_chaos_y2, chaos_plan_y2
+from .years import YearConfig
+
+# Code whose edits change the population (and so every later month)
+LIFECYCLE_MODULES = [engine, events, rng, lifecycle_y2, checkpoint]
+
+# Chaos settings that live in module constants rather than in the plan
+CHAOS_MODULES     = [chaos, chaos_y2]
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256("\0".join(str(p) for p in parts).encode()).hexdigest()
+
+
+def code_digest(modules) -> str:
+    return _digest(*(inspect.getsource(m) for m in modules))
+
+
+def file_digest(paths) -> str:
+    """Content hash of input files (e.g. the Y1 snapshot a carry-over run starts from)."""
+    h = hashlib.sha256()
+    for path in sorted(paths):
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def year_digest(year: YearConfig) -> str:
+    """Every YearConfig field except chaos, which is keyed per month."""
+    return _digest(*(f"{name}={value!r}" for name, value in sorted(vars(year).items()) if name != "chaos"))
+
+
+def _chaos_constants() -> str:
+    """Module-level chaos settings (rates, variant lists); schedules are covered by the plan."""
+    return _digest(*(
+        f"{module.__name__}.{name}={value!r}"
+        for module in CHAOS_MODULES
+        for name, value in sorted(vars(module).items())
+        if not name.startswith("__") and not name.startswith("CHAOS_EVENTS")
+        and not callable(value) and not inspect.ismodule(value)
+    ))
+
+
+def chaos_digest(month_idx: int) -> str:
+    """One month's chaos: each dataset's injector sequence, their arguments and source."""
+    parts = [inspect.getsource(apply_chaos_y2)]
+    for dataset_name, ts_field in engine.DATASETS:
+        for injector, kwargs in chaos_plan_y2(month_idx, dataset_name, ts_field):
+            parts.append(f"{dataset_name}:{injector.__module__}.{injector.__qualname__}{sorted(kwargs.items())}")
+            parts.append(inspect.getsource(injector))
+    return _digest(*parts)
+
+
+def month_keys(year: YearConfig, months, seed: int, rng_mode: str, population: str) -> list:
+    """
+    [{"month", "lifecycle", "output"}, ...] for `months` of `year`, plus the
+    users snapshot key as the last entry's "snapshot".
+    `population` identifies the starting users (e.g. a Y1 snapshot digest).
+    """
+    lifecycle = _digest(year_digest(year), seed, rng_mode, population, code_digest(LIFECYCLE_MODULES))
+    writes    = code_digest([writer])
+    output    = _digest(_chaos_constants(), writes)
+    keys      = []
+    for idx, month in enumerate(months):
+        lifecycle = _digest(lifecycle, month.strftime("%Y-%m"))
+        keys.append({
+            "month":     month.strftime("%Y-%m"),
+            "lifecycle": lifecycle,
+            "output":    _digest(lifecycle, output, chaos_digest(idx + 1)),
+        })
+    keys[-1]["snapshot"] = _digest(lifecycle, writes, "users")
+    return keys
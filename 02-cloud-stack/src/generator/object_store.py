@@ -0,0 +1,141 @@
+"""
+object_store.py
+───────────────
+Object-store sink for the generator: partition files are encoded to Parquet
+in memory and streamed straight to R2/S3, skipping the data/raw_y2 disk hop.
+
+Keys keep the same layout upload_to_r2.py produces:
+    y2/<dataset>/event_date=YYYY-MM-DD/<file>.parquet
+
+Memory stays bounded: at most `max_inflight` encoded buffers exist at once;
+`put()` blocks until an upload slot frees up.
+"""
+
+import io
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+DEFAULT_MAX_INFLIGHT = 8
+
+
+class ObjectStoreSink:
+    """Bounded, concurrent Parquet-to-object-store writer."""
+
+    def __init__(self, client, bucket, prefix, transfer_config=None,
+                 max_inflight=DEFAULT_MAX_INFLIGHT, max_retries=3, retry_base_delay=0.5):
+        self.client           = client
+        self.bucket           = bucket
+        self.prefix           = prefix.rstrip("/")
+        self.transfer_config  = transfer_config
+        self.max_retries      = max_retries
+        self.retry_base_delay = retry_base_delay
+
+        self._pool  = ThreadPoolExecutor(max_workers=max_inflight)
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._lock  = threading.Lock()
+        self._pending = set()
+
+        self.files, self.bytes, self.failed = 0, 0, []
+        self._started = time.perf_counter()
+
+    # ─────────────────────────────────────────────────────
+    #  WRITE
+    # ─────────────────────────────────────────────────────
+
+    def put(self, relative_key, df):
+        """Encode df to Parquet in memory and queue it for upload."""
+        self._slots.acquire()   # blocks while max_inflight buffers are pending
+        try:
+            buf = io.BytesIO()
+            df.to_parquet(buf, index=False, engine="pyarrow")
+        except Exception:
+            self._slots.release()
+            raise
+        future = self._pool.submit(self._upload, f"{self.prefix}/{relative_key}", buf)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+
+    def _done(self, future):
+        with self._lock:
+            self._pending.discard(future)
+        self._slots.release()
+
+    def delete(self, relative_keys):
+        """Delete keys (relative to prefix), e.g. a resumed run's partial month."""
+        keys = [f"{self.prefix}/{k}" for k in relative_keys]
+        for i in range(0, len(keys), 1000):   # DeleteObjects limit
+            self.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": k} for k in keys[i:i + 1000]], "Quiet": True},
+            )
+
+    def _upload(self, key, buf):
+        size = buf.getbuffer().nbytes
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                buf.seek(0)
+                extra = {"Config": self.transfer_config} if self.transfer_config else {}
+                # upload_fileobj switches to multipart above the transfer threshold
+                self.client.upload_fileobj(buf, self.bucket, key, **extra)
+                with self._lock:
+                    self.files += 1
+                    self.bytes += size
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"  ✗  {key}  →  {e}")
+                    with self._lock:
+                        self.failed.append(key)
+                    return
+                time.sleep(self.retry_base_delay * 2 ** (attempt - 1))
+
+    # ─────────────────────────────────────────────────────
+    #  LIFECYCLE
+    # ─────────────────────────────────────────────────────
+
+    def flush(self):
+        """Wait for every queued upload; raise if any has failed (call before a checkpoint)."""
+        with self._lock:
+            pending = list(self._pending)
+        wait(pending)
+        if self.failed:
+            raise RuntimeError(f"{len(self.failed)} partition uploads failed: {self.failed[:5]}")
+
+    def close(self):
+        """Wait for pending uploads and print a throughput summary."""
+        self._pool.shutdown(wait=True)
+        elapsed = time.perf_counter() - self._started
+        print(
+            f"[object_store] Uploaded {self.files} files "
+            f"({self.bytes / 1e6:.1f} MB) to s3://{self.bucket}/{self.prefix}/ | "
+            f"Failed: {len(self.failed)} | {elapsed:.1f}s"
+        )
+        if self.failed:
+            raise RuntimeError(f"{len(self.failed)} partition uploads failed: {self.failed[:5]}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def r2_sink_from_env(max_inflight=DEFAULT_MAX_INFLIGHT):
+    """
+    Build a sink from the same R2_* environment variables as upload_to_r2.py
+    (R2_ENDPOINT_URL points it at a local S3 stand-in for testing).
+    """
+    from src.utils import upload_to_r2 as r2
+
+    client = r2.get_client(max_pool_connections=max_inflight * r2.PER_FILE_CONCURRENCY)
+    return ObjectStoreSink(
+        client,
+        bucket=r2.BUCKET_NAME,
+        prefix=r2.R2_PREFIX,
+        transfer_config=r2.TRANSFER_CONFIG,
+        max_inflight=max_inflight,
+        max_retries=r2.MAX_RETRIES,
+        retry_base_delay=r2.RETRY_BASE_DELAY,
+    )
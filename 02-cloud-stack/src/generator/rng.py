@@ -0,0 +1,110 @@
+"""
+rng.py
+──────
+Counter-based randomness keyed by (seed, user, month, purpose).
+
+By default the generator draws from the global np.random / Faker streams, so
+whether a user churns in month 7 depends on every draw made before them.
+With RandomKeys (--rng keyed), every (user, month, purpose) gets its own
+Philox stream whose 128-bit key is a hash of those values:
+
+    state      a user's transitions, payments, subscription events (ids + timestamps)
+    usage      a user's product events
+    profile    a new user's name, email, channel and trial_start event
+    created    the created_at_utc written to the users snapshot
+    intake     a month's new-user count; ("intake", month, i) is new user i's id + country
+
+Any single user-month can then be recomputed on its own (engine.replay_user),
+in any order, without re-running the rest of the population. Keyed runs
+produce different data from stream runs with the same seed.
+
+Chaos is seeded the same way in both modes: stdlib random is reseeded from
+chaos_seed(seed, month, dataset) before each dataset's chaos, so a month's
+chaos depends only on the run seed and that month's events — editing one
+month's chaos leaves every other month's output unchanged.
+
+Sample mode (--sample 0.01) builds on this: only users whose id hash falls
+below the fraction are generated, and since every draw is keyed by user id,
+each of them has exactly the history they have in the full-size run (before
+chaos, which acts on a month's whole batch at fixed rates). Samples are
+nested: the 1% sample is a subset of the 10% one.
+"""
+
+import hashlib
+import random
+
+import numpy as np
+import pandas as pd
+from faker import Faker
+
+
+def seed_globals(seed: int):
+    """Seed the global streams: np.random (lifecycle), stdlib random (chaos), Faker (uuids, names, emails)."""
+    np.random.seed(seed)
+    random.seed(seed)
+    Faker.seed(seed)
+
+
+def chaos_seed(seed: int, month: pd.Timestamp, dataset_name: str) -> int:
+    """Seed for one month's chaos on one dataset."""
+    text = f"{seed}/chaos/{month.strftime('%Y-%m')}/{dataset_name}"
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+
+
+def sample_position(user_id: str) -> float:
+    """Stable position of a user in [0, 1); independent of seed and run size."""
+    digest = hashlib.blake2b(user_id.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") / 2**64
+
+
+class RandomKeys:
+    """Factory for keyed Philox streams (legacy RandomState API, like np.random)."""
+
+    def __init__(self, seed: int, sample: float = 1.0):
+        if not 0 < sample <= 1:
+            raise ValueError(f"sample must be in (0, 1], got {sample}")
+        self.seed   = seed
+        self.sample = sample
+
+    @property
+    def mode(self) -> str:
+        """Recorded in checkpoints; a run must be continued with the same mode."""
+        return "keyed" if self.sample == 1 else f"keyed sample={self.sample:g}"
+
+    def keeps(self, user_id: str) -> bool:
+        return self.sample == 1 or sample_position(user_id) < self.sample
+
+    def stream(self, *parts) -> np.random.RandomState:
+        text   = "/".join(str(p) for p in (self.seed, *parts))
+        digest = hashlib.blake2b(text.encode(), digest_size=16).digest()
+        return np.random.RandomState(np.random.Philox(key=int.from_bytes(digest, "little")))
+
+    def user_month(self, user_id: str, month: pd.Timestamp, purpose: str) -> np.random.RandomState:
+        return self.stream("user", user_id, month.strftime("%Y-%m"), purpose)
+
+    def month(self, month: pd.Timestamp, purpose: str, *parts) -> np.random.RandomState:
+        return self.stream("month", month.strftime("%Y-%m"), purpose, *parts)
+
+
+def add_cli_args(parser):
+    parser.add_argument(
+        "--rng",
+        choices=["stream", "keyed"],
+        default="stream",
+        help="stream: one global RNG stream (default) | keyed: per (user, month, purpose) Philox streams.",
+    )
+    parser.add_argument(
+        "--sample",
+        type=float,
+        default=1.0,
+        help="Generate only this fraction of users (by id hash), e.g. 0.01. Implies --rng keyed.",
+    )
+
+
+def from_args(args, seed: int):
+    """RandomKeys for --rng keyed / --sample, else None (global streams)."""
+    if not 0 < args.sample <= 1:
+        raise SystemExit(f"--sample must be in (0, 1], got {args.sample}")
+    if args.rng == "keyed" or args.sample < 1:
+        return RandomKeys(seed, sample=args.sample)
+    return None
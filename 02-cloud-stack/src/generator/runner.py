@@ -1,83 +1,46 @@
-import numpy as np
-from .chaos import apply_chaos
+import argparse
+
+from . import instrument
+from . import kpis as kpi_counters
+from . import rng as keyed_rng
 from .config import (
     INITIAL_USERS,
-    MAX_NEW_USERS,
-    MIN_NEW_USERS,
     MONTH_RANGE,
     RANDOM_SEED,
 )
-from .lifecycle import generate_user_lifecycle, generate_users_snapshot
+from .engine import Population, simulate_month
+from .lifecycle import UserLifecycle, generate_user_lifecycle, generate_users_snapshot
 from .writer import write_parquet
+from .years import Y1
 
-def run_pipeline():
-    np.random.seed(RANDOM_SEED)
+def run_pipeline(instr=None, keys=None, kpis=None):
+    instr = instr or instrument.Instrumentation.disabled()
+    kpis  = kpis or kpi_counters.KpiCounters.disabled()
+    keyed_rng.seed_globals(RANDOM_SEED)   # numpy, chaos and Faker ids all follow the seed
 
     print(f"Generating initial users: {INITIAL_USERS}")
-    users = generate_user_lifecycle(INITIAL_USERS, start_month=MONTH_RANGE[0])
+    with instr.phase("new_users", events=INITIAL_USERS):
+        users = Population(generate_user_lifecycle(INITIAL_USERS, start_month=MONTH_RANGE[0], keys=keys))
+    kpis.begin(Y1, users)
 
+    # Intake, lifecycle, chaos and a per-month write (see engine.simulate_month)
     for idx, current_month in enumerate(MONTH_RANGE):
-
-        # 1. Add New Users Monthly
-        if idx > 0:
-            new_users_count = int(np.random.randint(MIN_NEW_USERS, MAX_NEW_USERS + 1))
-            new_users = generate_user_lifecycle(new_users_count, start_month=current_month)
-            users.extend(new_users)
-            print(f"[{current_month.strftime('%Y-%m')}] Added new users: {new_users_count}")
-
-        month_subs, month_pays, month_prods = [], [], []
-
-        # 2. Process Monthly Lifecycle for Each User
-        for user in users:
-            user.process_month(current_month)
-            subs, pays, prods = user.collect_and_reset_monthly_events()
-            month_subs.extend(subs)
-            month_pays.extend(pays)
-            month_prods.extend(prods)
-
-        # 3. Apply Chaos
-        month_subs = apply_chaos(
-            month_subs,
-            current_month=current_month,
-            dataset_name="subscription_events",
-            ts_field="event_timestamp_utc",
-        )
-        month_prods = apply_chaos(
-            month_prods,
-            current_month=current_month,
-            dataset_name="product_events",
-            ts_field="event_timestamp_utc",
-        )
-        month_pays = apply_chaos(
-            month_pays,
-            current_month=current_month,
-            dataset_name="payments",
-            ts_field="payment_timestamp_utc",
-        )
-
-        # 4. ✅ Tulis langsung per bulan, tidak numpuk di memory
-        write_parquet(month_subs, "subscription_events", ts_field="event_timestamp_utc")
-        write_parquet(month_prods, "product_events", ts_field="event_timestamp_utc")
-        write_parquet(month_pays, "payments", ts_field="payment_timestamp_utc")
-
-        print(
-            f"[{current_month.strftime('%Y-%m')}] month events -> "
-            f"subs: {len(month_subs)}, pays: {len(month_pays)}, prods: {len(month_prods)}"
-        )
-
-        active_users = sum(1 for u in users if u.status == "Active")
-        churned_users = sum(1 for u in users if u.status == "Churned")
-        print(
-            f"[{current_month.strftime('%Y-%m')}] "
-            f"Total users: {len(users)} | "
-            f"Active: {active_users} | "
-            f"Churned: {churned_users}"
-        )
+        simulate_month(Y1, users, idx, current_month, write=write_parquet, instr=instr,
+                       cls=UserLifecycle, keys=keys, kpis=kpis)
 
     # 5. Snapshot Users (tetap di akhir — ini memang hanya sekali)
-    write_parquet(generate_users_snapshot(users), "users", ts_field="created_at_utc")
+    with instr.phase("write.users", events=len(users)):
+        write_parquet(generate_users_snapshot(users, keys), "users", ts_field="created_at_utc")
 
+    instr.close()
+    kpis.close()
     print("Pipeline Done.")
 
 if __name__ == "__main__":
-    run_pipeline()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    instrument.add_cli_args(parser)
+    kpi_counters.add_cli_args(parser)
+    keyed_rng.add_cli_args(parser)
+    args = parser.parse_args()
+    run_pipeline(instr=instrument.from_args(args, "y1"), keys=keyed_rng.from_args(args, RANDOM_SEED),
+                 kpis=kpi_counters.from_args(args, "y1"))
\ No newline at end of file
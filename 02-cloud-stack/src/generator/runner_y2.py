@@ -11,159 +11,410 @@ Option A — carry over Y1 users from their snapshot parquet:
 Option B — start fresh with INITIAL_USERS_Y2 = 1339 dummy users
     (used when Y1 snapshot is unavailable):
     python -m generator.runner_y2 --no-carry-over
+
+Stream partitions straight to R2 instead of data/raw_y2 (same y2/ key layout):
+    python -m src.generator.runner_y2 --sink r2
+
+Per-phase timings go to data/metrics/y2_<timestamp>.jsonl (see instrument.py):
+    python -m src.generator.runner_y2 --profile cprofile
+
+A checkpoint is saved after every month (see checkpoint.py); continue an
+interrupted run from the last complete month with:
+    python -m src.generator.runner_y2 --resume
+
+Re-run through the month cache (see month_cache.py): months whose inputs
+(config, seed, code, chaos plan) are unchanged since the last cached run are
+skipped, the others regenerated and their old files replaced:
+    python -m src.generator.runner_y2 --cache
+
+Generate one month only (the monthly Airflow run), from the previous
+month's checkpoint:
+    python -m src.generator.runner_y2 --month 2025-07 --sink r2
 """
 
 import argparse
 import glob
 import os
 
-import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
 
-from .chaos_y2 import apply_chaos_y2
+from . import instrument
+from . import kpis as kpi_counters
+from . import month_cache
+from . import rng as keyed_rng
+from .checkpoint import CHECKPOINT_ROOT, CheckpointStore, restore_rng_state
 from .config_y2 import (
     BASE_OUTPUT_PATH_Y2,
     INITIAL_USERS_Y2,
     MONTH_RANGE_Y2,
-    NEW_USERS_BY_MONTH,
     RANDOM_SEED,
     START_MONTH_Y2,
 )
+from .engine import Population, simulate_month
 from .lifecycle_y2 import (
+    UserLifecycleY2,
     carry_over_users_from_y1,
     generate_user_lifecycle_y2,
     generate_users_snapshot_y2,
 )
-
-# Writer is stateless — reuse the one from Y1 but point to Y2 output path
-from .writer import write_parquet as _write_parquet_base
+from .rng import RandomKeys
+from .writer import verify_manifest, write_parquet
+from .years import Y2
 
 
-def write_parquet_y2(events, dataset_name, ts_field="event_timestamp_utc"):
-    """Thin wrapper: writes to BASE_OUTPUT_PATH_Y2 instead of Y1 path."""
-    import pandas as pd
-    from datetime import datetime
-
-    if not events:
-        print(f"[{dataset_name}] No data to write.")
-        return
-
-    df = pd.DataFrame(events)
+def write_parquet_y2(events, dataset_name, ts_field="event_timestamp_utc", sink=None, journal=None,
+                     manifest=None):
+    """
+    Thin wrapper: writes to BASE_OUTPUT_PATH_Y2 instead of Y1 path.
+    With an object-store sink, partitions are streamed to it instead of disk.
+    `journal(key)` is called before each partition is written (checkpointing).
+    """
+    write_parquet(events, dataset_name, ts_field=ts_field, base_path=BASE_OUTPUT_PATH_Y2,
+                  sink=sink, journal=journal, manifest=manifest)
 
-    if ts_field not in df.columns:
-        alt = "event_timestamp_utc" if ts_field != "event_timestamp_utc" else "payment_timestamp_utc"
-        if alt in df.columns:
-            ts_field = alt
-        else:
-            raise ValueError(f"Timestamp field '{ts_field}' not found in events.")
 
-    df[ts_field]    = pd.to_datetime(df[ts_field])
-    df["event_date"] = df[ts_field].dt.date
+# Columns carry-over needs; created_at_utc is re-derived in Y2
+Y1_USER_COLUMNS = [
+    "user_id", "name", "email", "country", "timezone",
+    "acquisition_channel", "current_plan", "current_status",
+]
 
-    for event_date, group in df.groupby("event_date"):
-        partition_path = os.path.join(BASE_OUTPUT_PATH_Y2, dataset_name, f"event_date={event_date}")
-        os.makedirs(partition_path, exist_ok=True)
-        file_name  = f"{dataset_name}_{int(datetime.now().timestamp())}_{event_date}.parquet"
-        full_path  = os.path.join(partition_path, file_name)
-        group.drop(columns=["event_date"]).to_parquet(full_path, index=False, engine="pyarrow")
 
-    print(f"[{dataset_name}] Written {len(df)} records.")
+def _y1_snapshot_files() -> list:
+    return sorted(glob.glob(os.path.join("data", "raw", "users", "**", "*.parquet"), recursive=True))
 
 
-def load_y1_snapshot() -> list:
+def load_y1_snapshot():
     """
-    Load the Y1 users snapshot parquet and return as list of dicts.
-    Falls back to empty list if not found.
+    Load the Y1 users snapshot as an Arrow table (projected scan over all
+    snapshot files, only the columns carry-over uses). None if not found.
     """
-    pattern = os.path.join("data", "raw", "users", "**", "*.parquet")
-    files   = glob.glob(pattern, recursive=True)
+    files = _y1_snapshot_files()
     if not files:
         print("[runner_y2] WARNING: Y1 users snapshot not found. Will generate fresh users.")
-        return []
-    df = pd.concat([pd.read_parquet(f) for f in files], ignore_index=True)
-    print(f"[runner_y2] Loaded {len(df)} users from Y1 snapshot.")
-    return df.to_dict(orient="records")
-
+        return None
+    dataset = ds.dataset(files, format="parquet")
+    table   = dataset.to_table(columns=[c for c in Y1_USER_COLUMNS if c in dataset.schema.names])
+    print(f"[runner_y2] Loaded {table.num_rows} users from Y1 snapshot.")
+    return table
 
-def run_pipeline_y2(carry_over: bool = True):
-    np.random.seed(RANDOM_SEED)
 
-    # ── Bootstrap initial user pool ──────────────────────
+def _bootstrap_users(carry_over: bool, keys: RandomKeys = None) -> Population:
     if carry_over:
         y1_snapshot = load_y1_snapshot()
-        if y1_snapshot:
+        if y1_snapshot is not None and keys is not None and keys.sample < 1:
+            keep        = [keys.keeps(uid) for uid in y1_snapshot.column("user_id").to_pylist()]
+            y1_snapshot = y1_snapshot.filter(pa.array(keep))
+            print(f"[runner_y2] Sample {keys.sample:g}: keeping {y1_snapshot.num_rows} Y1 users.")
+        if y1_snapshot is not None and y1_snapshot.num_rows:
             users = carry_over_users_from_y1(y1_snapshot, start_month=START_MONTH_Y2)
             print(f"[runner_y2] Carried over {len(users)} users from Y1.")
         else:
-            users = generate_user_lifecycle_y2(INITIAL_USERS_Y2, start_month=START_MONTH_Y2)
+            users = generate_user_lifecycle_y2(INITIAL_USERS_Y2, start_month=START_MONTH_Y2, keys=keys)
             print(f"[runner_y2] Generated {len(users)} fresh initial users.")
     else:
-        users = generate_user_lifecycle_y2(INITIAL_USERS_Y2, start_month=START_MONTH_Y2)
+        users = generate_user_lifecycle_y2(INITIAL_USERS_Y2, start_month=START_MONTH_Y2, keys=keys)
         print(f"[runner_y2] Generated {len(users)} fresh initial users (no carry-over).")
+    return Population(users)
+
+
+def _delete_keys(keys, sink=None):
+    if sink is not None:
+        sink.delete(keys)
+        return
+    for key in keys:
+        path = os.path.join(BASE_OUTPUT_PATH_Y2, key)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _discard_partial_month(checkpoints: CheckpointStore, state: dict = None, sink=None):
+    """Remove partitions written by the month that was interrupted."""
+    committed = set(state["files"]) if state else set()   # journal may outlive the save
+    keys      = [k for k in checkpoints.inflight_keys() if k not in committed]
+    checkpoints.clear_journal()
+    if not keys:
+        return
+    _delete_keys(keys, sink)
+    print(f"[runner_y2] Discarded {len(keys)} partial files from the interrupted month.")
+
+
+def _flush_sink(sink, instr):
+    """A checkpoint may only claim files whose uploads have landed."""
+    if sink is None:
+        return
+    with instr.phase("sink.flush"):
+        sink.flush()
+
+
+def _check_rng_mode(state: dict, keys: RandomKeys):
+    """A run can't switch randomness mode (or sample) halfway through."""
+    mode = keys.mode if keys is not None else "stream"
+    if state is not None and state.get("rng_mode", "stream") != mode:
+        raise ValueError(
+            f"Checkpoint for {state['month']} was written in '{state.get('rng_mode', 'stream')}' mode; "
+            f"continue it with the same --rng/--sample (got '{mode}')."
+        )
+    return mode
+
+
+def _seed_all():
+    keyed_rng.seed_globals(RANDOM_SEED)
+
+
+def simulate_month_y2(users: Population, idx: int, current_month: pd.Timestamp,
+                      sink=None, instr=None, journal=None, keys: RandomKeys = None, kpis=None,
+                      manifest=None):
+    """
+    One month of the Y2 simulation: intake, lifecycle, chaos, write.
+    Mutates `users` in place (new users appended, state advanced, terminal archived).
+    """
+    def write(events, dataset_name, ts_field):
+        write_parquet_y2(events, dataset_name, ts_field=ts_field, sink=sink, journal=journal,
+                         manifest=manifest)
+
+    simulate_month(Y2, users, idx, current_month, write=write, instr=instr, cls=UserLifecycleY2,
+                   keys=keys, kpis=kpis)
+
+
+def run_pipeline_y2(carry_over: bool = True, sink=None, instr=None,
+                    checkpoints: CheckpointStore = None, resume: bool = False,
+                    keys: RandomKeys = None, kpis=None):
+    instr    = instr or instrument.Instrumentation.disabled()
+    kpis     = kpis or kpi_counters.KpiCounters.disabled()
+    rng_mode = keys.mode if keys is not None else "stream"
+    _seed_all()
+
+    # ── Bootstrap initial user pool (or restore a checkpoint) ──
+    latest    = checkpoints.latest() if checkpoints is not None and resume else None
+    start_idx = 0
+    if latest is not None:
+        if checkpoints.is_finished():
+            print("[runner_y2] Last run already completed — nothing to resume.")
+            return
+        start_idx, state = latest
+        _check_rng_mode(state, keys)
+        _discard_partial_month(checkpoints, state, sink)
+        users = Population(checkpoints.load_users(start_idx))
+        restore_rng_state(state["rng"])
+        print(f"[runner_y2] Resuming after {state['month']} with {len(users)} users.")
+    else:
+        if resume:
+            print("[runner_y2] No checkpoint found — starting from the first month.")
+        if checkpoints is not None:
+            checkpoints.reset()
+        with instr.phase("new_users") as phase:
+            users = _bootstrap_users(carry_over, keys)
+            phase.events = len(users)
+    journal  = checkpoints.journal if checkpoints is not None else None
+    manifest = {} if keys is not None and keys.sample < 1 and sink is None else None
+    kpis.begin(Y2, users)
 
     # ── Monthly loop ─────────────────────────────────────
     for idx, current_month in enumerate(MONTH_RANGE_Y2):
-        month_num = idx + 1   # 1-based
-
-        # Add new users every month (volume from NEW_USERS_BY_MONTH)
-        if idx > 0:
-            lo, hi        = NEW_USERS_BY_MONTH.get(month_num, (50, 100))
-            new_user_count = int(np.random.randint(lo, hi + 1))
-            new_users      = generate_user_lifecycle_y2(new_user_count, start_month=current_month)
-            users.extend(new_users)
-            print(f"[{current_month.strftime('%Y-%m')}] Added new users: {new_user_count}")
-
-        month_subs, month_pays, month_prods = [], [], []
-
-        # Process lifecycle for every user
-        for user in users:
-            user.process_month(current_month)
-            subs, pays, prods = user.collect_and_reset_monthly_events()
-            month_subs.extend(subs)
-            month_pays.extend(pays)
-            month_prods.extend(prods)
-
-        # Apply Y2 chaos
-        month_subs = apply_chaos_y2(
-            month_subs,
-            current_month=current_month,
-            dataset_name="subscription_events",
-            ts_field="event_timestamp_utc",
-        )
-        month_prods = apply_chaos_y2(
-            month_prods,
-            current_month=current_month,
-            dataset_name="product_events",
-            ts_field="event_timestamp_utc",
-        )
-        month_pays = apply_chaos_y2(
-            month_pays,
-            current_month=current_month,
-            dataset_name="payments",
-            ts_field="payment_timestamp_utc",
-        )
+        if idx < start_idx:
+            continue
+        simulate_month_y2(users, idx, current_month, sink=sink, instr=instr, journal=journal, keys=keys,
+                          kpis=kpis, manifest=manifest)
+
+        if checkpoints is not None:
+            _flush_sink(sink, instr)
+            with instr.phase("checkpoint", events=len(users)):
+                checkpoints.save(idx + 1, current_month, users,
+                                 extra={"carry_over": carry_over, "rng_mode": rng_mode})
+
+    # ── Final snapshot ────────────────────────────────────
+    with instr.phase("write.users", events=len(users)):
+        write_parquet_y2(generate_users_snapshot_y2(users, keys), "users", ts_field="created_at_utc",
+                         sink=sink, journal=journal, manifest=manifest)
+    if manifest is not None:
+        on_disk = verify_manifest(BASE_OUTPUT_PATH_Y2, manifest)
+        print(f"[runner_y2] Sample check passed: {sum(on_disk.values())} rows on disk.")
+    if sink is not None:
+        with instr.phase("sink.close"):
+            sink.close()
+    if checkpoints is not None:
+        checkpoints.finish()
+    instr.close()
+    kpis.close()
+    print("Y2 Pipeline Done.")
 
-        # Write
-        write_parquet_y2(month_subs,  "subscription_events", ts_field="event_timestamp_utc")
-        write_parquet_y2(month_prods, "product_events",      ts_field="event_timestamp_utc")
-        write_parquet_y2(month_pays,  "payments",            ts_field="payment_timestamp_utc")
 
-        print(
-            f"[{current_month.strftime('%Y-%m')}] "
-            f"subs: {len(month_subs)}, pays: {len(month_pays)}, prods: {len(month_prods)}"
+def _population_digest(carry_over: bool) -> str:
+    """What the first month starts from, for the month cache keys."""
+    files = _y1_snapshot_files() if carry_over else []
+    return f"y1:{month_cache.file_digest(files)}" if files else "fresh"
+
+
+def run_cached_y2(carry_over: bool = True, sink=None, instr=None,
+                  checkpoints: CheckpointStore = None, keys: RandomKeys = None, kpis=None):
+    """
+    Full Y2 run through the month cache (month_cache.py). A month whose
+    output key matches the one stored in its checkpoint is skipped; any
+    other month deletes the files its last run wrote and is regenerated from
+    the previous month's checkpoint. The result matches an uncached run.
+    KPIs are only emitted for the months that are regenerated.
+    """
+    instr       = instr or instrument.Instrumentation.disabled()
+    kpis        = kpis or kpi_counters.KpiCounters.disabled()
+    checkpoints = checkpoints or CheckpointStore()
+    checkpoints.keep = None   # every month is a potential restart point
+    os.makedirs(checkpoints.root, exist_ok=True)
+    rng_mode    = keys.mode if keys is not None else "stream"
+    plan        = month_cache.month_keys(Y2, MONTH_RANGE_Y2, RANDOM_SEED, rng_mode, _population_digest(carry_over))
+
+    # Partial output of an interrupted cached run (files not recorded in any month)
+    committed = set()
+    for month_num in range(1, len(MONTH_RANGE_Y2) + 1):
+        committed.update((checkpoints.load_state(month_num) or {}).get("files", []))
+    _discard_partial_month(checkpoints, {"files": sorted(committed)}, sink)
+
+    def load_population(month_num):
+        """Population after month_num (0 = bootstrap), with the RNGs where that run left them."""
+        if month_num == 0:
+            _seed_all()
+            with instr.phase("new_users") as phase:
+                population = _bootstrap_users(carry_over, keys)
+                phase.events = len(population)
+            return population
+        state = checkpoints.load_state(month_num)
+        restore_rng_state(state["rng"])
+        print(f"[runner_y2] Loaded {state['n_users']} users from the cached {state['month']} checkpoint.")
+        return Population(checkpoints.load_users(month_num))
+
+    # ── Monthly loop: skip months whose inputs are unchanged ──
+    users, reused = None, 0
+    for idx, current_month in enumerate(MONTH_RANGE_Y2):
+        entry = plan[idx]
+        state = checkpoints.load_state(idx + 1)
+        if state is not None and state.get("output_key") == entry["output"]:
+            print(f"[{entry['month']}] Unchanged — keeping {len(state['files'])} cached files.")
+            users   = None   # reloaded from this checkpoint if a later month needs it
+            reused += 1
+            continue
+
+        if users is None:
+            users = load_population(idx)
+            kpis.begin(Y2, users)
+        if state is not None:
+            _delete_keys(state["files"], sink)
+            print(f"[{entry['month']}] Inputs changed — replacing {len(state['files'])} files.")
+        simulate_month_y2(users, idx, current_month, sink=sink, instr=instr,
+                          journal=checkpoints.journal, keys=keys, kpis=kpis)
+        _flush_sink(sink, instr)
+        with instr.phase("checkpoint", events=len(users)):
+            checkpoints.save(idx + 1, current_month, users, extra={
+                "carry_over":    carry_over,
+                "rng_mode":      rng_mode,
+                "lifecycle_key": entry["lifecycle"],
+                "output_key":    entry["output"],
+            })
+
+    # ── Final snapshot ────────────────────────────────────
+    finished = checkpoints.load_finished()
+    if finished is not None and finished.get("snapshot_key") == plan[-1]["snapshot"]:
+        print("[runner_y2] Users snapshot unchanged — kept.")
+    else:
+        if users is None:
+            users = load_population(len(MONTH_RANGE_Y2))
+        if finished:
+            _delete_keys(finished.get("files", []), sink)
+        with instr.phase("write.users", events=len(users)):
+            write_parquet_y2(generate_users_snapshot_y2(users, keys), "users", ts_field="created_at_utc",
+                             sink=sink, journal=checkpoints.journal)
+        _flush_sink(sink, instr)
+        checkpoints.finish(extra={"snapshot_key": plan[-1]["snapshot"]})
+    if sink is not None:
+        with instr.phase("sink.close"):
+            sink.close()
+    instr.close()
+    kpis.close()
+    print(f"Y2 Pipeline Done ({reused}/{len(MONTH_RANGE_Y2)} months reused from cache).")
+
+
+def run_month_y2(month: str, carry_over: bool = True, sink=None, instr=None,
+                 checkpoints: CheckpointStore = None, keys: RandomKeys = None, kpis=None,
+                 skip_out_of_range: bool = False) -> bool:
+    """
+    Generate exactly one month (e.g. "2025-07") from the persisted population:
+    load the previous month's checkpoint, simulate, write that month's
+    partitions plus a users snapshot, and save the new checkpoint.
+
+    Re-running the latest month (an Airflow retry) first deletes the files its
+    previous attempt wrote, snapshot included, so the month is replaced rather
+    than duplicated. Months must be generated in order; M1 bootstraps the
+    population.
+
+    With skip_out_of_range, a month outside the Y2 range is skipped (returns
+    False) instead of raising, so the scheduled DAG keeps running after the
+    simulated calendar ends. A missing previous checkpoint always raises: a
+    failed or never-run month must not turn later months into no-ops.
+    """
+    instr       = instr or instrument.Instrumentation.disabled()
+    kpis        = kpis or kpi_counters.KpiCounters.disabled()
+    checkpoints = checkpoints or CheckpointStore()
+    current     = pd.Timestamp(f"{month}-01")
+    if current not in MONTH_RANGE_Y2:
+        message = (
+            f"--month {month} is outside the Y2 range "
+            f"{MONTH_RANGE_Y2[0]:%Y-%m}..{MONTH_RANGE_Y2[-1]:%Y-%m}"
         )
+        if skip_out_of_range:
+            print(f"[runner_y2] Skipping: {message}.")
+            return False
+        raise ValueError(message)
+    idx = MONTH_RANGE_Y2.get_loc(current)
 
-        active  = sum(1 for u in users if u.status == "Active")
-        churned = sum(1 for u in users if u.status == "Churned")
-        print(
-            f"[{current_month.strftime('%Y-%m')}] "
-            f"Total: {len(users)} | Active: {active} | Churned: {churned}"
+    state = checkpoints.load_state(idx) if idx > 0 else None
+    if idx > 0 and state is None:
+        prev = MONTH_RANGE_Y2[idx - 1].strftime("%Y-%m")
+        raise FileNotFoundError(
+            f"No checkpoint for {prev} in {checkpoints.root}; generate {prev} first "
+            f"(or run the full pipeline)."
         )
+    rng_mode = _check_rng_mode(state, keys)
 
-    # ── Final snapshot ────────────────────────────────────
-    write_parquet_y2(generate_users_snapshot_y2(users), "users", ts_field="created_at_utc")
-    print("Y2 Pipeline Done.")
+    # A previous attempt at this month (complete or not) is replaced
+    previous_attempt = checkpoints.load_state(idx + 1)
+    if previous_attempt is not None:
+        _delete_keys(previous_attempt["files"], sink)
+        print(f"[runner_y2] Replacing {len(previous_attempt['files'])} files from a previous {month} run.")
+    _discard_partial_month(checkpoints, state, sink)
+
+    if idx == 0:
+        checkpoints.reset()
+        _seed_all()
+        with instr.phase("new_users") as phase:
+            users = _bootstrap_users(carry_over, keys)
+            phase.events = len(users)
+    else:
+        checkpoints.drop_after(idx)
+        users = Population(checkpoints.load_users(idx))
+        restore_rng_state(state["rng"])
+        print(f"[runner_y2] Loaded {len(users)} users from the {state['month']} checkpoint.")
+    kpis.begin(Y2, users)
+
+    simulate_month_y2(users, idx, current, sink=sink, instr=instr, journal=checkpoints.journal, keys=keys,
+                      kpis=kpis)
+    _flush_sink(sink, instr)
+    with instr.phase("checkpoint", events=len(users)):
+        checkpoints.save(idx + 1, current, users, extra={"carry_over": carry_over, "rng_mode": rng_mode})
 
+    # Snapshot after the checkpoint: its RNG draws must not shift the next month.
+    # Its keys join the month's files so a retry replaces it too.
+    with instr.phase("write.users", events=len(users)):
+        write_parquet_y2(generate_users_snapshot_y2(users, keys), "users", ts_field="created_at_utc",
+                         sink=sink, journal=checkpoints.journal)
+    checkpoints.attach_journal(idx + 1)
+    if sink is not None:
+        with instr.phase("sink.close"):
+            sink.close()
+    instr.close()
+    kpis.close()
+    print(f"Y2 month {month} done.")
+    return True
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -172,5 +423,86 @@ if __name__ == "__main__":
         action="store_true",
         help="Skip Y1 snapshot and generate fresh initial users instead.",
     )
+    parser.add_argument(
+        "--sink",
+        choices=["local", "r2"],
+        default="local",
+        help="local: write to data/raw_y2 | r2: stream partitions to R2 (R2_* env vars).",
+    )
+    parser.add_argument(
+        "--month",
+        default=None,
+        help="Generate only this month (YYYY-MM) from the previous month's checkpoint.",
+    )
+    parser.add_argument(
+        "--skip-out-of-range",
+        action="store_true",
+        help="With --month: exit 0 instead of failing when the month is outside the Y2 range.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue from the last complete month checkpoint.",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        default=CHECKPOINT_ROOT,
+        help=f"Where month checkpoints are kept (default {CHECKPOINT_ROOT}).",
+    )
+    parser.add_argument("--no-checkpoint", action="store_true", help="Do not save month checkpoints.")
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Skip months whose inputs are unchanged since the last --cache run (keeps every checkpoint).",
+    )
+    instrument.add_cli_args(parser)
+    kpi_counters.add_cli_args(parser)
+    keyed_rng.add_cli_args(parser)
     args  = parser.parse_args()
-    run_pipeline_y2(carry_over=not args.no_carry_over)
\ No newline at end of file
+    if (args.resume or args.month) and args.no_checkpoint:
+        parser.error("--resume/--month need checkpoints; drop --no-checkpoint.")
+    if args.skip_out_of_range and not args.month:
+        parser.error("--skip-out-of-range only applies to --month.")
+    if args.resume and args.month:
+        parser.error("--resume and --month are mutually exclusive.")
+    if args.cache and (args.resume or args.month or args.no_checkpoint):
+        parser.error("--cache is a full run on its own checkpoints; drop --resume/--month/--no-checkpoint.")
+
+    sink = None
+    if args.sink == "r2":
+        from .object_store import r2_sink_from_env
+        sink = r2_sink_from_env()
+    instr       = instrument.from_args(args, "y2")
+    kpis        = kpi_counters.from_args(args, "y2")
+    checkpoints = None if args.no_checkpoint else CheckpointStore(args.checkpoint_dir)
+    keys        = keyed_rng.from_args(args, RANDOM_SEED)
+    if args.cache:
+        run_cached_y2(
+            carry_over=not args.no_carry_over,
+            sink=sink,
+            instr=instr,
+            checkpoints=checkpoints,
+            keys=keys,
+            kpis=kpis,
+        )
+    elif args.month:
+        run_month_y2(
+            args.month,
+            carry_over=not args.no_carry_over,
+            sink=sink,
+            instr=instr,
+            checkpoints=checkpoints,
+            keys=keys,
+            kpis=kpis,
+            skip_out_of_range=args.skip_out_of_range,
+        )
+    else:
+        run_pipeline_y2(
+            carry_over=not args.no_carry_over,
+            sink=sink,
+            instr=instr,
+            checkpoints=checkpoints,
+            resume=args.resume,
+            keys=keys,
+            kpis=kpis,
+        )
\ No newline at end of file
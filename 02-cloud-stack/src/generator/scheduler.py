@@ -0,0 +1,423 @@
+"""
+scheduler.py
+────────────
+Event-driven engine: day/second-resolution lifecycles at about the cost of
+the monthly one.
+
+engine.simulate_month advances every live user one whole month per tick,
+and each event gets an unrelated random timestamp inside that month, so a
+retry can land before the payment it retries and a cancel before the trial
+converts. Here every user has their next due actions in one priority queue,
+ordered by local time:
+
+    trial_end     signup (trial_start) + TRIAL_DAYS → convert (first renewal
+                  right away) or expire
+    renewal       billing date, monthly from the first charge → payment, then
+                  this cycle's churn / plan change draw and product usage
+    retry         failed payment + RETRY_DAYS; the MAX_FAILED_PAYMENTS-th
+                  failure in a row cancels
+    cancel        churn drawn at renewal, at a random time within the cycle
+    plan_change   upgrade / downgrade drawn at renewal, within the cycle
+    reactivate    canceled users, Geometric(reactivation_prob) months later
+
+A month pops only the actions due before its end, so only users with
+something due are touched. Actions made stale by a cancel or expiry are
+dropped via a per-user version. Usage is generated for the span a plan is
+actually held, and events that fall past the month end are batched with the
+month they fall in. Intake, chaos and writes are engine's (month_intake,
+chaos_and_write), with the same schemas and output layout.
+
+    python -m src.generator.scheduler --years 2 --output-root data/daily
+
+Probabilities are the YearConfig's monthly ones, applied per billing cycle.
+Output differs from the monthly engine's for the same seed. Not supported
+here: checkpoints / --resume / --cache and KPI counters.
+"""
+
+import argparse
+import collections
+import functools
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from . import instrument
+from . import rng as keyed_rng
+from .engine import (
+    MAX_FAILED_PAYMENTS,
+    Population,
+    chaos_and_write,
+    generate_users,
+    generate_users_snapshot,
+    month_intake,
+)
+from .events import local_to_utc, random_uuid
+from .rng import RandomKeys
+from .writer import write_parquet
+from .years import YearConfig, year_sequence
+
+DAY           = 86_400
+MONTH_SECONDS = 30 * DAY   # usage limits are per 30 days of holding a plan
+TRIAL_DAYS    = 14
+RETRY_DAYS    = 3
+
+
+def _to_seconds(ts: pd.Timestamp) -> int:
+    return int(ts.timestamp())
+
+
+def _next_month(seconds: int) -> int:
+    """Same day and time one month later (clamped to the month's last day)."""
+    return _to_seconds(pd.to_datetime(seconds, unit="s") + pd.DateOffset(months=1))
+
+
+def _month_start(seconds: int, months_ahead: int = 0) -> pd.Timestamp:
+    return pd.to_datetime(seconds, unit="s").to_period("M").to_timestamp() + pd.DateOffset(months=months_ahead)
+
+
+def _empty_batches():
+    return {"subscription_events": [], "product_events": [], "payments": []}
+
+
+class DailyScheduler:
+    """
+    Priority queue of (due, seq, kind, user, version, payload) plus the
+    population it drives. Times are local wall-clock seconds, like
+    events.random_timestamp_in_month. With `keys`, each action draws from
+    its own stream keyed by (user, kind, due).
+    """
+
+    def __init__(self, users: Population, keys: RandomKeys = None):
+        self.users    = users
+        self.keys     = keys
+        self.queue    = []
+        self.versions = {}   # id(user) → bumped when pending actions become void
+        self.outbox   = collections.defaultdict(_empty_batches)   # "YYYY-MM" → events
+        self._seq     = 0
+        self._handlers = {
+            "trial_end":   self._on_trial_end,
+            "renewal":     self._on_renewal,
+            "retry":       self._on_retry,
+            "cancel":      self._on_cancel,
+            "plan_change": self._on_plan_change,
+            "reactivate":  self._on_reactivate,
+        }
+
+    # ─────────────────────────────────────────────────────
+    #  QUEUE
+    # ─────────────────────────────────────────────────────
+
+    def schedule(self, user, kind: str, due: int, payload=None):
+        self._seq += 1
+        heapq.heappush(self.queue, (due, self._seq, kind, user, self.versions.get(id(user), 0), payload))
+
+    def _invalidate(self, user):
+        self.versions[id(user)] = self.versions.get(id(user), 0) + 1
+
+    def run_until(self, end: int) -> int:
+        """Process every action due before `end` (in due order); returns how many ran."""
+        queue, versions, keys = self.queue, self.versions, self.keys
+        n_actions = 0
+        while queue and queue[0][0] < end:
+            due, _, kind, user, version, payload = heapq.heappop(queue)
+            if version != versions.get(id(user), 0):
+                continue
+            rng = None if keys is None else keys.stream("user", user.user_id, kind, due)
+            self._handlers[kind](user, due, payload, rng)
+            n_actions += 1
+        return n_actions
+
+    # ─────────────────────────────────────────────────────
+    #  ENROLMENT (new users, or a population built elsewhere)
+    # ─────────────────────────────────────────────────────
+
+    def enroll(self, users, month: pd.Timestamp):
+        """Queue the first action of each user; their buffered events (trial_start) go to the outbox."""
+        month_start = _to_seconds(month)
+        month_end   = _to_seconds(month + pd.DateOffset(months=1))
+        for user in users:
+            subs, pays, prods = user.collect_and_reset_monthly_events()
+            for dataset_name, events in (("subscription_events", subs), ("payments", pays),
+                                         ("product_events", prods)):
+                for event in events:
+                    self.outbox[event["batch_month"]][dataset_name].append(event)
+
+            rng  = None if self.keys is None else self.keys.user_month(user.user_id, month, "schedule")
+            draw = np.random if rng is None else rng
+            if user.status == "Active" and user.current_plan == "Trial":
+                trial_start = [e for e in subs if e["event_type"] == "trial_start"]
+                signup      = (_to_seconds(trial_start[0]["event_timestamp_local"]) if trial_start
+                               else int(draw.randint(month_start, month_end)))
+                trial_end   = signup + TRIAL_DAYS * DAY
+                self.schedule(user, "trial_end", trial_end)
+                self._usage(user, "Trial", signup, trial_end, rng)
+            elif user.status == "Active":
+                self.schedule(user, "renewal", int(draw.randint(month_start, month_end)))
+            elif user.current_plan == "Canceled":
+                self._schedule_reactivation(user, month_start, draw, months_ahead=0)
+
+    # ─────────────────────────────────────────────────────
+    #  ACTIONS
+    # ─────────────────────────────────────────────────────
+
+    def _on_trial_end(self, user, due, payload, rng):
+        year = user.year
+        if (np.random if rng is None else rng).rand() < year.trial_convert_prob:
+            user.current_plan = year.convert_plan
+            self._subscription_event(user, "trial_convert", year.convert_plan, due, rng)
+            self._bill(user, due, due, rng)
+        else:
+            user.status       = "Churned"
+            user.current_plan = "Expired"
+            self._subscription_event(user, "trial_expire", "Expired", due, rng)
+            self.users.active -= 1
+            self._invalidate(user)
+
+    def _on_renewal(self, user, due, payload, rng):
+        self._bill(user, due, due, rng)
+
+    def _on_retry(self, user, due, anchor, rng):
+        self._bill(user, due, anchor, rng)
+
+    def _on_cancel(self, user, due, payload, rng):
+        self._cancel(user, due, rng)
+
+    def _on_plan_change(self, user, due, payload, rng):
+        direction, cycle_end = payload
+        plans = user.year.plans
+        if user.current_plan not in plans:
+            return
+        rank = plans.index(user.current_plan) + direction
+        if not 0 <= rank < len(plans):
+            return
+        user.current_plan = plans[rank]
+        self._subscription_event(user, "upgrade" if direction > 0 else "downgrade", plans[rank], due, rng)
+        self._usage(user, plans[rank], due, cycle_end, rng)
+
+    def _on_reactivate(self, user, due, payload, rng):
+        year = user.year
+        user.status          = "Active"
+        user.current_plan    = year.free_plan
+        user.failed_payments = 0
+        self._subscription_event(user, "reactivate", year.free_plan, due, rng)
+        self.users.active += 1
+        self._bill(user, due, due, rng)
+
+    # ─────────────────────────────────────────────────────
+    #  BILLING CYCLE
+    # ─────────────────────────────────────────────────────
+
+    def _bill(self, user, due, anchor, rng):
+        """Charge the cycle starting at `anchor` (retries keep it); on success, start the cycle."""
+        year   = user.year
+        draw   = np.random if rng is None else rng
+        plan   = user.current_plan
+        amount = year.plan_prices.get(plan, 0) if plan in year.plans and plan != year.free_plan else 0
+        if amount > 0:
+            is_success = draw.rand() > year.payment_fail_prob
+            attempt    = user.failed_payments + 1
+            user.failed_payments = 0 if is_success else attempt
+            self._payment(user, amount, "success" if is_success else "failed", attempt, due, rng)
+            if not is_success:
+                if user.failed_payments >= MAX_FAILED_PAYMENTS:
+                    self._cancel(user, due, rng)
+                else:
+                    self.schedule(user, "retry", due + RETRY_DAYS * DAY, anchor)
+                return
+        self._start_cycle(user, due, _next_month(anchor), rng)
+
+    def _start_cycle(self, user, start, end, rng):
+        """Next renewal at `end`; this cycle's churn or plan change, and usage until then."""
+        year = user.year
+        draw = np.random if rng is None else rng
+        plan = user.current_plan
+        self.schedule(user, "renewal", end)
+
+        if draw.rand() < year.churn_prob:
+            at = int(draw.randint(start, end))
+            self.schedule(user, "cancel", at)
+            self._usage(user, plan, start, at, rng)
+            return
+
+        direction = 0
+        if plan in year.plans:
+            rank = year.plans.index(plan)
+            if draw.rand() < year.upgrade_prob:
+                direction = 1 if rank + 1 < len(year.plans) else 0
+            elif draw.rand() < year.downgrade_prob:
+                direction = -1 if rank > 0 else 0
+        if direction:
+            at = int(draw.randint(start, end))
+            self.schedule(user, "plan_change", at, (direction, end))
+            self._usage(user, plan, start, at, rng)
+        else:
+            self._usage(user, plan, start, end, rng)
+
+    def _cancel(self, user, due, rng):
+        user.status       = "Churned"
+        user.current_plan = "Canceled"
+        self._subscription_event(user, "cancel", "Canceled", due, rng)
+        self.users.active -= 1
+        self._invalidate(user)
+        self._schedule_reactivation(user, due, np.random if rng is None else rng)
+
+    def _schedule_reactivation(self, user, since, draw, months_ahead=None):
+        """Monthly reactivation draws → the first success is Geometric(p) months after `since`."""
+        p = user.year.reactivation_prob
+        if p <= 0:
+            return
+        if months_ahead is None:
+            months_ahead = int(draw.geometric(p))
+        else:
+            months_ahead += int(draw.geometric(p)) - 1
+        start = _month_start(since, months_ahead)
+        self.schedule(user, "reactivate",
+                      int(draw.randint(max(since, _to_seconds(start)), _to_seconds(start + pd.DateOffset(months=1)))))
+
+    # ─────────────────────────────────────────────────────
+    #  EVENTS (same schemas as engine.SimUser)
+    # ─────────────────────────────────────────────────────
+
+    def _stamp(self, user, seconds):
+        local_ts = pd.to_datetime(seconds, unit="s")
+        return local_ts, local_to_utc(local_ts, user.timezone_str), local_ts.strftime("%Y-%m")
+
+    def _subscription_event(self, user, event_type, plan, seconds, rng):
+        local_ts, utc_ts, batch_month = self._stamp(user, seconds)
+        self.outbox[batch_month]["subscription_events"].append({
+            "event_id":               random_uuid(rng),
+            "user_id":                user.user_id,
+            "event_type":             event_type,
+            "plan":                   plan,
+            "event_timestamp_local":  local_ts,
+            "event_timestamp_utc":    utc_ts,
+            "country":                user.country,
+            "batch_month":            batch_month,
+        })
+
+    def _payment(self, user, amount, status, attempt, seconds, rng):
+        local_ts, utc_ts, batch_month = self._stamp(user, seconds)
+        self.outbox[batch_month]["payments"].append({
+            "payment_id":              random_uuid(rng),
+            "user_id":                 user.user_id,
+            "amount_usd":              amount,
+            "status":                  status,
+            "attempt_number":          attempt,
+            "payment_timestamp_local": local_ts,
+            "payment_timestamp_utc":   utc_ts,
+            "batch_month":             batch_month,
+        })
+
+    def _usage(self, user, plan, start, end, rng):
+        """Product usage while `plan` is held over [start, end): the plan's limit per 30 days."""
+        limit = user.year.event_limits.get(plan, 0)
+        if limit <= 0 or end <= start:
+            return
+        draw  = np.random if rng is None else rng
+        count = int(round(draw.randint(1, limit + 1) * (end - start) / MONTH_SECONDS))
+        for seconds in draw.randint(start, end, size=count):
+            local_ts, utc_ts, batch_month = self._stamp(user, int(seconds))
+            self.outbox[batch_month]["product_events"].append({
+                "event_id":              random_uuid(rng),
+                "user_id":               user.user_id,
+                "event_type":            "product_usage",
+                "plan":                  plan,
+                "event_timestamp_local": local_ts,
+                "event_timestamp_utc":   utc_ts,
+                "batch_month":           batch_month,
+            })
+
+    # ─────────────────────────────────────────────────────
+    #  MONTHLY FLUSH
+    # ─────────────────────────────────────────────────────
+
+    def simulate_month(self, year: YearConfig, idx: int, current_month: pd.Timestamp,
+                       write=None, instr=None):
+        """Intake, every action due this month, then chaos + write of the events that fall in it."""
+        instr = instr or instrument.Instrumentation.disabled()
+        write = write or functools.partial(write_parquet, base_path=year.output_path)
+        users = self.users
+        label = current_month.strftime('%Y-%m')
+        instr.start_month(label)
+
+        if idx > 0:
+            new_users = month_intake(year, idx, current_month, instr, keys=self.keys)
+            users.extend(new_users)
+            self.enroll(new_users, current_month)
+
+        with instr.phase("lifecycle") as phase:
+            n_actions    = self.run_until(_to_seconds(current_month + pd.DateOffset(months=1)))
+            phase.events = n_actions
+            live         = [user for user in users.live if not user.is_terminal]
+            users.archived += len(users.live) - len(live)
+            users.live      = live
+        print(f"[{label}] Due actions processed: {n_actions} (queued: {len(self.queue)})")
+
+        chaos_and_write(year, self.outbox.pop(label, None) or _empty_batches(), idx, current_month,
+                        write, instr, self.keys)
+
+        print(f"[{label}] Total users: {len(users)} | Active: {users.active} | Churned: {users.churned}")
+        instr.end_month(users=len(users), active=users.active, churned=users.churned,
+                        archived=users.archived)
+
+
+# ─────────────────────────────────────────────────────────
+#  MULTI-YEAR RUN
+# ─────────────────────────────────────────────────────────
+
+def run_years_daily(years: list, output_root: str = None, instr=None,
+                    keys: RandomKeys = None) -> Population:
+    """
+    engine.run_years on the scheduler: the queue (and everything pending in
+    it) carries across year boundaries along with the population.
+    """
+    instr = instr or instrument.Instrumentation.disabled()
+    keyed_rng.seed_globals(years[0].seed)
+
+    users     = Population()
+    scheduler = DailyScheduler(users, keys)
+    for year in years:
+        base_path = f"{output_root}/{year.name}" if output_root else year.output_path
+        write     = functools.partial(write_parquet, base_path=base_path)
+
+        if users:
+            with instr.phase("carry_over", events=len(users)):
+                for user in users:
+                    user.enter_year(year)
+            print(f"[scheduler] {year.name}: carried over {len(users)} users.")
+        else:
+            with instr.phase("new_users", events=year.initial_users):
+                initial = generate_users(year, year.initial_users, year.start_month, keys=keys)
+                users.extend(initial)
+                scheduler.enroll(initial, year.start_month)
+            print(f"[scheduler] {year.name}: generated {len(users)} initial users.")
+
+        for idx, current_month in enumerate(year.month_range):
+            scheduler.simulate_month(year, idx, current_month, write=write, instr=instr)
+
+        with instr.phase("write.users", events=len(users)):
+            write(generate_users_snapshot(users, keys), "users", ts_field="created_at_utc")
+        print(f"[scheduler] {year.name} done -> {base_path}")
+
+    instr.close()
+    return users
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", type=int, default=1, help="Number of consecutive years (Y1, Y2, y3, ...).")
+    parser.add_argument(
+        "--output-root",
+        default=None,
+        help="Write each year under <root>/<year name> instead of its own default path.",
+    )
+    instrument.add_cli_args(parser)
+    keyed_rng.add_cli_args(parser)
+    args  = parser.parse_args()
+    if args.years < 1:
+        parser.error("--years must be at least 1.")
+    years = year_sequence(args.years)
+    run_years_daily(years, output_root=args.output_root,
+                    instr=instrument.from_args(args, f"daily_{args.years}"),
+                    keys=keyed_rng.from_args(args, years[0].seed))
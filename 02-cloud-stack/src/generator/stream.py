@@ -0,0 +1,498 @@
+"""
+stream.py
+─────────
+Streaming producer: the generator's events replayed as a continuous stream
+in simulated-time order, for testing ingestion latency and throughput
+without an external broker.
+
+The simulation is the batch one (engine.simulate_month, or the scheduler's
+event-driven engine with --engine daily), with the same lifecycle, chaos
+and seeds. Only the write step changes: each month's post-chaos batches are
+merged into one queue ordered by event time. Late-arriving events (shifted
+a month by chaos) are therefore emitted a month later, the way a consumer
+would see them. Pacing:
+
+    --speedup X    simulated seconds per wall second (86400 → a day per second)
+    --rate N       events/s ceiling, paced from the previous event's actual
+                   release (a one-token bucket), so time lost in a slow sink
+                   is not made up in a burst
+    (neither)      as fast as the sink takes them
+
+Events are sent in micro-batches of up to --batch-size, flushed early
+whenever the next event is not due yet (events due within EARLY_S go
+with the current batch). Formats:
+
+    ndjson   one JSON object per line: {"dataset": ..., <event fields>}
+    arrow    one Arrow IPC stream (schema + batch + EOS) per dataset per
+             micro-batch, since chaos changes schemas; read with repeated
+             pyarrow.ipc.open_stream on the same source
+
+Sinks (all blocking, so a slow consumer backs the producer up):
+
+    tcp://host:port      connect to a listening consumer (e.g. nc -lk 9000)
+    unix:///path.sock    Unix domain socket, likewise
+    pipe:///path.fifo    named pipe (created if missing; waits for a reader)
+    dir:///path          rotating files (--rotate-mb / --rotate-seconds)
+
+Backpressure: the simulation runs in a producer thread and hands finished
+months to the sender through a queue of --buffer-months; when the sink is
+slow, sends block, the queue fills and the simulation pauses. Reported
+every --report-every seconds and at the end (JSON in data/metrics/):
+throughput against the target, send latency past each event's due time
+(p50 / p95 / p99 / max), time blocked in the sink and in the producer,
+and time the sender waited on the simulation (the producer can't keep up).
+The users snapshot is not streamed.
+
+    python -m src.generator.stream --sink tcp://127.0.0.1:9000 --speedup 86400 --rate 5000
+    python -m src.generator.stream --sink pipe:///tmp/events.fifo --format arrow --months 3
+    python -m src.generator.stream --sink dir://data/stream --rotate-mb 64 --engine daily
+"""
+
+import argparse
+import heapq
+import io
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from . import rng as keyed_rng
+from .engine import Population, generate_users, simulate_month
+from .instrument import METRICS_DIR
+from .rng import RandomKeys
+from .scheduler import DailyScheduler
+from .years import year_sequence
+
+FORMATS = ["ndjson", "arrow"]
+ENGINES = ["monthly", "daily"]
+EARLY_S = 0.001      # events due this soon are sent now rather than after a sleep
+
+# UTC times of next month's first local hours fall before this month's end;
+# events that close to the boundary wait for the next month's merge
+HOLD_BACK_NS = pd.Timedelta(days=1).value
+
+_END          = object()   # producer → sender: no more months
+_LATENCY_BINS = np.concatenate([[0.0], np.logspace(-6, 4, 201)])   # seconds, 1 µs … ~3 h
+
+
+# ─────────────────────────────────────────────────────────
+#  SINKS
+# ─────────────────────────────────────────────────────────
+
+class SocketSink:
+    """Client connection to a listening consumer; sendall blocks while its buffers are full."""
+
+    def __init__(self, url):
+        if url.scheme == "unix":
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.connect(url.path)
+        else:
+            self.sock = socket.create_connection((url.hostname, url.port))
+        self.name = url.geturl()
+
+    def write(self, data: bytes):
+        self.sock.sendall(data)
+
+    def close(self):
+        self.sock.close()
+
+
+class PipeSink:
+    """Named pipe; opening blocks until a reader attaches, writes block while it is full."""
+
+    def __init__(self, path):
+        if not os.path.exists(path):
+            os.mkfifo(path)
+        self.name = path
+        print(f"[stream] Waiting for a reader on {path} ...")
+        self.file = open(path, "wb")
+
+    def write(self, data: bytes):
+        self.file.write(data)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class RotatingFileSink:
+    """events_<n>.<ext> files under a directory, rotated by size and/or age."""
+
+    def __init__(self, directory, extension, rotate_bytes=None, rotate_seconds=None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory      = directory
+        self.extension      = extension
+        self.rotate_bytes   = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.name           = directory
+        self.files          = 0
+        self.file           = None
+
+    def write(self, data: bytes):
+        if self.file is None or self._due_for_rotation():
+            self._open_next()
+        self.file.write(data)
+        self.file.flush()
+        self._size += len(data)
+
+    def _due_for_rotation(self):
+        return (
+            (self.rotate_bytes and self._size >= self.rotate_bytes)
+            or (self.rotate_seconds and time.monotonic() - self._opened >= self.rotate_seconds)
+        )
+
+    def _open_next(self):
+        self.close()
+        stamp        = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path         = os.path.join(self.directory, f"events_{stamp}_{self.files:05d}.{self.extension}")
+        self.file    = open(path, "wb")
+        self.files  += 1
+        self._size   = 0
+        self._opened = time.monotonic()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def open_sink(spec: str, fmt: str, rotate_bytes=None, rotate_seconds=None):
+    url = urlparse(spec)
+    if url.scheme in ("tcp", "unix"):
+        return SocketSink(url)
+    if url.scheme == "pipe":
+        return PipeSink(url.netloc + url.path)
+    if url.scheme == "dir":
+        return RotatingFileSink(url.netloc + url.path, "ndjson" if fmt == "ndjson" else "arrows",
+                                rotate_bytes, rotate_seconds)
+    raise ValueError(f"Unknown sink '{spec}': use tcp://host:port, unix:///path, pipe:///path or dir:///path")
+
+
+# ─────────────────────────────────────────────────────────
+#  ENCODING
+# ─────────────────────────────────────────────────────────
+
+def _json_default(value):
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def encode_ndjson(batch) -> bytes:
+    return "".join(
+        json.dumps({"dataset": dataset_name, **event}, default=_json_default) + "\n"
+        for _, dataset_name, event in batch
+    ).encode()
+
+
+def encode_arrow(batch) -> bytes:
+    by_dataset = {}
+    for _, dataset_name, event in batch:
+        by_dataset.setdefault(dataset_name, []).append({"dataset": dataset_name, **event})
+    out = io.BytesIO()
+    for records in by_dataset.values():
+        try:
+            table = pa.Table.from_pylist(records)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # a column with mixed types (e.g. chaos stringified amount_usd, plus late rows from the month before)
+            table = pa.Table.from_pylist([
+                {k: v if v is None or isinstance(v, pd.Timestamp) else str(v) for k, v in r.items()}
+                for r in records
+            ])
+        with pa.ipc.new_stream(out, table.schema) as writer:
+            writer.write_table(table)
+    return out.getvalue()
+
+
+ENCODERS = {"ndjson": encode_ndjson, "arrow": encode_arrow}
+
+
+# ─────────────────────────────────────────────────────────
+#  PRODUCER (simulation thread)
+# ─────────────────────────────────────────────────────────
+
+def _event_time(event, ts_field, fallback: int) -> int:
+    ts = event.get(ts_field)
+    return ts.value if isinstance(ts, pd.Timestamp) else fallback
+
+
+def produce_months(years: list, months: queue.Queue, keys: RandomKeys = None, engine: str = "monthly",
+                   max_months: int = None, stats: dict = None):
+    """
+    Simulate `years` and put, per month, the events due by its end (less
+    HOLD_BACK_NS) as a list of (event time ns, dataset, event) in time
+    order. Events chaos moved past the month end wait in the merge heap.
+    """
+    keyed_rng.seed_globals(years[0].seed)
+    users     = Population()
+    scheduler = DailyScheduler(users, keys) if engine == "daily" else None
+    pending   = []
+    seq       = 0
+    fallback  = 0
+    n_months  = 0
+
+    def collect(events, dataset_name, ts_field):
+        nonlocal seq
+        for event in events:
+            seq += 1
+            heapq.heappush(pending, (_event_time(event, ts_field, fallback), seq, dataset_name, event))
+
+    def put(item):
+        started = time.perf_counter()
+        months.put(item)
+        stats["producer_blocked_s"] += time.perf_counter() - started
+
+    for year in years:
+        if users:
+            for user in users:
+                user.enter_year(year)
+        else:
+            initial = generate_users(year, year.initial_users, year.start_month, keys=keys)
+            users.extend(initial)
+            if scheduler is not None:
+                scheduler.enroll(initial, year.start_month)
+
+        for idx, current_month in enumerate(year.month_range):
+            if max_months is not None and n_months >= max_months:
+                break
+            fallback = current_month.value
+            if scheduler is not None:
+                scheduler.simulate_month(year, idx, current_month, write=collect)
+            else:
+                simulate_month(year, users, idx, current_month, write=collect, keys=keys)
+            horizon = (current_month + pd.DateOffset(months=1)).value - HOLD_BACK_NS
+            ready   = []
+            while pending and pending[0][0] < horizon:
+                event_time, _, dataset_name, event = heapq.heappop(pending)
+                ready.append((event_time, dataset_name, event))
+            put(ready)
+            n_months += 1
+
+    # whatever chaos pushed past the last month
+    put([(t, d, e) for t, _, d, e in sorted(pending, key=lambda item: item[:2])])
+    put(_END)
+
+
+# ─────────────────────────────────────────────────────────
+#  SENDER (pacing, micro-batches, report)
+# ─────────────────────────────────────────────────────────
+
+class LatencyHistogram:
+    """Log-bucketed send latencies (bounded memory); percentiles are bucket upper edges."""
+
+    def __init__(self):
+        self.counts = np.zeros(len(_LATENCY_BINS) - 1, dtype=np.int64)
+        self.max    = 0.0
+
+    def add(self, latencies: np.ndarray):
+        latencies = np.clip(latencies, 0.0, _LATENCY_BINS[-1])
+        self.counts += np.histogram(latencies, bins=_LATENCY_BINS)[0]
+        self.max     = max(self.max, float(latencies.max()))
+
+    def percentile(self, q: float) -> float:
+        total = self.counts.sum()
+        if not total:
+            return 0.0
+        idx = int(np.searchsorted(np.cumsum(self.counts), q / 100 * total))
+        return min(float(_LATENCY_BINS[idx + 1]), self.max)
+
+
+class StreamSender:
+    """
+    Sends queued months through `sink`. Each event's due wall time comes
+    from its simulated time (speedup) and the rate ceiling; latency is the
+    time it was actually handed to the sink minus its due time.
+    """
+
+    def __init__(self, sink, fmt="ndjson", speedup=None, rate=None, batch_size=500, report_every=10.0):
+        self.sink         = sink
+        self.encode       = ENCODERS[fmt]
+        self.fmt          = fmt
+        self.speedup      = speedup
+        self.rate         = rate
+        self.batch_size   = batch_size
+        self.report_every = report_every
+        self.latency      = LatencyHistogram()
+        self.by_dataset   = {}
+        self.events       = 0
+        self.bytes        = 0
+        self.sink_s       = 0.0
+        self.wait_s       = 0.0
+        self.sim_time     = None
+
+    def run(self, months: queue.Queue, stats: dict):
+        batch, dues = [], []
+        started     = time.perf_counter()
+        next_report = started + self.report_every
+        sim0, wall0, last_release = None, None, float("-inf")
+
+        while True:
+            waiting = time.perf_counter()
+            month   = months.get()
+            self.wait_s += time.perf_counter() - waiting
+            if month is _END:
+                break
+            for item in month:
+                event_time = item[0]
+                now        = time.perf_counter()
+                if sim0 is None:
+                    sim0, wall0 = event_time, now
+                due = now if self.speedup is None else wall0 + (event_time - sim0) / 1e9 / self.speedup
+                if self.rate:
+                    due = max(due, last_release + 1 / self.rate)
+
+                if due > now + EARLY_S:
+                    self._flush(batch, dues)
+                    batch, dues = [], []
+                    time.sleep(max(0.0, due - time.perf_counter()))
+                # The later of due and now: after a stall the next event leaves
+                # one interval from now, not from a due time long past
+                last_release = max(due, time.perf_counter())
+                batch.append(item)
+                dues.append(due)
+                if len(batch) >= self.batch_size:
+                    self._flush(batch, dues)
+                    batch, dues = [], []
+                if time.perf_counter() >= next_report:
+                    self._flush(batch, dues)
+                    batch, dues = [], []
+                    print(self._progress(started, stats))
+                    next_report += self.report_every
+        self._flush(batch, dues)
+        return self.report(started, stats)
+
+    def _flush(self, batch, dues):
+        if not batch:
+            return
+        data    = self.encode(batch)
+        started = time.perf_counter()
+        self.sink.write(data)
+        sent    = time.perf_counter()
+        self.sink_s += sent - started
+        self.latency.add(sent - np.asarray(dues))
+        self.events += len(batch)
+        self.bytes  += len(data)
+        for _, dataset_name, _ in batch:
+            self.by_dataset[dataset_name] = self.by_dataset.get(dataset_name, 0) + 1
+        self.sim_time = pd.Timestamp(batch[-1][0])
+
+    def _progress(self, started, stats):
+        elapsed = time.perf_counter() - started
+        return (
+            f"[stream] {self.events:,} events ({self.events / elapsed:,.0f}/s) | "
+            f"sim time {self.sim_time} | p95 latency {self.latency.percentile(95) * 1e3:.1f} ms | "
+            f"sink blocked {self.sink_s:.1f}s | producer blocked {stats['producer_blocked_s']:.1f}s | "
+            f"waiting on simulation {self.wait_s:.1f}s"
+        )
+
+    def report(self, started, stats) -> dict:
+        elapsed = time.perf_counter() - started
+        return {
+            "type":               "stream",
+            "format":             self.fmt,
+            "sink":               self.sink.name,
+            "events":             self.events,
+            "bytes":              self.bytes,
+            "by_dataset":         self.by_dataset,
+            "elapsed_s":          round(elapsed, 3),
+            "events_per_s":       round(self.events / elapsed, 1) if elapsed else None,
+            "target_rate":        self.rate,
+            "speedup":            self.speedup,
+            "latency_ms":         {
+                **{f"p{q}": round(self.latency.percentile(q) * 1e3, 3) for q in (50, 95, 99)},
+                "max": round(self.latency.max * 1e3, 3),
+            },
+            "sink_blocked_s":     round(self.sink_s, 3),
+            "producer_blocked_s": round(stats["producer_blocked_s"], 3),
+            "simulation_wait_s":  round(self.wait_s, 3),
+            "sim_time":           str(self.sim_time),
+        }
+
+
+# ─────────────────────────────────────────────────────────
+#  RUN
+# ─────────────────────────────────────────────────────────
+
+def run_stream(years: list, sink, fmt="ndjson", speedup=None, rate=None, batch_size=500,
+               buffer_months=2, report_every=10.0, keys: RandomKeys = None, engine="monthly",
+               max_months=None) -> dict:
+    """Simulate in a producer thread and send through `sink`; returns the final report."""
+    months = queue.Queue(maxsize=buffer_months)
+    stats  = {"producer_blocked_s": 0.0}
+    errors = []
+
+    def producer():
+        try:
+            produce_months(years, months, keys, engine, max_months, stats)
+        except BaseException as e:   # surface in the main thread, and unblock the sender
+            errors.append(e)
+            months.put(_END)
+
+    thread = threading.Thread(target=producer, name="stream-producer", daemon=True)
+    thread.start()
+    sender = StreamSender(sink, fmt, speedup, rate, batch_size, report_every)
+    try:
+        report = sender.run(months, stats)
+    finally:
+        sink.close()
+    thread.join()
+    if errors:
+        raise errors[0]
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sink", required=True, help="tcp://host:port | unix:///path | pipe:///path | dir:///path")
+    parser.add_argument("--format", choices=FORMATS, default="ndjson")
+    parser.add_argument("--speedup", type=float, default=None, help="Simulated seconds per wall second.")
+    parser.add_argument("--rate", type=float, default=None, help="Target (maximum) events per second.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Events per send, at most.")
+    parser.add_argument("--buffer-months", type=int, default=2, help="Simulated months buffered ahead of the sender.")
+    parser.add_argument("--years", type=int, default=1, help="Number of consecutive years (Y1, Y2, y3, ...).")
+    parser.add_argument("--months", type=int, default=None, help="Stop after this many months.")
+    parser.add_argument("--engine", choices=ENGINES, default="monthly", help="daily: scheduler.py's event-driven engine.")
+    parser.add_argument("--rotate-mb", type=float, default=None, help="dir:// sink: rotate files at this size.")
+    parser.add_argument("--rotate-seconds", type=float, default=None, help="dir:// sink: rotate files at this age.")
+    parser.add_argument("--report-every", type=float, default=10.0, help="Progress line interval (seconds).")
+    parser.add_argument("--report", default=None, help=f"Final report path (default {METRICS_DIR}/stream_<ts>.json).")
+    keyed_rng.add_cli_args(parser)
+    args = parser.parse_args()
+    if args.years < 1:
+        parser.error("--years must be at least 1.")
+    for name in ("speedup", "rate", "batch_size", "buffer_months"):
+        value = getattr(args, name)
+        if value is not None and value <= 0:
+            parser.error(f"--{name.replace('_', '-')} must be positive.")
+
+    years = year_sequence(args.years)
+    try:
+        sink = open_sink(args.sink, args.format,
+                         args.rotate_mb and int(args.rotate_mb * 2**20), args.rotate_seconds)
+    except (ValueError, OSError) as e:
+        raise SystemExit(f"[stream] Cannot open sink: {e}")
+    try:
+        report = run_stream(
+            years, sink, args.format, args.speedup, args.rate, args.batch_size, args.buffer_months,
+            args.report_every, keys=keyed_rng.from_args(args, years[0].seed), engine=args.engine,
+            max_months=args.months,
+        )
+    except (BrokenPipeError, ConnectionError) as e:
+        raise SystemExit(f"[stream] Consumer went away: {e}")
+
+    path = args.report or os.path.join(METRICS_DIR, f"stream_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"[stream] Report written to {path}")
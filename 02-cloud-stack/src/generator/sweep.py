@@ -0,0 +1,260 @@
+"""
+sweep.py
+────────
+Monte Carlo scenario sweeps over the state-machine probabilities.
+
+Every run simulates one year through the engine (engine.simulate_month)
+with one parameter set and one replicate seed, and keeps only per-month
+KPIs: no chaos, no raw writes, and no product usage (it never feeds back
+into the state machine). Runs go through a process pool, and the result is
+one table with, per scenario, month and KPI, the mean across replicates, a
+95% confidence interval of that mean and the p05–p95 band.
+
+Usage
+-----
+Grid (every combination) × 20 replicates:
+    python -m src.generator.sweep --grid churn_prob=0.03,0.05,0.07 \\
+        --grid trial_convert_prob=0.3,0.4 --replicates 20
+
+100 parameter sets sampled uniformly from ranges, on 8 workers:
+    python -m src.generator.sweep --year y2 --uniform churn_prob=0.03:0.08 \\
+        --uniform payment_fail_prob=0.02:0.10 --sets 100 --replicates 5 --workers 8
+
+Parameters are YearConfig probabilities; config.py names work too
+(CHURN_PROB=0.07). Replicate r uses seed year.seed + r in keyed mode
+(rng.RandomKeys) for every scenario, so scenarios are compared on common
+random numbers rather than on independent noise.
+
+Output (data/sweeps/<year>_<timestamp>/)
+──────
+    scenarios.csv    scenario id → parameter values
+    runs.parquet     one row per (scenario, replicate, month)
+    bands.csv        per (scenario, month, kpi): n, mean, std, ci_low, ci_high, p05, p50, p95
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from . import rng as keyed_rng
+from .engine import Population, generate_users, simulate_month
+from .rng import RandomKeys
+from .years import BASE_YEARS, no_chaos
+
+SWEEP_PARAMS = [
+    "trial_convert_prob", "churn_prob", "upgrade_prob",
+    "downgrade_prob", "payment_fail_prob", "reactivation_prob",
+]
+KPIS = ["users", "new_users", "active", "paying", "mrr", "cancels", "churn_rate", "revenue"]
+
+SWEEP_OUTPUT_DIR = "data/sweeps"
+
+
+# ─────────────────────────────────────────────────────────
+#  SCENARIOS
+# ─────────────────────────────────────────────────────────
+
+def _param_name(name: str) -> str:
+    param = name.strip().lower()
+    if param not in SWEEP_PARAMS:
+        raise ValueError(f"Unknown sweep parameter '{name}'; choose from {', '.join(SWEEP_PARAMS)}")
+    return param
+
+
+def grid_scenarios(grid: dict) -> list:
+    """Every combination of {param: [values]}."""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def uniform_scenarios(ranges: dict, n_sets: int, seed: int) -> list:
+    """`n_sets` parameter sets drawn uniformly from {param: (lo, hi)}."""
+    draw = np.random.RandomState(seed)
+    return [
+        {name: round(float(draw.uniform(lo, hi)), 6) for name, (lo, hi) in ranges.items()}
+        for _ in range(n_sets)
+    ]
+
+
+def scenario_year(base, params: dict, n_months: int = None):
+    """`base` with the given probabilities, no chaos and no product usage."""
+    year = copy.copy(base)
+    for name, value in params.items():
+        setattr(year, name, value)
+    year.chaos        = no_chaos
+    year.event_limits = {}   # limit 0 → no usage events
+    if n_months:
+        year.n_months = n_months
+    return year
+
+
+# ─────────────────────────────────────────────────────────
+#  ONE RUN
+# ─────────────────────────────────────────────────────────
+
+def run_scenario(task) -> list:
+    """
+    One (scenario, replicate) run → per-month KPI rows. Runs in a pool worker,
+    so everything it needs is in `task` and it seeds its own RNGs.
+    """
+    scenario_id, base_name, params, replicate, n_months = task
+    year = scenario_year(BASE_YEARS[base_name], params, n_months)
+    seed = year.seed + replicate
+    keys = RandomKeys(seed)
+    keyed_rng.seed_globals(seed)
+
+    counts = {}
+
+    def tally(events, dataset_name, ts_field):
+        if dataset_name == "subscription_events":
+            counts["cancels"] = sum(e["event_type"] == "cancel" for e in events)
+        elif dataset_name == "payments":
+            counts["revenue"] = sum(p["amount_usd"] for p in events if p["status"] == "success")
+
+    rows = []
+    with contextlib.redirect_stdout(io.StringIO()):   # simulate_month's per-month log
+        users = Population(generate_users(year, year.initial_users, year.start_month, keys=keys))
+        for idx, current_month in enumerate(year.month_range):
+            n_before, active_before = len(users), users.active
+            simulate_month(year, users, idx, current_month, write=tally, keys=keys)
+            paying = [u.current_plan for u in users.live if u.status == "Active"
+                      and year.plan_prices.get(u.current_plan, 0) > 0]
+            rows.append({
+                "scenario":   scenario_id,
+                "replicate":  replicate,
+                "month":      current_month.strftime("%Y-%m"),
+                "users":      len(users),
+                "new_users":  len(users) - n_before,
+                "active":     users.active,
+                "paying":     len(paying),
+                "mrr":        float(sum(year.plan_prices[plan] for plan in paying)),
+                "cancels":    counts["cancels"],
+                "churn_rate": counts["cancels"] / active_before if active_before else 0.0,
+                "revenue":    float(counts["revenue"]),
+            })
+    return rows
+
+
+# ─────────────────────────────────────────────────────────
+#  SWEEP
+# ─────────────────────────────────────────────────────────
+
+def confidence_bands(runs: pd.DataFrame) -> pd.DataFrame:
+    """Per (scenario, month, kpi): mean ± 1.96·SE of the mean, and p05 / p50 / p95 across replicates."""
+    long  = runs.melt(id_vars=["scenario", "replicate", "month"], value_vars=KPIS, var_name="kpi")
+    group = long.groupby(["scenario", "month", "kpi"], sort=True)["value"]
+    bands = group.agg(n="count", mean="mean", std="std").reset_index()
+    bands["std"]     = bands["std"].fillna(0.0)
+    half             = 1.96 * bands["std"] / np.sqrt(bands["n"])
+    bands["ci_low"]  = bands["mean"] - half
+    bands["ci_high"] = bands["mean"] + half
+    quantiles = group.quantile([0.05, 0.5, 0.95]).unstack()
+    quantiles.columns = ["p05", "p50", "p95"]
+    return bands.merge(quantiles.reset_index(), on=["scenario", "month", "kpi"])
+
+
+def run_sweep(scenarios: list, base_name: str = "y1", replicates: int = 10,
+              n_months: int = None, workers: int = None):
+    """
+    Run every scenario `replicates` times in a process pool.
+    Returns (scenarios table, per-run KPI rows, confidence bands).
+    """
+    tasks = [
+        (scenario_id, base_name, params, replicate, n_months)
+        for scenario_id, params in enumerate(scenarios)
+        for replicate in range(replicates)
+    ]
+    print(f"[sweep] {len(scenarios)} scenarios × {replicates} replicates = {len(tasks)} runs "
+          f"({base_name}, {workers or os.cpu_count()} workers)")
+    started = time.perf_counter()
+    rows    = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for i, run_rows in enumerate(pool.map(run_scenario, tasks), 1):
+            rows.extend(run_rows)
+            if i % max(1, len(tasks) // 10) == 0 or i == len(tasks):
+                print(f"[sweep] {i}/{len(tasks)} runs done ({time.perf_counter() - started:.1f}s)")
+
+    scenario_table = pd.DataFrame(scenarios).rename_axis("scenario").reset_index()
+    runs           = pd.DataFrame(rows)
+    return scenario_table, runs, confidence_bands(runs)
+
+
+def save_sweep(output_dir: str, scenario_table, runs, bands):
+    os.makedirs(output_dir, exist_ok=True)
+    scenario_table.to_csv(os.path.join(output_dir, "scenarios.csv"), index=False)
+    runs.to_parquet(os.path.join(output_dir, "runs.parquet"), index=False, engine="pyarrow")
+    bands.to_csv(os.path.join(output_dir, "bands.csv"), index=False)
+    print(f"[sweep] Results → {output_dir}")
+
+
+# ─────────────────────────────────────────────────────────
+#  CLI
+# ─────────────────────────────────────────────────────────
+
+def _parse_assignments(values, parse):
+    parsed = {}
+    for item in values or []:
+        name, sep, spec = item.partition("=")
+        if not sep:
+            raise SystemExit(f"Expected name=value, got '{item}'")
+        try:
+            parsed[_param_name(name)] = parse(spec)
+        except ValueError as e:
+            raise SystemExit(f"Bad sweep parameter '{item}': {e}")
+    return parsed
+
+
+def _parse_range(spec: str):
+    lo, hi = (float(v) for v in spec.split(":"))
+    if not 0 <= lo <= hi <= 1:
+        raise ValueError("range must be lo:hi within [0, 1]")
+    return lo, hi
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--year", choices=sorted(BASE_YEARS), default="y1", help="Year config to vary.")
+    parser.add_argument(
+        "--grid",
+        action="append",
+        help="param=v1,v2,... — sweep every combination of the listed values (repeatable).",
+    )
+    parser.add_argument(
+        "--uniform",
+        action="append",
+        help="param=lo:hi — sample the parameter uniformly (repeatable; see --sets).",
+    )
+    parser.add_argument("--sets", type=int, default=20, help="Parameter sets to sample with --uniform.")
+    parser.add_argument("--replicates", type=int, default=10, help="Seeds per parameter set.")
+    parser.add_argument("--months", type=int, default=None, help="Simulate only the first N months.")
+    parser.add_argument("--workers", type=int, default=None, help="Pool size (default: CPU count).")
+    parser.add_argument("--output", default=None, help=f"Output directory (default {SWEEP_OUTPUT_DIR}/<year>_<ts>).")
+    args = parser.parse_args()
+
+    grid   = _parse_assignments(args.grid, lambda spec: [float(v) for v in spec.split(",")])
+    ranges = _parse_assignments(args.uniform, _parse_range)
+    if grid and ranges:
+        parser.error("Use either --grid or --uniform, not both.")
+    if args.replicates < 1:
+        parser.error("--replicates must be at least 1.")
+    base = BASE_YEARS[args.year]
+    if ranges:
+        scenarios = uniform_scenarios(ranges, args.sets, seed=base.seed)
+    elif grid:
+        scenarios = grid_scenarios(grid)
+    else:
+        scenarios = [{}]   # the config as-is: replicate spread only
+
+    results = run_sweep(scenarios, args.year, replicates=args.replicates,
+                        n_months=args.months, workers=args.workers)
+    stamp   = datetime.now().strftime("%Y%m%d_%H%M%S")
+    save_sweep(args.output or os.path.join(SWEEP_OUTPUT_DIR, f"{args.year}_{stamp}"), *results)
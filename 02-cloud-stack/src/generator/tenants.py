@@ -0,0 +1,362 @@
+"""
+tenants.py
+──────────
+Multi-tenant generation: many independent SaaS companies, one YearConfig
+each, generated in parallel for loading a multi-tenant warehouse.
+
+Tenants are described in a JSON spec file. Each tenant starts from a base
+year (y1 / y2) and overrides what differs: size, plan catalog, chaos
+schedule, probabilities, seed. A "generate" block adds N synthetic tenants
+with log-uniform sizes and varied catalogs / schedules:
+
+    {
+      "tenants": [
+        {"tenant_id": "acme", "base": "y1", "scale": 5,
+         "plans": {"Free": 0, "Pro": 49, "Business": 199}},
+        {"tenant_id": "globex", "base": "y2", "initial_users": 300, "new_users": [20, 40],
+         "chaos": {"4": "plan_migration", "9": "viral_spike"}, "churn_prob": 0.08}
+      ],
+      "generate": {"count": 300, "seed": 7, "scale": [0.05, 5]}
+    }
+
+Tenant fields
+─────────────
+    tenant_id       required, unique; [A-Za-z0-9_.-], not ".", ".." or "tenants"
+    base            y1 | y2 (default y2) — rules not overridden below
+    seed            default: a hash of tenant_id (independent of spec order)
+    scale           multiplies initial users and monthly intake (default 1)
+    initial_users   / new_users [lo, hi] — explicit sizes (new_users replaces
+                    the base's per-month growth schedule)
+    months, start_month
+    plans           {name: monthly price}, lowest tier first (free tier, then
+                    the tier trials convert to)
+    event_limits    {plan: usage events per month}; default: the base's limit
+                    for the same tier rank, plus its Trial limit
+    chaos           {month: chaos name} from the base's schedule vocabulary,
+                    {} for always-on chaos only, or false for no chaos at all
+    trial_convert_prob, churn_prob, upgrade_prob, downgrade_prob,
+    payment_fail_prob, reactivation_prob
+
+Output (data/tenants/)
+──────
+    <tenant_id>/<dataset>/event_date=YYYY-MM-DD/*.parquet   every row has tenant_id
+    tenants/tenants.parquet                                tenant dimension
+
+Tenants run in a process pool, largest expected volume first (forecast.py's
+Markov forecast), so the pool stays busy and the run takes about
+total volume / cores — unless one tenant alone is bigger than that share.
+
+    python -m src.generator.tenants --spec tenants.json --workers 16
+    python -m src.generator.tenants --spec tenants.json --dry-run
+"""
+
+import argparse
+import contextlib
+import copy
+import functools
+import hashlib
+import io
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from . import rng as keyed_rng
+from .chaos import apply_chaos
+from .chaos_y2 import apply_chaos_y2
+from .config import CHAOS_EVENTS
+from .config_y2 import CHAOS_EVENTS_Y2
+from .engine import DATASETS, Population, generate_users, generate_users_snapshot, simulate_month
+from .forecast import forecast_year
+from .rng import RandomKeys
+from .writer import verify_manifest, write_parquet
+from .years import BASE_YEARS, YearConfig, no_chaos
+
+# Chaos orchestrator and schedule vocabulary of each base year
+CHAOS_FAMILIES = {
+    "y1": (apply_chaos,    CHAOS_EVENTS),
+    "y2": (apply_chaos_y2, CHAOS_EVENTS_Y2),
+}
+
+PROBABILITIES = [
+    "trial_convert_prob", "churn_prob", "upgrade_prob",
+    "downgrade_prob", "payment_fail_prob", "reactivation_prob",
+]
+TENANT_FIELDS = {
+    "tenant_id", "base", "seed", "scale", "initial_users", "new_users", "months",
+    "start_month", "plans", "event_limits", "chaos", *PROBABILITIES,
+}
+
+TENANT_ID_PATTERN  = re.compile(r"[A-Za-z0-9_.-]+")
+TENANTS_OUTPUT_DIR = "data/tenants"
+DIMENSION_DIR      = "tenants"   # <output root>/tenants/tenants.parquet
+RESERVED_IDS       = {".", "..", DIMENSION_DIR}
+
+
+# ─────────────────────────────────────────────────────────
+#  SPEC
+# ─────────────────────────────────────────────────────────
+
+def tenant_seed(tenant_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(tenant_id.encode(), digest_size=4).digest(), "little")
+
+
+def synthetic_tenants(count: int, seed: int = 0, scale=(0.05, 5.0), prefix: str = "t") -> list:
+    """`count` tenant specs: log-uniform scale, y1/y2 base, repriced / trimmed catalogs, shuffled chaos."""
+    draw  = np.random.RandomState(seed)
+    specs = []
+    for i in range(count):
+        base_name = str(draw.choice(sorted(BASE_YEARS)))
+        base      = BASE_YEARS[base_name]
+        plans     = base.plans[:len(base.plans) - int(len(base.plans) > 2 and draw.rand() < 0.3)]
+        markup    = draw.choice([0.5, 0.8, 1.0, 1.5, 2.0, 3.0])
+        _, vocab  = CHAOS_FAMILIES[base_name]
+        months    = draw.choice(np.arange(1, base.n_months + 1), size=len(vocab), replace=False)
+        specs.append({
+            "tenant_id":  f"{prefix}{i:04d}",
+            "base":       base_name,
+            "scale":      round(float(np.exp(draw.uniform(*np.log(scale)))), 3),
+            "plans":      {plan: round(base.plan_prices[plan] * markup) for plan in plans},
+            "chaos":      {int(m): name for m, name in zip(months, vocab.values()) if draw.rand() < 0.7},
+            "churn_prob": round(float(base.churn_prob * draw.uniform(0.5, 2.0)), 4),
+        })
+    return specs
+
+
+def validate_spec(spec: dict) -> dict:
+    unknown = set(spec) - TENANT_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown tenant field(s) {sorted(unknown)} in {spec.get('tenant_id', spec)}")
+    tenant_id = str(spec.get("tenant_id", ""))
+    if not TENANT_ID_PATTERN.fullmatch(tenant_id):
+        raise ValueError(f"Bad tenant_id {tenant_id!r}: use letters, digits, '_', '-' or '.'")
+    if tenant_id in RESERVED_IDS:
+        raise ValueError(f"Bad tenant_id {tenant_id!r}: reserved ({', '.join(sorted(RESERVED_IDS))})")
+    base = spec.get("base", "y2")
+    if base not in BASE_YEARS:
+        raise ValueError(f"{tenant_id}: base must be one of {sorted(BASE_YEARS)}, got {base!r}")
+    plans = spec.get("plans")
+    if plans is not None and len(plans) < 2:
+        raise ValueError(f"{tenant_id}: plans needs a free tier and a tier trials convert to")
+    chaos = spec.get("chaos")
+    if chaos:
+        vocab = set(CHAOS_FAMILIES[base][1].values())
+        bad   = {name for name in chaos.values() if name not in vocab}
+        if bad:
+            raise ValueError(f"{tenant_id}: unknown {base} chaos {sorted(bad)}; choose from {sorted(vocab)}")
+    for name in PROBABILITIES:
+        if name in spec and not 0 <= spec[name] <= 1:
+            raise ValueError(f"{tenant_id}: {name} must be within [0, 1]")
+    return {**spec, "tenant_id": tenant_id, "base": base}
+
+
+def load_spec(path: str) -> list:
+    """Tenant specs from a spec file (explicit tenants, then generated ones), validated."""
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    tenants = list(spec.get("tenants", []))
+    if "generate" in spec:
+        generate = spec["generate"]
+        tenants += synthetic_tenants(
+            generate["count"], generate.get("seed", 0), tuple(generate.get("scale", (0.05, 5.0))),
+            generate.get("prefix", "t"),
+        )
+    tenants = [validate_spec(tenant) for tenant in tenants]
+    seen    = set()
+    for tenant in tenants:
+        if tenant["tenant_id"] in seen:
+            raise ValueError(f"Duplicate tenant_id {tenant['tenant_id']!r}")
+        seen.add(tenant["tenant_id"])
+    if not tenants:
+        raise ValueError(f"No tenants in {path}")
+    return tenants
+
+
+def tenant_year(spec: dict, output_root: str = TENANTS_OUTPUT_DIR) -> YearConfig:
+    """The YearConfig of one (validated) tenant spec."""
+    base_name = spec["base"]
+    base      = BASE_YEARS[base_name]
+    year      = copy.copy(base)
+    scale     = spec.get("scale", 1.0)
+
+    year.name        = spec["tenant_id"]
+    year.output_path = os.path.join(output_root, spec["tenant_id"])
+    year.seed        = spec.get("seed", tenant_seed(spec["tenant_id"]))
+    if "months" in spec:
+        year.n_months = spec["months"]
+    if "start_month" in spec:
+        year.start_month = pd.Timestamp(spec["start_month"])
+
+    year.initial_users = spec.get("initial_users", max(1, round(base.initial_users * scale)))
+    if "new_users" in spec:
+        year.new_users_by_month = {}
+        year.default_new_users  = tuple(spec["new_users"])
+    else:
+        def scaled(lo_hi):
+            return round(lo_hi[0] * scale), round(lo_hi[1] * scale)
+        year.new_users_by_month = {month: scaled(r) for month, r in base.new_users_by_month.items()}
+        year.default_new_users  = scaled(base.default_new_users)
+
+    if "plans" in spec:
+        year.plans       = list(spec["plans"])
+        year.plan_prices = dict(spec["plans"])
+        by_rank          = [base.event_limits.get(plan, 0) for plan in base.plans]
+        year.event_limits = {"Trial": base.event_limits.get("Trial", 0)}
+        for rank, plan in enumerate(year.plans):
+            year.event_limits[plan] = by_rank[min(rank, len(by_rank) - 1)]
+        year.plan_carry_map = {}
+    if "event_limits" in spec:
+        year.event_limits = {**year.event_limits, **spec["event_limits"]}
+
+    chaos = spec.get("chaos")
+    if chaos is False:
+        year.chaos = no_chaos
+    elif chaos is not None:
+        orchestrator, _ = CHAOS_FAMILIES[base_name]
+        year.chaos = functools.partial(orchestrator, schedule={int(m): name for m, name in chaos.items()})
+
+    for name in PROBABILITIES:
+        if name in spec:
+            setattr(year, name, spec[name])
+    return year
+
+
+def expected_volume(year: YearConfig) -> float:
+    """Forecast rows (events + users snapshot) — the pool's load-balancing weight."""
+    forecast = forecast_year(year)
+    return float(forecast["events"].sum() + forecast["users"].iloc[-1])
+
+
+# ─────────────────────────────────────────────────────────
+#  ONE TENANT
+# ─────────────────────────────────────────────────────────
+
+def run_tenant(task) -> dict:
+    """
+    Generate one tenant end to end. Runs in a pool worker: builds its
+    YearConfig from the spec, seeds its own RNGs and keeps its log quiet.
+    """
+    spec, output_root, keyed, sample = task
+    year    = tenant_year(spec, output_root)
+    keys    = RandomKeys(year.seed, sample=sample) if keyed else None
+    keyed_rng.seed_globals(year.seed)
+    started = time.process_time()
+    manifest = {}
+
+    def write(events, dataset_name, ts_field):
+        write_parquet([{"tenant_id": year.name, **event} for event in events], dataset_name,
+                      ts_field=ts_field, base_path=year.output_path, manifest=manifest)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        users = Population(generate_users(year, year.initial_users, year.start_month, keys=keys))
+        for idx, current_month in enumerate(year.month_range):
+            simulate_month(year, users, idx, current_month, write=write, keys=keys)
+        write(generate_users_snapshot(users, keys), "users", ts_field="created_at_utc")
+
+    # rows counted from the files on disk (raises if any lost rows), not as generated
+    on_disk = verify_manifest(year.output_path, manifest)
+    rows    = {name: on_disk.get(name, 0) for name in [name for name, _ in DATASETS] + ["users"]}
+    return {
+        "tenant_id":   year.name,
+        "active":      users.active,
+        **rows,
+        "cpu_seconds": round(time.process_time() - started, 2),
+        "worker":      os.getpid(),
+    }
+
+
+# ─────────────────────────────────────────────────────────
+#  ALL TENANTS
+# ─────────────────────────────────────────────────────────
+
+def plan_tenants(specs: list, output_root: str = TENANTS_OUTPUT_DIR) -> pd.DataFrame:
+    """Tenant dimension rows plus expected volume, largest first (the submission order)."""
+    rows = []
+    for spec in specs:
+        year = tenant_year(spec, output_root)
+        rows.append({
+            "tenant_id":       year.name,
+            "base":            spec["base"],
+            "seed":            year.seed,
+            "start_month":     year.start_month,
+            "months":          year.n_months,
+            "initial_users":   year.initial_users,
+            "plans":           json.dumps(year.plan_prices),
+            "chaos":           json.dumps(spec.get("chaos")),
+            **{name: getattr(year, name) for name in PROBABILITIES},
+            "expected_volume": round(expected_volume(year)),
+        })
+    return pd.DataFrame(rows).sort_values("expected_volume", ascending=False, kind="stable")
+
+
+def run_tenants(specs: list, output_root: str = TENANTS_OUTPUT_DIR, workers: int = None,
+                keyed: bool = False, sample: float = 1.0) -> pd.DataFrame:
+    """
+    Generate every tenant in a process pool, largest expected volume first
+    (longest-processing-time first keeps workers evenly loaded), and write
+    the tenant dimension. Returns it with per-tenant row counts (read back
+    from the files on disk) and timings.
+    """
+    workers = workers or os.cpu_count()
+    plan    = plan_tenants(specs, output_root)
+    total   = plan["expected_volume"].sum()
+    print(f"[tenants] {len(plan)} tenants, ~{total:,.0f} expected rows on {workers} workers "
+          f"(largest tenant {plan['expected_volume'].iloc[0] / total:.1%} of the total)")
+
+    by_id   = {spec["tenant_id"]: spec for spec in specs}
+    tasks   = [(by_id[tenant_id], output_root, keyed, sample) for tenant_id in plan["tenant_id"]]
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for i, result in enumerate(pool.map(run_tenant, tasks), 1):
+            results.append(result)
+            if i % max(1, len(tasks) // 10) == 0 or i == len(tasks):
+                print(f"[tenants] {i}/{len(tasks)} tenants done ({time.perf_counter() - started:.1f}s)")
+
+    dimension = plan.merge(pd.DataFrame(results), on="tenant_id")
+    elapsed   = time.perf_counter() - started
+    busy      = dimension["cpu_seconds"].sum()
+    print(f"[tenants] Done in {elapsed:.1f}s — {busy:.1f} CPU-s of tenant work, "
+          f"{busy / elapsed:.1f}x parallel on {workers} workers")
+    save_dimension(output_root, dimension)
+    return dimension
+
+
+def save_dimension(output_root: str, dimension: pd.DataFrame):
+    path = os.path.join(output_root, DIMENSION_DIR, "tenants.parquet")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    dimension.to_parquet(path, index=False, engine="pyarrow")
+    print(f"[tenants] Tenant dimension → {path}")
+
+
+# ─────────────────────────────────────────────────────────
+#  CLI
+# ─────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spec", required=True, help="Tenant spec file (JSON; see module docstring).")
+    parser.add_argument("--output-root", default=TENANTS_OUTPUT_DIR, help="Root of the per-tenant output.")
+    parser.add_argument("--workers", type=int, default=None, help="Pool size (default: CPU count).")
+    parser.add_argument("--dry-run", action="store_true", help="Print the tenant plan and expected volumes only.")
+    keyed_rng.add_cli_args(parser)
+    args = parser.parse_args()
+
+    try:
+        specs = load_spec(args.spec)
+    except (OSError, ValueError, KeyError) as e:
+        raise SystemExit(f"[tenants] Bad spec {args.spec}: {e}")
+    if args.dry_run:
+        plan = plan_tenants(specs, args.output_root)
+        with pd.option_context("display.width", 200, "display.max_rows", 50):
+            print(plan[["tenant_id", "base", "months", "initial_users", "plans", "expected_volume"]]
+                  .to_string(index=False))
+        print(f"[tenants] {len(plan)} tenants, ~{plan['expected_volume'].sum():,.0f} expected rows")
+    else:
+        keys = keyed_rng.from_args(args, 0)
+        run_tenants(specs, args.output_root, workers=args.workers,
+                    keyed=keys is not None, sample=args.sample)
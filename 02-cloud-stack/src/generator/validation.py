@@ -0,0 +1,679 @@
+"""
+validation.py
+─────────────
+Validation checks for generator output, run as projected, aggregated
+scans over the Parquet partition tree with pyarrow.dataset.
+
+Nothing is pd.concat-ed: each check names the columns it needs, and each
+dataset is read in one streaming pass projected to the union of those
+columns. Every batch is handed to every check of the dataset, which folds it
+into grouped Arrow counts, so memory is bounded by the size of the
+aggregates, not the raw data.
+
+Checks are registered with @check(name, dataset, columns). run_validation()
+scans the datasets in parallel and reports each check's wall time next to
+the rows its dataset pass read.
+
+Usage
+-----
+    from src.generator.validation import run_validation
+    summary = run_validation("y1")        # or "y2"
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .config import CHAOS_EVENTS, EVENT_LIMITS, START_MONTH, BASE_OUTPUT_PATH
+from .config_y2 import (
+    BASE_OUTPUT_PATH_Y2,
+    CHAOS_EVENTS_Y2,
+    EVENT_LIMITS_Y2,
+    PLANS_Y2,
+    START_MONTH_Y2,
+)
+
+DATASETS = ["subscription_events", "payments", "product_events", "users"]
+
+YEARS = {
+    "y1": {
+        "root":        BASE_OUTPUT_PATH,
+        "start_month": START_MONTH,
+        "limits":      EVENT_LIMITS,
+        "chaos":       CHAOS_EVENTS,
+        "duplicate_month": 10,
+        "report":      "data/reports/full_validation.csv",
+    },
+    "y2": {
+        "root":        BASE_OUTPUT_PATH_Y2,
+        "start_month": START_MONTH_Y2,
+        "limits":      EVENT_LIMITS_Y2,
+        "chaos":       CHAOS_EVENTS_Y2,
+        "duplicate_month": 12,
+        "report":      "data/reports/full_validation_y2.csv",
+    },
+}
+
+_PARTITIONING = ds.partitioning(pa.schema([("event_date", pa.string())]), flavor="hive")
+
+
+# ─────────────────────────────────────────────────────────
+#  DATASET ACCESS
+# ─────────────────────────────────────────────────────────
+
+def _merge_type(current: pa.DataType, new: pa.DataType) -> pa.DataType:
+    """Resolve schema drift between files; irreconcilable types fall back to string."""
+    if current == new:
+        return current
+    try:
+        merged = pa.unify_schemas(
+            [pa.schema([("f", current)]), pa.schema([("f", new)])],
+            promote_options="permissive",
+        )
+        return merged.field("f").type
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.large_string()
+
+
+def list_files(root: str, dataset_name: str) -> list:
+    base = os.path.join(root, dataset_name)
+    files = []
+    for dirpath, _, names in os.walk(base):
+        files.extend(os.path.join(dirpath, n) for n in names if n.endswith(".parquet"))
+    return sorted(files)
+
+
+def unified_schema(files: list) -> pa.Schema:
+    """
+    Union of all file schemas (footer reads only).
+    Chaos adds columns mid-year and turns amount_usd into a string, so the
+    first file's schema is not representative.
+    """
+    types, order = {}, []
+    for f in files:
+        for field in pq.read_schema(f):
+            if field.name not in types:
+                types[field.name] = field.type
+                order.append(field.name)
+            else:
+                types[field.name] = _merge_type(types[field.name], field.type)
+    return pa.schema([(name, types[name]) for name in order] + [("event_date", pa.string())])
+
+
+def open_dataset(root: str, dataset_name: str, files: list = None, schema: pa.Schema = None):
+    """Lazy dataset over one generator output folder; None if nothing was written."""
+    files = list_files(root, dataset_name) if files is None else files
+    if not files:
+        return None
+    return ds.dataset(
+        files,
+        schema=schema or unified_schema(files),
+        format="parquet",
+        partitioning=_PARTITIONING,
+        partition_base_dir=os.path.join(root, dataset_name),
+    )
+
+
+def has_column(table, name: str) -> bool:
+    return table is not None and name in table.schema.names
+
+
+# ─────────────────────────────────────────────────────────
+#  BATCH PRIMITIVES
+#
+#  Checks see one batch at a time (a pa.Table holding the dataset's
+#  projected columns, coalesced to about BATCH_ROWS rows) and return its
+#  share of the result: an int, a grouped count table (keys + "n"), or a
+#  dict of those.
+# ─────────────────────────────────────────────────────────
+
+BATCH_ROWS = 1 << 18
+
+def count_rows(table, filter=None) -> int:
+    return (table if filter is None else table.filter(filter)).num_rows
+
+
+def group_count(table, keys: list, filter=None) -> pa.Table:
+    """`SELECT keys, count(*) AS n ... WHERE filter GROUP BY keys` over one batch."""
+    if filter is not None:
+        table = table.filter(filter)
+    grouped = table.group_by(keys).aggregate([([], "count_all")])
+    return grouped.select(keys + ["count_all"]).rename_columns(keys + ["n"])
+
+
+def merge_counts(tables: list) -> pa.Table:
+    """Re-aggregate grouped count tables that share their keys into one."""
+    if len(tables) == 1:
+        return tables[0]
+    keys   = [c for c in tables[0].column_names if c != "n"]
+    merged = pa.concat_tables(tables).group_by(keys).aggregate([("n", "sum")])
+    return merged.select(keys + ["n_sum"]).rename_columns(keys + ["n"])
+
+
+NULL_KEY = "__null__"   # JSON-safe stand-in for a null group key
+
+
+def _key(value) -> str:
+    return NULL_KEY if value is None else str(value)
+
+
+def _nest(table: pa.Table, keys: list, value: str = "n") -> dict:
+    """Grouped table → nested {k1: {k2: ... n}} with string keys."""
+    out = {}
+    for row in table.to_pylist():
+        node = out
+        for k in keys[:-1]:
+            node = node.setdefault(_key(row[k]), {})
+        leaf = _key(row[keys[-1]])
+        node[leaf] = node.get(leaf, 0) + row[value]
+    return out
+
+
+def _unnest(nested: dict, keys: list) -> pa.Table:
+    """Nested {k1: {k2: ... n}} → grouped table (keys + n); the inverse of _nest."""
+    columns, counts = [[] for _ in keys], []
+
+    def walk(node, path):
+        for k, v in node.items():
+            if isinstance(v, dict):
+                walk(v, path + [k])
+                continue
+            for column, value in zip(columns, path + [k]):
+                column.append(None if value == NULL_KEY else value)
+            counts.append(v)
+
+    walk(nested, [])
+    return pa.table({
+        **{k: pa.array(column, pa.string()) for k, column in zip(keys, columns)},
+        "n": pa.array(counts, pa.int64()),
+    })
+
+
+def batch_month(start_month: pd.Timestamp, month_idx: int) -> str:
+    """1-based simulation month → batch_month string, e.g. (2024-01, 10) → '2024-10'."""
+    return (start_month + pd.DateOffset(months=month_idx - 1)).strftime("%Y-%m")
+
+
+def month_filter(month: str):
+    """
+    batch_month == month, plus a partition guard on event_date so only the
+    folders that can hold that batch are opened: one day early (UTC shift of
+    eastern timezones) up to one month late (late-arriving chaos), plus the
+    1st of the month after next for late rows that also shift a day into UTC.
+    """
+    start = pd.Timestamp(f"{month}-01")
+    lo = (start - pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    hi = (start + pd.DateOffset(months=2) + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    return (
+        (pc.field("event_date") >= lo)
+        & (pc.field("event_date") < hi)
+        & (pc.field("batch_month") == month)
+    )
+
+
+# ─────────────────────────────────────────────────────────
+#  PARTIAL AGGREGATES
+#
+#  Each dataset is reduced to a nested dict of additive counts (int leaves).
+#  Partials over disjoint file sets combine by summing, so a full run is one
+#  partial over every file and an incremental run (validation_cache.py) is a
+#  merge of cached per-file partials — both feed the same summarize().
+#
+#  Within a scan, per-batch results are summed the same way, but grouped
+#  tables stay in Arrow until the pass ends (re-aggregated every
+#  COMPACT_EVERY batches) and are nested into dicts once.
+#
+#  Per-user slots (a check with `reduce`) are only kept as dicts on the
+#  cached per-file path. A full run reduces them to counts in Arrow inside
+#  the worker; reduce_state() does the same to merged cached partials, so
+#  summarize() only ever sees the reduced form.
+# ─────────────────────────────────────────────────────────
+
+COMPACT_EVERY = 32   # grouped batch tables held per check before re-aggregating
+
+def combine(into: dict, other: dict, sign: int = 1) -> dict:
+    """In-place into += sign * other; zeroed leaves and empty branches are dropped."""
+    for k, v in other.items():
+        if isinstance(v, dict):
+            branch = combine(into.get(k, {}), v, sign)
+            if branch:
+                into[k] = branch
+            else:
+                into.pop(k, None)
+        else:
+            total = into.get(k, 0) + sign * v
+            if total:
+                into[k] = total
+            else:
+                into.pop(k, None)
+    return into
+
+
+def _add(total, part):
+    """Fold one batch's result into a check's running total."""
+    if isinstance(part, dict):
+        total = total if total is not None else {}
+        for k, v in part.items():
+            total[k] = _add(total.get(k), v)
+        return total
+    if isinstance(part, pa.Table):
+        tables = (total or []) + [part]
+        return [merge_counts(tables)] if len(tables) >= COMPACT_EVERY else tables
+    return (total or 0) + part
+
+
+def _finish(total):
+    """Running total → partial: grouped tables become nested dicts."""
+    if isinstance(total, dict):
+        return {k: _finish(v) for k, v in total.items()}
+    if isinstance(total, list):
+        table = merge_counts(total)
+        return _nest(table, [c for c in table.column_names if c != "n"])
+    return total
+
+
+# ─────────────────────────────────────────────────────────
+#  CHECK REGISTRY
+#
+#  A check declares the dataset and columns it reads and produces one slot
+#  of the dataset's partial: state[dataset][check name]. Its function is
+#  called as fn(batch, file_types, cfg) for every batch of the dataset pass;
+#  file_types maps its `file_fields` to their physical type in the batch's
+#  files (a batch never mixes files that disagree on them).
+#  `reduce(table, cfg)` turns a per-user grouped table (columns `keys` + n)
+#  into the compact slot summarize() reads. summarize() turns the slots into
+#  metrics; `metrics` lists which summary keys a check feeds.
+# ─────────────────────────────────────────────────────────
+
+class Check:
+    def __init__(self, name, dataset, columns, scan, metrics=(), file_fields=(), keys=None, reduce=None):
+        self.name        = name
+        self.dataset     = dataset
+        self.columns     = columns
+        self.scan        = scan
+        self.metrics     = metrics
+        self.file_fields = file_fields
+        self.keys        = keys      # group keys of the scan's table, to rebuild it from a cached dict
+        self.reduce      = reduce
+
+
+CHECKS = {}
+
+
+def check(name, dataset, columns, metrics=(), file_fields=(), keys=None, reduce=None):
+    def register(fn):
+        CHECKS[name] = Check(name, dataset, columns, fn, metrics, file_fields, keys, reduce)
+        return fn
+    return register
+
+
+def user_ids(table: pa.Table, cfg) -> pa.Array:
+    return table["user_id"].combine_chunks().cast(pa.string())
+
+
+def users_failed_3x(table: pa.Table, cfg) -> pa.Array:
+    return user_ids(table.filter(pc.field("n") >= 3), cfg)
+
+
+def distinct_count(table: pa.Table, cfg) -> int:
+    return table.num_rows
+
+
+def duplicate_count(table: pa.Table, cfg) -> int:
+    return (pc.sum(table["n"]).as_py() or 0) - table.num_rows
+
+
+def usage_by_plan(usage: pa.Table, cfg) -> dict:
+    """Per user/plan/month usage → {month: {plan: {rows, over_limit users}}}."""
+    limits = cfg["limits"]
+    plan   = usage["plan"].cast(pa.string())
+    limit  = pc.take(pa.array(list(limits.values()), pa.int64()),
+                     pc.index_in(plan, value_set=pa.array(list(limits), pa.string())))
+    # Chaos-dirtied / null plan strings have no known limit and are not counted
+    over   = pc.fill_null(pc.greater(usage["n"], limit), False).cast(pa.int64())
+    cells  = (
+        pa.table({"batch_month": usage["batch_month"], "plan": plan, "n": usage["n"], "over_limit": over})
+        .group_by(["batch_month", "plan"])
+        .aggregate([("n", "sum"), ("over_limit", "sum")])
+    )
+    out = {}
+    for row in cells.to_pylist():
+        out.setdefault(_key(row["batch_month"]), {})[_key(row["plan"])] = {
+            "rows": row["n_sum"], "over_limit": row["over_limit_sum"],
+        }
+    return out
+
+
+def _dup_month_filter(cfg):
+    return month_filter(batch_month(cfg["start_month"], cfg["duplicate_month"]))
+
+
+@check("event_type", "subscription_events", ["event_type"],
+       metrics=("total_subs_events", "trial_start", "trial_convert", "trial_expire",
+                "canceled", "upgrade_events", "downgrade_events", "reactivation_events"))
+def scan_event_types(subs, file_types, cfg):
+    return group_count(subs, ["event_type"])
+
+
+@check("late", "subscription_events", ["batch_month", "event_timestamp_utc"],
+       metrics=("late_arrivals",))
+def scan_late_arrivals(subs, file_types, cfg):
+    late = pc.field("batch_month") != pc.strftime(pc.field("event_timestamp_utc"), format="%Y-%m")
+    return count_rows(subs, filter=late)
+
+
+@check("cancel_users", "subscription_events", ["user_id", "event_type"],
+       metrics=("anomaly_failed_3x",), keys=["user_id"], reduce=user_ids)
+def scan_cancel_users(subs, file_types, cfg):
+    return group_count(subs, ["user_id"], filter=pc.field("event_type") == "cancel")
+
+
+@check("by_month", "subscription_events",
+       ["batch_month", "plan", "ingestion_source", "promo_code", "referral_code"],
+       metrics=("chaos_month6_pro_plus", "chaos_month8_columns_ok", "chaos_month3_dirty_plans",
+                "chaos_month8_referral_codes", "chaos_month10_null_plans"))
+def scan_subs_by_month(subs, file_types, cfg):
+    by_month = {"plan": group_count(subs, ["batch_month", "plan"])}
+    # Columns introduced by chaos only exist in some files
+    for column in ("ingestion_source", "promo_code", "referral_code"):
+        if has_column(subs, column):
+            by_month[column] = group_count(subs, ["batch_month", column], filter=pc.field(column).is_valid())
+    return by_month
+
+
+@check("status", "payments", ["status"], metrics=("success_payments", "failed_payments"))
+def scan_payment_status(pays, file_types, cfg):
+    return group_count(pays, ["status"])
+
+
+@check("failed_users", "payments", ["user_id", "status"], metrics=("anomaly_failed_3x",),
+       keys=["user_id"], reduce=users_failed_3x)
+def scan_failed_users(pays, file_types, cfg):
+    return group_count(pays, ["user_id"], filter=pc.field("status") == "failed")
+
+
+@check("dup_month_ids", "payments", ["payment_id", "batch_month", "event_date"],
+       metrics=("chaos_month*_duplicates",))
+def scan_duplicate_month(pays, file_types, cfg):
+    return group_count(pays, ["payment_id"], filter=_dup_month_filter(cfg))
+
+
+@check("amount_types", "payments", ["batch_month"], metrics=("chaos_month12_is_string",),
+       file_fields=("amount_usd",))
+def scan_amount_types(pays, file_types, cfg):
+    # Type drift is a per-file property, read from the files' physical schema
+    amount_type = file_types["amount_usd"]
+    months = group_count(pays, ["batch_month"])
+    return months.add_column(1, "amount_type", pa.array([amount_type] * months.num_rows, pa.string()))
+
+
+@check("usage", "product_events", ["batch_month", "user_id", "plan"],
+       metrics=("exceed_limit_count", "chaos_month10_null_plans"),
+       keys=["batch_month", "user_id", "plan"], reduce=usage_by_plan)
+def scan_usage(prods, file_types, cfg):
+    """Per user/plan/month usage — reads only user_id, plan, batch_month."""
+    return group_count(prods, ["batch_month", "user_id", "plan"])
+
+
+@check("user_id", "users", ["user_id"], metrics=("unique_users",),
+       keys=["user_id"], reduce=distinct_count)
+def scan_user_ids(users, file_types, cfg):
+    return group_count(users, ["user_id"])
+
+
+@check("email", "users", ["email"], metrics=("duplicate_emails",),
+       keys=["email"], reduce=duplicate_count)
+def scan_emails(users, file_types, cfg):
+    return group_count(users, ["email"])
+
+
+@check("channel", "users", ["acquisition_channel"], metrics=("_channel_dist",))
+def scan_channels(users, file_types, cfg):
+    return group_count(users, ["acquisition_channel"])
+
+
+def scan_dataset(dataset_name: str, dset, cfg, reduce: bool = False) -> tuple:
+    """
+    One projected pass over a dataset feeding every check registered on it.
+    Returns ({check name: partial}, {check name: wall seconds}, rows read);
+    with reduce, per-user slots come back already reduced.
+    """
+    checks  = [c for c in CHECKS.values() if c.dataset == dataset_name]
+    columns = sorted({col for c in checks for col in c.columns if col in dset.schema.names})
+    totals  = {c.name: None for c in checks}
+    wall    = {c.name: 0.0 for c in checks}
+    fields  = sorted({f for c in checks for f in c.file_fields})
+    rows    = 0
+
+    def feed(pending, file_types):
+        batch = pa.Table.from_batches(pending)
+        for c in checks:
+            started = time.perf_counter()
+            totals[c.name] = _add(totals[c.name], c.scan(batch, file_types, cfg))
+            wall[c.name] += time.perf_counter() - started
+
+    pending, pending_rows, pending_types = [], 0, None
+    for tagged in dset.scanner(columns=columns).scan_batches():
+        file_types = {}
+        if fields:
+            physical   = tagged.fragment.physical_schema
+            file_types = {f: str(physical.field(f).type) if f in physical.names else None for f in fields}
+        if pending and (pending_rows >= BATCH_ROWS or file_types != pending_types):
+            feed(pending, pending_types)
+            pending, pending_rows = [], 0
+        pending.append(tagged.record_batch)
+        pending_rows  += tagged.record_batch.num_rows
+        pending_types  = file_types
+        rows          += tagged.record_batch.num_rows
+    if pending:
+        feed(pending, pending_types)
+
+    results = {}
+    for c in checks:
+        started = time.perf_counter()
+        if reduce and c.reduce is not None and totals[c.name] is not None:
+            result = c.reduce(merge_counts(totals[c.name]), cfg)
+        else:
+            result = _finish(totals[c.name])
+        wall[c.name] += time.perf_counter() - started
+        if result is not None:   # no batches: the check has nothing to report
+            results[c.name] = result
+    return results, wall, rows
+
+
+def build_partial(dataset_name: str, dset, cfg) -> dict:
+    """Partial aggregate of one dataset (any subset of its files), all checks inline."""
+    if dset is None:
+        return {}
+    return {dataset_name: scan_dataset(dataset_name, dset, cfg)[0]}
+
+
+def reduce_state(state: dict, year: str) -> dict:
+    """Merged additive partials → the reduced slots a full run produces (new dict)."""
+    cfg     = YEARS[year]
+    reduced = {name: dict(slots) for name, slots in state.items()}
+    for c in CHECKS.values():
+        slots = reduced.get(c.dataset, {})
+        if c.reduce is not None and c.name in slots:
+            slots[c.name] = c.reduce(_unnest(slots[c.name], c.keys), cfg)
+    return reduced
+
+
+# ─────────────────────────────────────────────────────────
+#  SUMMARY
+# ─────────────────────────────────────────────────────────
+
+def _month(node: dict, month: str) -> dict:
+    return node.get(month, {})
+
+
+def summarize(state: dict, year: str) -> dict:
+    """
+    Turn reduced partials into the validation summary. Keys starting with "_"
+    are report-only detail and are not exported to the summary CSV.
+    """
+    cfg   = YEARS[year]
+    subs  = state.get("subscription_events", {})
+    pays  = state.get("payments", {})
+    prods = state.get("product_events", {})
+    users = state.get("users", {})
+
+    event_types = subs.get("event_type", {})
+    status      = pays.get("status", {})
+
+    no_users  = pa.array([], pa.string())
+    failed_3x = pays.get("failed_users", no_users)
+    canceled  = subs.get("cancel_users", no_users)
+    failed_not_canceled = len(failed_3x) - pc.sum(pc.is_in(failed_3x, value_set=canceled)).as_py()
+
+    usage  = prods.get("usage", {})
+    exceed = sum(cell["over_limit"] for per_plan in usage.values() for cell in per_plan.values())
+
+    channels = users.get("channel", {})
+    n_users  = sum(channels.values()) or 1
+    channel_dist = {k: round(v / n_users, 2) for k, v in channels.items()}
+
+    summary = {
+        "unique_users":        users.get("user_id", 0),
+        "duplicate_emails":    users.get("email", 0),
+        "total_subs_events":   sum(event_types.values()),
+        "trial_start":         event_types.get("trial_start", 0),
+        "trial_convert":       event_types.get("trial_convert", 0),
+        "trial_expire":        event_types.get("trial_expire", 0),
+        "canceled":            event_types.get("cancel", 0),
+        "upgrade_events":      event_types.get("upgrade", 0),
+        "downgrade_events":    event_types.get("downgrade", 0),
+        "reactivation_events": event_types.get("reactivate", 0),
+        "late_arrivals":       subs.get("late", 0),
+        "success_payments":    status.get("success", 0),
+        "failed_payments":     status.get("failed", 0),
+        "anomaly_failed_3x":   failed_not_canceled,
+        "exceed_limit_count":  exceed,
+    }
+
+    by_month   = subs.get("by_month", {})
+    dup_ids    = pays.get("dup_month_ids", {})
+    duplicates = sum(dup_ids.values()) - len(dup_ids)
+    month      = lambda i: batch_month(cfg["start_month"], i)
+
+    if year == "y1":
+        ingestion = _month(by_month.get("ingestion_source", {}), month(8))
+        promo     = _month(by_month.get("promo_code", {}), month(8))
+        m12_types = set(_month(pays.get("amount_types", {}), month(12)))
+        summary.update({
+            "chaos_month6_pro_plus":    _month(by_month.get("plan", {}), month(6)).get("Pro Plus", 0),
+            "chaos_month8_columns_ok":  bool(ingestion) and bool(promo),
+            "chaos_month10_duplicates": duplicates,
+            "chaos_month12_is_string":  any("string" in t for t in m12_types),
+            "_month8_has_ingestion_source": bool(ingestion),
+            "_month8_has_promo_code":       bool(promo),
+            "_month8_ingestion_values":     sorted(ingestion),
+            "_month8_promo_values":         sorted(promo),
+            "_month10_total":               sum(dup_ids.values()),
+            "_month12_dtype":               "|".join(sorted(m12_types)) or "N/A",
+        })
+    else:
+        clean_plans = set(PLANS_Y2) | {"Trial", "Expired", "Canceled"}
+        m3_plans    = _month(by_month.get("plan", {}), month(3))
+        null_m10    = (
+            _month(by_month.get("plan", {}), month(10)).get(NULL_KEY, 0)
+            + _month(usage, month(10)).get(NULL_KEY, {}).get("rows", 0)
+        )
+        summary.update({
+            "chaos_month3_dirty_plans":    sum(n for p, n in m3_plans.items()
+                                               if p not in clean_plans and p != NULL_KEY),
+            "chaos_month8_referral_codes": sum(_month(by_month.get("referral_code", {}), month(8)).values()),
+            "chaos_month10_null_plans":    null_m10,
+            "chaos_month12_duplicates":    duplicates,
+        })
+
+    summary["_channel_dist"] = dict(sorted(channel_dist.items(), key=lambda kv: -kv[1]))
+    return summary
+
+
+# ─────────────────────────────────────────────────────────
+#  SUITE
+# ─────────────────────────────────────────────────────────
+
+def open_year(year: str = "y1", root: str = None) -> dict:
+    root = root or YEARS[year]["root"]
+    return {name: open_dataset(root, name) for name in DATASETS}
+
+
+def check_required(data: dict):
+    missing = [k for k, d in data.items() if not d]
+    if missing:
+        raise ValueError(f"Missing required raw datasets {missing}. Run the generator first.")
+
+
+def run_dataset(dataset_name: str, year: str, root: str, files: list, schema: pa.Schema) -> dict:
+    """Scan one dataset for all its checks; picklable entry point for the process pool."""
+    dset    = open_dataset(root, dataset_name, files=files, schema=schema)
+    started = time.perf_counter()
+    results, wall, rows = scan_dataset(dataset_name, dset, YEARS[year], reduce=True)
+    return {
+        "dataset": dataset_name,
+        "results": results,
+        "wall_s":  time.perf_counter() - started,
+        "rows":    rows,
+        "checks":  wall,
+    }
+
+
+def run_validation(year: str = "y1", root: str = None, workers: int = None) -> dict:
+    """
+    Full recompute. Each dataset is one task on a process pool (workers=1
+    runs inline) that reads its files once for all of its checks. File
+    footers are read once here and the unified schema is shipped with the
+    task. Per-check timings land in "_timings", per-dataset passes in "_scans".
+    """
+    root  = root or YEARS[year]["root"]
+    files = {name: list_files(root, name) for name in DATASETS}
+    check_required(files)
+
+    # Heaviest datasets first so the long scans start immediately
+    order   = sorted(DATASETS, key=DATASETS_BY_COST.index)
+    schemas = [unified_schema(files[name]) for name in order]
+    args    = (order, [year] * len(order), [root] * len(order), [files[n] for n in order], schemas)
+    workers = workers or min(len(order), os.cpu_count() or 1)
+    if workers == 1:
+        runs = list(map(run_dataset, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            runs = list(pool.map(run_dataset, *args))
+
+    state   = {run["dataset"]: run["results"] for run in runs}
+    summary = summarize(state, year)
+    summary["_timings"] = [
+        {"check": name, "dataset": run["dataset"], "wall_s": wall_s, "rows_scanned": run["rows"]}
+        for run in runs for name, wall_s in run["checks"].items()
+    ]
+    summary["_scans"] = [
+        {"dataset": run["dataset"], "rows_scanned": run["rows"], "wall_s": run["wall_s"]} for run in runs
+    ]
+    return summary
+
+
+DATASETS_BY_COST = ["product_events", "subscription_events", "payments", "users"]
+
+
+SUMMARY_COLUMNS = [
+    "unique_users", "duplicate_emails", "total_subs_events", "trial_start",
+    "trial_convert", "trial_expire", "canceled", "upgrade_events",
+    "downgrade_events", "reactivation_events", "late_arrivals",
+    "success_payments", "failed_payments", "anomaly_failed_3x",
+    "exceed_limit_count",
+]
+
+
+def export_summary(summary: dict, path: str):
+    """One-row CSV: core metrics first, then the year's chaos columns."""
+    chaos = [k for k in summary if k.startswith("chaos_")]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pd.DataFrame({k: [summary[k]] for k in SUMMARY_COLUMNS + chaos}).to_csv(path, index=False)
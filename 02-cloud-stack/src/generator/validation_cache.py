@@ -0,0 +1,158 @@
+"""
+validation_cache.py
+───────────────────
+Incremental validation: per-file partial aggregates cached by checksum.
+
+    data/reports/.validation_cache/<year>/
+        index.json          relpath → {size, mtime_ns, checksum}  (skip re-hashing)
+        state.json          merged partials + the relpath → checksum set they cover
+        parts/<sum>.json    partial aggregate of one Parquet file
+
+Partials are additive (see validation.combine), so when a month lands only
+its new files are scanned and added to the merged state; changed or deleted
+files are subtracted using their cached partial. The summary is produced by
+the same validation.summarize() as a full recompute, after reduce_state()
+folds the per-user slots to counts as a full run's workers do.
+"""
+
+import hashlib
+import json
+import os
+
+from .validation import (
+    DATASETS,
+    YEARS,
+    build_partial,
+    check_required,
+    combine,
+    list_files,
+    open_dataset,
+    reduce_state,
+    summarize,
+)
+
+CACHE_ROOT    = "data/reports/.validation_cache"
+CACHE_VERSION = 1   # bump when a partial_* function changes shape
+
+
+def file_checksum(path: str) -> str:
+    h = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _load_json(path: str, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_json(obj, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, separators=(",", ":"))
+    os.replace(tmp, path)   # never leave a half-written state behind
+
+
+class ValidationCache:
+    """Checksum-keyed partials plus the merged state for one year's output."""
+
+    def __init__(self, year: str, root: str = None, cache_root: str = CACHE_ROOT):
+        self.year   = year
+        self.cfg    = YEARS[year]
+        self.root   = root or self.cfg["root"]
+        self.dir    = os.path.join(cache_root, year)
+        self.index  = _load_json(os.path.join(self.dir, "index.json"), {})
+        state       = _load_json(os.path.join(self.dir, "state.json"), {})
+        if state.get("version") != CACHE_VERSION:
+            state = {}
+        self.files  = state.get("files", {})    # relpath → checksum merged into `merged`
+        self.merged = state.get("merged", {})
+
+    # ─────────────────────────────────────────────────────
+    #  PER-FILE PARTIALS
+    # ─────────────────────────────────────────────────────
+
+    def _part_path(self, checksum: str) -> str:
+        return os.path.join(self.dir, "parts", f"v{CACHE_VERSION}_{checksum}.json")
+
+    def checksum(self, relpath: str) -> str:
+        """Checksum from the index when size + mtime are unchanged, else re-hash."""
+        full   = os.path.join(self.root, relpath)
+        stat   = os.stat(full)
+        cached = self.index.get(relpath)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["checksum"]
+        checksum = file_checksum(full)
+        self.index[relpath] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "checksum": checksum}
+        return checksum
+
+    def partial(self, dataset_name: str, relpath: str, checksum: str) -> dict:
+        """Cached partial for one file, scanning it only on a cache miss."""
+        path = self._part_path(checksum)
+        part = _load_json(path, None)
+        if part is None:
+            dset = open_dataset(self.root, dataset_name, files=[os.path.join(self.root, relpath)])
+            part = build_partial(dataset_name, dset, self.cfg)
+            _save_json(part, path)
+        return part
+
+    # ─────────────────────────────────────────────────────
+    #  UPDATE
+    # ─────────────────────────────────────────────────────
+
+    def refresh(self) -> dict:
+        """Bring the merged state in line with the files on disk."""
+        current = {}
+        for name in DATASETS:
+            for full in list_files(self.root, name):
+                relpath = os.path.relpath(full, self.root)
+                current[relpath] = (name, self.checksum(relpath))
+
+        stats = {"scanned": 0, "reused": 0, "removed": 0}
+        for relpath, checksum in list(self.files.items()):
+            if current.get(relpath, (None, None))[1] != checksum:
+                if not os.path.exists(self._part_path(checksum)):
+                    # Cannot subtract a partial we no longer have — rebuild from scratch
+                    self.files, self.merged = {}, {}
+                    break
+                name = relpath.split(os.sep)[0]
+                combine(self.merged, self.partial(name, relpath, checksum), sign=-1)
+                del self.files[relpath]
+                stats["removed"] += 1
+
+        for relpath, (name, checksum) in sorted(current.items()):
+            if relpath in self.files:
+                stats["reused"] += 1
+                continue
+            is_new = not os.path.exists(self._part_path(checksum))
+            combine(self.merged, self.partial(name, relpath, checksum))
+            self.files[relpath] = checksum
+            stats["scanned" if is_new else "reused"] += 1
+
+        self.index = {k: v for k, v in self.index.items() if k in current}
+        self.save()
+        return stats
+
+    def save(self):
+        _save_json(self.index, os.path.join(self.dir, "index.json"))
+        _save_json(
+            {"version": CACHE_VERSION, "files": self.files, "merged": self.merged},
+            os.path.join(self.dir, "state.json"),
+        )
+
+
+def run_incremental_validation(year: str = "y1", root: str = None) -> dict:
+    """Same summary as validation.run_validation, scanning only new/changed files."""
+    cache = ValidationCache(year, root)
+    stats = cache.refresh()
+    check_required({name: cache.merged.get(name) for name in DATASETS})
+    print(
+        f"[validation_cache] files scanned: {stats['scanned']} | "
+        f"reused: {stats['reused']} | removed: {stats['removed']}"
+    )
+    return summarize(reduce_state(cache.merged, year), year)
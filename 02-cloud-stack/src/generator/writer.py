@@ -1,25 +1,39 @@
 import os
-from datetime import datetime
+import time
+import uuid
 import pandas as pd
+import pyarrow.parquet as pq
 from .config import BASE_OUTPUT_PATH
 
 def ensure_directory(path: str):
     os.makedirs(path, exist_ok=True)
 
-def write_parquet(events: list, dataset_name: str, ts_field="event_timestamp_local"):
+def write_parquet(events: list, dataset_name: str, ts_field="event_timestamp_local",
+                  base_path: str = None, sink=None, journal=None, manifest=None):
     """
     Write events into partitioned parquet by ts_field.
     Handles mixed datatypes for chaos scenarios.
+
+    base_path defaults to BASE_OUTPUT_PATH (Y1). With an object-store sink,
+    partitions are streamed to it instead of disk. `journal(key)` is called
+    before each partition is written (checkpointing). `manifest` ({key: rows})
+    records every file written, for verify_manifest.
+
+    File names carry a nanosecond timestamp plus a random suffix, so repeated
+    writes to one partition (late events landing in a later month's batch,
+    or sub-second sampled months) never replace each other.
     """
     if not events:
         print(f"[{dataset_name}] No data to write.")
         return
 
+    base_path = base_path or BASE_OUTPUT_PATH
     df = pd.DataFrame(events)
 
     if ts_field not in df.columns:
-        if "event_timestamp_utc" in df.columns:
-            ts_field = "event_timestamp_utc"
+        alt = "event_timestamp_utc" if ts_field != "event_timestamp_utc" else "payment_timestamp_utc"
+        if alt in df.columns:
+            ts_field = alt
         else:
             raise ValueError(f"{ts_field} column is required in the events")
 
@@ -27,14 +41,19 @@ def write_parquet(events: list, dataset_name: str, ts_field="event_timestamp_loc
     df["event_date"] = df[ts_field].dt.date
 
     for event_date, group in df.groupby("event_date"):
-        partition_path = os.path.join(
-            BASE_OUTPUT_PATH,
-            dataset_name,
-            f"event_date={event_date}"
-        )
+        file_name = f"{dataset_name}_{time.time_ns()}_{uuid.uuid4().hex[:8]}_{event_date}.parquet"
+        key = f"{dataset_name}/event_date={event_date}/{file_name}"
+        if journal is not None:
+            journal(key)
+        if manifest is not None:
+            manifest[key] = manifest.get(key, 0) + len(group)
+        if sink is not None:
+            sink.put(key, group.drop(columns=["event_date"]))
+            continue
+
+        partition_path = os.path.join(base_path, dataset_name, f"event_date={event_date}")
         ensure_directory(partition_path)
 
-        file_name = f"{dataset_name}_{int(datetime.now().timestamp())}_{event_date}.parquet"
         full_path = os.path.join(partition_path, file_name)
 
         group.drop(columns=["event_date"]).to_parquet(
@@ -43,4 +62,21 @@ def write_parquet(events: list, dataset_name: str, ts_field="event_timestamp_loc
             engine="pyarrow"
         )
 
-    print(f"[{dataset_name}] Written {len(df)} records.")
\ No newline at end of file
+    print(f"[{dataset_name}] Written {len(df)} records.")
+
+
+def verify_manifest(base_path: str, manifest: dict) -> dict:
+    """
+    Compare the rows write_parquet logged for each file with the rows in it
+    on disk; raises if any file lost rows. Returns on-disk rows per dataset.
+    """
+    on_disk, short = {}, []
+    for key, logged in manifest.items():
+        rows = pq.read_metadata(os.path.join(base_path, key)).num_rows
+        dataset_name = key.split("/", 1)[0]
+        on_disk[dataset_name] = on_disk.get(dataset_name, 0) + rows
+        if rows != logged:
+            short.append(f"{key}: {rows} on disk, {logged} written")
+    if short:
+        raise RuntimeError(f"{len(short)} file(s) under {base_path} lost rows: " + "; ".join(short[:5]))
+    return on_disk
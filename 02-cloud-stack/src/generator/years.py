@@ -0,0 +1,152 @@
+"""
+years.py
+────────
+Year configurations for the simulation engine (engine.py).
+
+A YearConfig bundles everything that differs between simulated years:
+plan ladder, prices, event limits, growth schedule, chaos schedule and how
+plans carry over from the previous year. Y1 and Y2 are built from
+config.py / config_y2.py; later years (for 5–10 year scale histories) are
+derived from Y2 with year_sequence().
+"""
+
+import copy
+
+import pandas as pd
+
+from . import config as c1
+from . import config_y2 as c2
+from .chaos import apply_chaos
+from .chaos_y2 import apply_chaos_y2
+
+
+class YearConfig:
+    """
+    One simulated year. `plans` is the paid-tier ladder from lowest to highest:
+    plans[0] is the free tier (no payments, reactivation target) and plans[1]
+    is where converted trials land.
+    """
+
+    def __init__(self, name, start_month, plans, plan_prices, event_limits,
+                 initial_users, new_users_by_month, default_new_users,
+                 acquisition_channels, acquisition_channel_weights,
+                 chaos, plan_carry_map, output_path, seed,
+                 trial_convert_prob, churn_prob, upgrade_prob, downgrade_prob,
+                 payment_fail_prob, reactivation_prob, n_months=12):
+        self.name                        = name
+        self.start_month                 = pd.Timestamp(start_month)
+        self.n_months                    = n_months
+        self.plans                       = list(plans)
+        self.plan_prices                 = plan_prices
+        self.event_limits                = event_limits
+        self.initial_users               = initial_users
+        self.new_users_by_month          = new_users_by_month
+        self.default_new_users           = default_new_users
+        self.acquisition_channels        = acquisition_channels
+        self.acquisition_channel_weights = acquisition_channel_weights
+        self.chaos                       = chaos
+        self.plan_carry_map              = plan_carry_map
+        self.output_path                 = output_path
+        self.seed                        = seed
+        self.trial_convert_prob          = trial_convert_prob
+        self.churn_prob                  = churn_prob
+        self.upgrade_prob                = upgrade_prob
+        self.downgrade_prob              = downgrade_prob
+        self.payment_fail_prob           = payment_fail_prob
+        self.reactivation_prob           = reactivation_prob
+
+    @property
+    def free_plan(self):
+        return self.plans[0]
+
+    @property
+    def convert_plan(self):
+        return self.plans[1]
+
+    @property
+    def month_range(self):
+        return pd.date_range(start=self.start_month, periods=self.n_months, freq="MS")
+
+    def new_users_range(self, month_num):
+        """(lo, hi) new-user intake for a 1-based month of this year."""
+        return self.new_users_by_month.get(month_num, self.default_new_users)
+
+    def carry_plan(self, plan):
+        """Map a plan from the previous year; unknown plans land on the free tier."""
+        return self.plan_carry_map.get(plan, self.free_plan)
+
+    def next_year(self, name, output_path=None):
+        """Same rules one calendar year later, carrying plans over unchanged."""
+        nxt = copy.copy(self)
+        nxt.name           = name
+        nxt.start_month    = self.start_month + pd.DateOffset(years=1)
+        nxt.output_path    = output_path or f"data/raw_{name}"
+        statuses           = ["Trial", "Expired", "Canceled"]
+        nxt.plan_carry_map = {p: p for p in self.plans + statuses}
+        return nxt
+
+    def __repr__(self):
+        return f"YearConfig({self.name}, {self.start_month:%Y-%m}, plans={self.plans})"
+
+
+def no_chaos(events, **_):
+    """A `chaos` that leaves every batch clean."""
+    return events
+
+
+Y1 = YearConfig(
+    name                        = "y1",
+    start_month                 = c1.START_MONTH,
+    plans                       = c1.PLANS,
+    plan_prices                 = c1.PLAN_PRICES,
+    event_limits                = c1.EVENT_LIMITS,
+    initial_users               = c1.INITIAL_USERS,
+    new_users_by_month          = {},
+    default_new_users           = (c1.MIN_NEW_USERS, c1.MAX_NEW_USERS),
+    acquisition_channels        = c1.ACQUISITION_CHANNELS,
+    acquisition_channel_weights = c1.ACQUISITION_CHANNEL_WEIGHTS,
+    chaos                       = apply_chaos,
+    plan_carry_map              = {},
+    output_path                 = c1.BASE_OUTPUT_PATH,
+    seed                        = c1.RANDOM_SEED,
+    trial_convert_prob          = c1.TRIAL_CONVERT_PROB,
+    churn_prob                  = c1.CHURN_PROB,
+    upgrade_prob                = c1.UPGRADE_PROB,
+    downgrade_prob              = c1.DOWNGRADE_PROB,
+    payment_fail_prob           = c1.PAYMENT_FAIL_PROB,
+    reactivation_prob           = c1.REACTIVATION_PROB,
+)
+
+Y2 = YearConfig(
+    name                        = "y2",
+    start_month                 = c2.START_MONTH_Y2,
+    plans                       = c2.PLANS_Y2,
+    plan_prices                 = c2.PLAN_PRICES_Y2,
+    event_limits                = c2.EVENT_LIMITS_Y2,
+    initial_users               = c2.INITIAL_USERS_Y2,
+    new_users_by_month          = c2.NEW_USERS_BY_MONTH,
+    default_new_users           = (50, 100),
+    acquisition_channels        = c2.ACQUISITION_CHANNELS,
+    acquisition_channel_weights = c2.ACQUISITION_CHANNEL_WEIGHTS,
+    chaos                       = apply_chaos_y2,
+    plan_carry_map              = c2.CARRY_PLAN_MAP_Y2,
+    output_path                 = c2.BASE_OUTPUT_PATH_Y2,
+    seed                        = c2.RANDOM_SEED,
+    trial_convert_prob          = c2.TRIAL_CONVERT_PROB,
+    churn_prob                  = c2.CHURN_PROB,
+    upgrade_prob                = c2.UPGRADE_PROB,
+    downgrade_prob              = c2.DOWNGRADE_PROB,
+    payment_fail_prob           = c2.PAYMENT_FAIL_PROB,
+    reactivation_prob           = c2.REACTIVATION_PROB,
+)
+
+# Base configs by name, for the CLIs and specs that take a year
+BASE_YEARS = {"y1": Y1, "y2": Y2}
+
+
+def year_sequence(n_years: int) -> list:
+    """Y1, Y2, then Y2's rules repeated for each further year (y3, y4, ...)."""
+    years = [Y1, Y2][:n_years]
+    while len(years) < n_years:
+        years.append(years[-1].next_year(f"y{len(years) + 1}"))
+    return years
@@ -1,5 +1,11 @@
 import os
+import json
+import time
+import uuid
 import logging
+from datetime import datetime, timezone
+from pathlib import Path
+
 from dotenv import load_dotenv
 from snowflake.connector import connect
 
@@ -12,6 +18,9 @@ load_dotenv()
 SNOWFLAKE_DB     = "DATA_PLATFORM"
 SNOWFLAKE_SCHEMA = "RAW"
 STAGE_NAME       = "stg_r2_y2"
+AUDIT_TABLE      = "INGEST_AUDIT"
+AUDIT_LOCAL_PATH = Path("data/audit/ingest_audit.jsonl")
+NO_FILES_STATUS  = "NO_NEW_FILES"   # COPY INTO found nothing new to load
 
 DATASETS = [
     "subscription_events",
@@ -33,11 +42,136 @@ def get_snowflake_conn():
     )
 
 
+def get_run_id():
+    """Airflow exports the dag run id to BashOperator tasks; fall back to a fresh id."""
+    return os.environ.get("AIRFLOW_CTX_DAG_RUN_ID") or f"manual__{uuid.uuid4().hex[:12]}"
+
+
+def _stage_path(url):
+    """Stage URL without its scheme: COPY INTO and LIST may disagree on it (s3:// vs s3compat://)."""
+    return url.split("://", 1)[-1]
+
+
+def list_stage_sizes(cursor, dataset):
+    """Map staged file path (scheme stripped) → size in bytes for one dataset prefix."""
+    cursor.execute(f"LIST @{STAGE_NAME}/{dataset}/")
+    cols = [c[0].lower() for c in cursor.description]
+    return {_stage_path(row[cols.index("name")]): row[cols.index("size")] for row in cursor.fetchall()}
+
+
+def _stage_size(sizes, file_name):
+    # Full path only: a suffix match could pick a same-named file in another partition
+    return sizes.get(_stage_path(file_name)) if file_name else None
+
+
+def build_audit_records(run_id, dataset, results, description, sizes, duration_s, loaded_at):
+    """
+    Turn COPY INTO result rows into one audit record per file.
+    Columns are looked up by name so the record survives result-set reordering.
+    duration_s covers the whole dataset load, hence `dataset_duration_s`.
+    When nothing new was staged COPY INTO returns a single status row with
+    no `file` column; that becomes one NO_NEW_FILES record for the dataset.
+    """
+    cols = [c[0].lower() for c in description]
+    if "file" not in cols:
+        return [{
+            "run_id":             run_id,
+            "dataset":            dataset,
+            "file_name":          None,
+            "status":             NO_FILES_STATUS,
+            "rows_parsed":        0,
+            "rows_loaded":        0,
+            "errors_seen":        0,
+            "first_error":        None,
+            "file_bytes":         None,
+            "dataset_duration_s": round(duration_s, 3),
+            "loaded_at":          loaded_at,
+        }]
+
+    records = []
+    for row in results:
+        r = dict(zip(cols, row))
+        records.append({
+            "run_id":             run_id,
+            "dataset":            dataset,
+            "file_name":          r.get("file"),
+            "status":             r.get("status"),
+            "rows_parsed":        r.get("rows_parsed"),
+            "rows_loaded":        r.get("rows_loaded"),
+            "errors_seen":        r.get("errors_seen"),
+            "first_error":        r.get("first_error"),
+            "file_bytes":         _stage_size(sizes, r.get("file")),
+            "dataset_duration_s": round(duration_s, 3),
+            "loaded_at":          loaded_at,
+        })
+    return records
+
+
+def build_error_record(run_id, dataset, error, duration_s, loaded_at):
+    """Dataset-level record for a load that failed before COPY INTO returned."""
+    return {
+        "run_id":             run_id,
+        "dataset":            dataset,
+        "file_name":          None,
+        "status":             "ERROR",
+        "rows_parsed":        None,
+        "rows_loaded":        None,
+        "errors_seen":        None,
+        "first_error":        str(error)[:4000],
+        "file_bytes":         None,
+        "dataset_duration_s": round(duration_s, 3),
+        "loaded_at":          loaded_at,
+    }
+
+
+def write_audit_local(records, path: Path = AUDIT_LOCAL_PATH):
+    """Append audit records as JSON lines."""
+    if not records:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for rec in records:
+            f.write(json.dumps(rec, default=str) + "\n")
+
+
+def write_audit_table(cursor, records):
+    """Insert audit records into RAW.INGEST_AUDIT (created on first use)."""
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {SNOWFLAKE_DB}.{SNOWFLAKE_SCHEMA}.{AUDIT_TABLE} (
+            run_id             VARCHAR,
+            dataset            VARCHAR,
+            file_name          VARCHAR,
+            status             VARCHAR,
+            rows_parsed        NUMBER,
+            rows_loaded        NUMBER,
+            errors_seen        NUMBER,
+            first_error        VARCHAR,
+            file_bytes         NUMBER,
+            dataset_duration_s FLOAT,
+            loaded_at          TIMESTAMP_NTZ
+        )
+    """)
+    if not records:
+        return
+    columns = list(records[0].keys())
+    cursor.executemany(
+        f"INSERT INTO {SNOWFLAKE_DB}.{SNOWFLAKE_SCHEMA}.{AUDIT_TABLE} "
+        f"({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})",
+        [tuple(rec[c] for c in columns) for rec in records],
+    )
+
+
 def run_ingestion():
     conn   = get_snowflake_conn()
     cursor = conn.cursor()
+    run_id = get_run_id()
+    audit  = []
+
+    logger.info(f"Ingestion run id: {run_id}")
 
     for dataset in DATASETS:
+        started   = time.perf_counter()
+        loaded_at = datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
         try:
             table_name = dataset.upper()
             logger.info(f"Starting ingestion for: {table_name}")
@@ -52,6 +186,9 @@ def run_ingestion():
                 )
             """)
 
+            # File sizes come from the stage listing — COPY INTO does not report bytes
+            sizes = list_stage_sizes(cursor, dataset)
+
             # STEP 2: COPY INTO — land everything as VARIANT + capture filename + timestamp
             logger.info(f"  [2/3] Executing COPY INTO (cloud-to-cloud)...")
             cursor.execute(f"""
@@ -68,14 +205,36 @@ def run_ingestion():
                 PURGE = FALSE
             """)
 
-            results   = cursor.fetchall()
-            total_rows = sum(r[3] for r in results if r[3])
-            logger.info(f"  [3/3] Done! Files: {len(results)} | Rows loaded: {total_rows}\n")
+            results    = cursor.fetchall()
+            duration_s = time.perf_counter() - started
+            records    = build_audit_records(
+                run_id, dataset, results, cursor.description, sizes, duration_s, loaded_at
+            )
+            audit.extend(records)
+
+            total_rows = sum(r["rows_loaded"] for r in records if r["rows_loaded"])
+            partial    = [r for r in records if r["status"] in ("PARTIALLY_LOADED", "LOAD_FAILED")]
+            n_files    = sum(1 for r in records if r["file_name"] is not None)
+            logger.info(
+                f"  [3/3] Done! Files: {n_files} | Rows loaded: {total_rows} | "
+                f"Not fully loaded: {len(partial)} | {duration_s:.1f}s\n"
+            )
 
         except Exception as e:
             logger.error(f"  FAILED [{dataset}]: {str(e)}\n")
+            audit.append(build_error_record(
+                run_id, dataset, e, time.perf_counter() - started, loaded_at
+            ))
             continue
 
+    # Local copy first so the audit survives a failing warehouse connection
+    write_audit_local(audit)
+    try:
+        write_audit_table(cursor, audit)
+        logger.info(f"Audit: {len(audit)} records → {AUDIT_TABLE} and {AUDIT_LOCAL_PATH}")
+    except Exception as e:
+        logger.error(f"Audit table write failed ({e}); records kept in {AUDIT_LOCAL_PATH}")
+
     cursor.close()
     conn.close()
     logger.info("All processes finished.")
@@ -7,7 +7,15 @@ Usage
 -----
 1. Copy .env.example → .env and fill in credentials
 2. pip install boto3 python-dotenv
-3. python upload_to_r2.py
+3. python upload_to_r2.py [--workers 16]
+
+Incremental sync (upload only new/changed files):
+    python -m src.utils.upload_to_r2 --sync [--delete-orphans] [--dry-run]
+
+Benchmark against a local S3 stand-in (no R2 traffic):
+    pip install "moto[server]" && moto_server -p 5000 &
+    R2_ENDPOINT_URL=http://localhost:5000 R2_REGION=us-east-1 \
+        python -m src.utils.upload_to_r2 --create-bucket
 
 Structure in R2
 ───────────────
@@ -18,10 +26,17 @@ y2/users/event_date=.../filename.parquet
 """
 
 import os
-import glob
+import json
+import time
+import hashlib
+import random
+import argparse
+import sys
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from dotenv import load_dotenv
 
@@ -32,68 +47,323 @@ ACCOUNT_ID       = os.environ["R2_ACCOUNT_ID"]
 ACCESS_KEY_ID    = os.environ["R2_ACCESS_KEY_ID"]
 SECRET_ACCESS_KEY= os.environ["R2_SECRET_ACCESS_KEY"]
 BUCKET_NAME      = os.environ["R2_BUCKET_NAME"]
+# Optional override, e.g. a local moto server for benchmarking
+ENDPOINT_URL     = os.environ.get("R2_ENDPOINT_URL") or f"https://{ACCOUNT_ID}.r2.cloudflarestorage.com"
+REGION           = os.environ.get("R2_REGION", "auto")
 
 # ── Local source ─────────────────────────────────────────
 LOCAL_SOURCE = Path("data/raw_y2")   # folder hasil generator Y2
 R2_PREFIX    = "y2"                  # prefix di dalam bucket
+MANIFEST_PATH = LOCAL_SOURCE / "_r2_manifest.json"   # cached local ETags for --sync
+
+# ── Transfer tuning ──────────────────────────────────────
+# Partition files are small, so throughput is bound by request latency:
+# parallelism comes from the file-level pool; large files still go multipart.
+UPLOAD_WORKERS      = 16
+MULTIPART_THRESHOLD = 16 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+PER_FILE_CONCURRENCY = 4
+MAX_RETRIES         = 3
+RETRY_BASE_DELAY    = 0.5                # seconds, doubled per attempt
+
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=MULTIPART_THRESHOLD,
+    multipart_chunksize=MULTIPART_CHUNKSIZE,
+    max_concurrency=PER_FILE_CONCURRENCY,
+    use_threads=True,
+)
 
 # ─────────────────────────────────────────────────────────
 
-def get_client():
+def get_client(max_pool_connections: int = UPLOAD_WORKERS * PER_FILE_CONCURRENCY):
     return boto3.client(
         "s3",
-        endpoint_url=f"https://{ACCOUNT_ID}.r2.cloudflarestorage.com",
+        endpoint_url=ENDPOINT_URL,
         aws_access_key_id=ACCESS_KEY_ID,
         aws_secret_access_key=SECRET_ACCESS_KEY,
-        config=Config(signature_version="s3v4"),
-        region_name="auto",
+        # One pooled connection per in-flight part, otherwise threads queue on the pool
+        config=Config(
+            signature_version="s3v4",
+            max_pool_connections=max_pool_connections,
+            retries={"max_attempts": 1, "mode": "standard"},
+        ),
+        region_name=REGION,
     )
 
 
-def upload_directory(client, local_dir: Path, prefix: str):
+def upload_file_with_retry(client, local_path: Path, key: str,
+                           max_retries: int = MAX_RETRIES,
+                           base_delay: float = RETRY_BASE_DELAY):
+    """
+    Upload one file, retrying with exponential backoff + jitter.
+    Returns the number of attempts used; raises the last error when exhausted.
+    """
+    for attempt in range(1, max_retries + 1):
+        try:
+            client.upload_file(
+                Filename=str(local_path),
+                Bucket=BUCKET_NAME,
+                Key=key,
+                Config=TRANSFER_CONFIG,
+            )
+            return attempt
+        except Exception:
+            if attempt == max_retries:
+                raise
+            time.sleep(base_delay * 2 ** (attempt - 1) * (1 + random.random()))
+
+
+def upload_directory(client, local_dir: Path, prefix: str,
+                     workers: int = UPLOAD_WORKERS, verbose: bool = False,
+                     files: list = None):
     """
-    Walk local_dir and upload every .parquet file,
+    Walk local_dir and upload every .parquet file (or only `files` if given),
     preserving the folder structure under the given prefix.
+    Files are uploaded concurrently on a bounded thread pool.
     """
-    files = list(local_dir.rglob("*.parquet"))
+    if files is None:
+        files = list(local_dir.rglob("*.parquet"))
 
     if not files:
         print(f"No parquet files found in {local_dir}")
         return
 
-    print(f"Found {len(files)} files to upload.\n")
-    ok, failed = 0, []
+    total_bytes = sum(p.stat().st_size for p in files)
+    print(f"Found {len(files)} files ({total_bytes / 1e6:.1f} MB) to upload "
+          f"with {workers} workers.\n")
 
-    for local_path in files:
-        # e.g. subscription_events/event_date=2025-01-01/file.parquet
-        relative  = local_path.relative_to(local_dir)
-        r2_key    = f"{prefix}/{relative}"
+    ok, retried, failed = 0, 0, []
+    uploaded_bytes = 0
+    started = time.perf_counter()
+    progress_every = max(1, len(files) // 20)
 
-        try:
-            client.upload_file(
-                Filename=str(local_path),
-                Bucket=BUCKET_NAME,
-                Key=r2_key,
-            )
-            print(f"  ✓  {r2_key}")
-            ok += 1
-        except Exception as e:
-            print(f"  ✗  {r2_key}  →  {e}")
-            failed.append(r2_key)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for local_path in files:
+            # e.g. subscription_events/event_date=2025-01-01/file.parquet
+            relative = local_path.relative_to(local_dir).as_posix()
+            r2_key   = f"{prefix}/{relative}"
+            futures[pool.submit(upload_file_with_retry, client, local_path, r2_key)] = (local_path, r2_key)
 
-    print(f"\nDone. Uploaded: {ok} | Failed: {len(failed)}")
+        for done, future in enumerate(as_completed(futures), start=1):
+            local_path, r2_key = futures[future]
+            try:
+                attempts = future.result()
+                ok += 1
+                uploaded_bytes += local_path.stat().st_size
+                retried += attempts > 1
+                if verbose:
+                    print(f"  ✓  {r2_key}")
+            except Exception as e:
+                print(f"  ✗  {r2_key}  →  {e}")
+                failed.append(r2_key)
+
+            if done % progress_every == 0 or done == len(files):
+                elapsed = time.perf_counter() - started
+                print(f"  [{done}/{len(files)}] {done / elapsed:.1f} files/s | "
+                      f"{uploaded_bytes / 1e6 / elapsed:.2f} MB/s")
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"\nDone in {elapsed:.1f}s. Uploaded: {ok} | Retried: {retried} | Failed: {len(failed)}\n"
+        f"Throughput: {ok / elapsed:.1f} files/s | {uploaded_bytes / 1e6 / elapsed:.2f} MB/s"
+    )
     if failed:
         print("Failed files:")
         for f in failed:
             print(f"  - {f}")
 
+    return {
+        "files": ok,
+        "failed": len(failed),
+        "retried": retried,
+        "bytes": uploaded_bytes,
+        "elapsed_s": elapsed,
+    }
+
+
+# ─────────────────────────────────────────────────────────
+#  INCREMENTAL SYNC
+# ─────────────────────────────────────────────────────────
+
+def list_remote_objects(client, prefix: str) -> dict:
+    """One paginated ListObjectsV2 pass: key → (size, etag without quotes)."""
+    remote    = {}
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=BUCKET_NAME, Prefix=f"{prefix}/"):
+        for obj in page.get("Contents", []):
+            remote[obj["Key"]] = (obj["Size"], obj["ETag"].strip('"'))
+    return remote
+
+
+def compute_etag(path: Path) -> str:
+    """
+    ETag S3/R2 assigns to this file when uploaded with TRANSFER_CONFIG:
+    plain MD5 below the multipart threshold, otherwise MD5 of part MD5s + "-<parts>".
+    """
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        if size < MULTIPART_THRESHOLD:
+            return hashlib.md5(f.read()).hexdigest()
+        digests = [hashlib.md5(chunk).digest()
+                   for chunk in iter(lambda: f.read(MULTIPART_CHUNKSIZE), b"")]
+    return f"{hashlib.md5(b''.join(digests)).hexdigest()}-{len(digests)}"
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> dict:
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: dict, path: Path = MANIFEST_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=0, sort_keys=True)
+
+
+def local_etag(path: Path, relative: str, manifest: dict) -> str:
+    """ETag from the manifest when size + mtime still match, else re-hash and cache."""
+    stat   = path.stat()
+    cached = manifest.get(relative)
+    if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+        return cached["etag"]
+    etag = compute_etag(path)
+    manifest[relative] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "etag": etag}
+    return etag
+
+
+def plan_sync(client, local_dir: Path, prefix: str, manifest: dict) -> dict:
+    """
+    Compare local files with the remote listing.
+    Size is checked first; files are only hashed when sizes agree.
+    """
+    remote = list_remote_objects(client, prefix)
+    plan   = {"new": [], "changed": [], "unchanged": [], "orphans": []}
+    seen   = set()
+
+    for local_path in sorted(local_dir.rglob("*.parquet")):
+        relative = local_path.relative_to(local_dir).as_posix()
+        key      = f"{prefix}/{relative}"
+        seen.add(key)
+
+        if key not in remote:
+            plan["new"].append(local_path)
+            continue
+        remote_size, remote_etag = remote[key]
+        if remote_size != local_path.stat().st_size:
+            plan["changed"].append(local_path)
+        elif local_etag(local_path, relative, manifest) != remote_etag:
+            plan["changed"].append(local_path)
+        else:
+            plan["unchanged"].append(local_path)
+
+    plan["orphans"] = sorted(k for k in remote if k not in seen)
+    # Drop manifest entries for files gone both locally and remotely;
+    # orphans keep theirs until they are actually deleted
+    for relative in [r for r in manifest if f"{prefix}/{r}" not in seen and f"{prefix}/{r}" not in remote]:
+        del manifest[relative]
+    return plan
+
+
+def delete_remote_objects(client, keys: list) -> list:
+    """
+    DeleteObjects accepts at most 1000 keys per request. Quiet mode still
+    reports per-key failures under "Errors"; those are returned.
+    """
+    errors = []
+    for i in range(0, len(keys), 1000):
+        batch    = [{"Key": k} for k in keys[i:i + 1000]]
+        response = client.delete_objects(Bucket=BUCKET_NAME, Delete={"Objects": batch, "Quiet": True})
+        errors.extend(response.get("Errors", []))
+    return errors
+
+
+def sync_directory(client, local_dir: Path, prefix: str,
+                   workers: int = UPLOAD_WORKERS, delete_orphans: bool = False,
+                   dry_run: bool = False, verbose: bool = False):
+    """Upload only new or changed files; optionally delete remote orphans."""
+    manifest = load_manifest()
+    plan     = plan_sync(client, local_dir, prefix, manifest)
+    to_send  = plan["new"] + plan["changed"]
+
+    print(
+        f"Sync plan for {prefix}/ → "
+        f"new: {len(plan['new'])} | changed: {len(plan['changed'])} | "
+        f"unchanged: {len(plan['unchanged'])} | remote orphans: {len(plan['orphans'])}"
+    )
+    if dry_run or verbose:
+        for label in ("new", "changed"):
+            for p in plan[label]:
+                print(f"  {label:<8} {prefix}/{p.relative_to(local_dir).as_posix()}")
+        for key in plan["orphans"]:
+            action = "delete" if delete_orphans else "keep"
+            print(f"  orphan   {key}  ({action})")
+    if dry_run:
+        print("\nDry run — nothing uploaded or deleted.")
+        save_manifest(manifest)
+        return plan
+
+    plan["upload"] = None
+    if to_send:
+        plan["upload"] = upload_directory(client, local_dir, prefix, workers=workers,
+                                          verbose=verbose, files=to_send)
+    else:
+        print("Nothing to upload.")
+
+    plan["delete_errors"] = []
+    if delete_orphans and plan["orphans"]:
+        errors = delete_remote_objects(client, plan["orphans"])
+        failed = {e.get("Key") for e in errors}
+        for key in plan["orphans"]:
+            if key not in failed:
+                manifest.pop(key[len(prefix) + 1:], None)
+        print(f"Deleted {len(plan['orphans']) - len(failed)} remote orphans | Failed: {len(failed)}")
+        for e in errors:
+            print(f"  ✗  {e.get('Key')}  →  {e.get('Code')}: {e.get('Message')}")
+        plan["delete_errors"] = errors
+
+    save_manifest(manifest)
+    return plan
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=UPLOAD_WORKERS,
+                        help="Number of files uploaded in parallel.")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Print one line per uploaded file.")
+    parser.add_argument("--create-bucket", action="store_true",
+                        help="Create the bucket first (local S3 stand-in benchmarks).")
+    parser.add_argument("--sync", action="store_true",
+                        help="Upload only files missing remotely or with a different size/ETag.")
+    parser.add_argument("--delete-orphans", action="store_true",
+                        help="With --sync: delete remote objects that no longer exist locally.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="With --sync: print the sync plan without changing anything.")
+    args = parser.parse_args()
+    if (args.delete_orphans or args.dry_run) and not args.sync:
+        parser.error("--delete-orphans and --dry-run only apply to --sync.")
+
     if not LOCAL_SOURCE.exists():
         raise FileNotFoundError(
             f"Local source not found: {LOCAL_SOURCE}\n"
             "Make sure you've run runner_y2.py first."
         )
 
-    client = get_client()
-    upload_directory(client, LOCAL_SOURCE, R2_PREFIX)
\ No newline at end of file
+    client = get_client(max_pool_connections=args.workers * PER_FILE_CONCURRENCY)
+    if args.create_bucket:
+        client.create_bucket(Bucket=BUCKET_NAME)
+    if args.sync:
+        plan = sync_directory(client, LOCAL_SOURCE, R2_PREFIX, workers=args.workers,
+                              delete_orphans=args.delete_orphans, dry_run=args.dry_run,
+                              verbose=args.verbose)
+        result = plan.get("upload")
+        failed = bool(plan.get("delete_errors"))
+    else:
+        result = upload_directory(client, LOCAL_SOURCE, R2_PREFIX, workers=args.workers, verbose=args.verbose)
+        failed = False
+    # A partial upload must fail the calling job (CI, Airflow)
+    if failed or (result or {}).get("failed", 0) > 0:
+        sys.exit(1)